@@ -0,0 +1,164 @@
+"""Benchmark in-process framework adapters against proxying to the app.
+
+For each framework, an ``echo`` view is called a fixed number of times
+with a configurable number of concurrent callers, once through the
+``mcpfy`` adapter in the same process and once the way a ``backend_url``
+proxy would: as an HTTP request over a persistent loopback connection to
+the app served by a forked process (Werkzeug's server for Flask, uvicorn
+for FastAPI). Reports requests/sec and latency percentiles.
+
+Usage:
+    python benchmarks/bench_adapters.py --requests 5000 --concurrency 8
+    python benchmarks/bench_adapters.py --frameworks flask
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import socket
+import time
+from typing import Callable, List, Tuple
+
+from pymcpfy import MCPRegistry
+
+def make_flask() -> Tuple[MCPRegistry, Callable[[socket.socket], None], Callable[[int], bytes]]:
+    """Build a Flask app with an ``echo`` view registered through the adapter."""
+    from flask import Flask, jsonify, request
+    from werkzeug.serving import make_server
+
+    from pymcpfy.flask import init_app, mcpfy
+
+    app = Flask(__name__)
+    registry = init_app(app, MCPRegistry())
+
+    @app.route("/echo", methods=["POST"])
+    @mcpfy(registry=registry)
+    def echo():
+        return jsonify({"value": request.json["value"]})
+
+    def serve(sock: socket.socket):
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)
+        make_server("127.0.0.1", 0, app, threaded=True, fd=sock.fileno()).serve_forever()
+
+    def encode(value: int) -> bytes:
+        body = json.dumps({"value": value}).encode()
+        return (
+            b"POST /echo HTTP/1.1\r\nHost: bench\r\nContent-Type: application/json\r\n"
+            + f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+
+    return registry, serve, encode
+
+def make_fastapi() -> Tuple[MCPRegistry, Callable[[socket.socket], None], Callable[[int], bytes]]:
+    """Build a FastAPI app with an ``echo`` endpoint registered through the adapter."""
+    import uvicorn
+    from fastapi import FastAPI
+
+    from pymcpfy.fastapi import mcpfy
+
+    app = FastAPI()
+    registry = MCPRegistry()
+
+    @app.post("/echo")
+    @mcpfy(registry=registry)
+    async def echo(value: int) -> dict:
+        return {"value": value}
+
+    def serve(sock: socket.socket):
+        uvicorn.Server(uvicorn.Config(app, log_level="warning")).run(sockets=[sock])
+
+    def encode(value: int) -> bytes:
+        return f"POST /echo?value={value} HTTP/1.1\r\nHost: bench\r\nContent-Length: 0\r\n\r\n".encode()
+
+    return registry, serve, encode
+
+async def read_response(reader: asyncio.StreamReader) -> Tuple[bytes, bool]:
+    """Read one Content-Length framed response and whether the server keeps the connection."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    keep_alive = True
+    length = 0
+    for line in head.lower().split(b"\r\n"):
+        if line.startswith(b"content-length:"):
+            length = int(line.split(b":")[1])
+        elif line.startswith(b"connection:") and b"close" in line:
+            keep_alive = False
+    return await reader.readexactly(length), keep_alive
+
+async def in_process_caller(registry: MCPRegistry, counter, latencies: List[float]):
+    """Call the view through the registry's dispatcher."""
+    dispatcher = registry.dispatcher
+    for value in counter:
+        started = time.perf_counter()
+        await dispatcher.dispatch({"id": str(value), "function": "echo", "parameters": {"value": value}}, "bench")
+        latencies.append(time.perf_counter() - started)
+
+async def proxy_caller(port: int, encode: Callable[[int], bytes], counter, latencies: List[float]):
+    """Forward calls over a persistent HTTP connection, decoding each reply.
+
+    Reconnects whenever the server closes the connection, as Werkzeug's
+    development server does after every response.
+    """
+    writer = None
+    for value in counter:
+        started = time.perf_counter()
+        if writer is None:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(encode(value))
+        body, keep_alive = await read_response(reader)
+        json.loads(body)
+        if not keep_alive:
+            writer.close()
+            writer = None
+        latencies.append(time.perf_counter() - started)
+    if writer is not None:
+        writer.close()
+
+def report(label: str, requests: int, elapsed: float, latencies: List[float]):
+    """Print throughput and latency percentiles."""
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(f"{label:>20}  {requests / elapsed:>10.1f} req/s  p50 {p50:>8.3f} ms  p99 {p99:>8.3f} ms")
+
+async def run(framework: str, requests: int, concurrency: int):
+    """Benchmark both call paths for one framework."""
+    registry, serve, encode = {"flask": make_flask, "fastapi": make_fastapi}[framework]()
+
+    latencies: List[float] = []
+    counter = iter(range(requests))
+    started = time.perf_counter()
+    await asyncio.gather(*[in_process_caller(registry, counter, latencies) for _ in range(concurrency)])
+    report(f"{framework} in-process", requests, time.perf_counter() - started, latencies)
+
+    sock = socket.socket()
+    # Accepted connections inherit TCP_NODELAY, so responses written as a
+    # head and a body are not held back by Nagle's algorithm.
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(1024)
+    server = multiprocessing.get_context("fork").Process(target=serve, args=(sock,), daemon=True)
+    server.start()
+    port = sock.getsockname()[1]
+    latencies = []
+    counter = iter(range(requests))
+    started = time.perf_counter()
+    await asyncio.gather(*[proxy_caller(port, encode, counter, latencies) for _ in range(concurrency)])
+    report(f"{framework} proxy", requests, time.perf_counter() - started, latencies)
+    server.terminate()
+    server.join()
+    sock.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--frameworks", nargs="+", default=["flask", "fastapi"])
+    args = parser.parse_args()
+
+    for framework in args.frameworks:
+        asyncio.run(run(framework, args.requests, args.concurrency))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark a traffic spike with and without admission control.
+
+Fires a burst of concurrent calls at a synchronous function that holds a
+worker thread for a few milliseconds, first with no limit, where every
+call queues for the thread pool, and then with a ``ConcurrencyLimiter``,
+fixed and adaptive, that sheds calls beyond its queue. Reports how many
+calls were served and rejected and the latency of the served ones.
+
+Usage:
+    python benchmarks/bench_admission.py --burst 2000 --work-ms 5
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List, Optional
+
+from pymcpfy import AIMDLimit, ConcurrencyLimiter, ExecutorManager, MCPRegistry
+
+async def run(label: str, limiter: Optional[ConcurrencyLimiter], burst: int, work: float, threads: int):
+    """Send one burst through a fresh registry and report the outcome."""
+    registry = MCPRegistry(executors=ExecutorManager(thread_pool_size=threads), limiter=limiter)
+
+    def work_for(context) -> None:
+        time.sleep(work)
+
+    registry.register(work_for, name="work")
+    dispatcher = registry.dispatcher
+    latencies: List[float] = []
+    rejected = 0
+
+    async def call(i: int):
+        nonlocal rejected
+        started = time.perf_counter()
+        response = await dispatcher.dispatch({"id": str(i), "function": "work"}, "bench")
+        if response["status"] == 200:
+            latencies.append(time.perf_counter() - started)
+        else:
+            rejected += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[call(i) for i in range(burst)])
+    elapsed = time.perf_counter() - started
+    registry.executors.shutdown()
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(
+        f"{label:>10}  served {len(latencies):>6}  rejected {rejected:>6}  "
+        f"p50 {p50:>9.1f} ms  p99 {p99:>9.1f} ms  in {elapsed:.2f} s"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--burst", type=int, default=2000)
+    parser.add_argument("--work-ms", type=float, default=5.0)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--limit", type=int, default=16)
+    parser.add_argument("--queued", type=int, default=64)
+    args = parser.parse_args()
+
+    work = args.work_ms / 1000
+    asyncio.run(run("unlimited", None, args.burst, work, args.threads))
+    asyncio.run(run("fixed", ConcurrencyLimiter(args.limit, args.queued), args.burst, work, args.threads))
+    adaptive = ConcurrencyLimiter(AIMDLimit(initial=args.limit), args.queued)
+    asyncio.run(run("adaptive", adaptive, args.burst, work, args.threads))
+    print(f"{'':>10}  adaptive limit settled at {adaptive.limit}")
+
+if __name__ == "__main__":
+    main()
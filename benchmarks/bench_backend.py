@@ -0,0 +1,96 @@
+"""Benchmark backend proxying with pooled keep-alive connections.
+
+Calls an ``echo`` function registered with ``BackendProxy`` a fixed number
+of times with a configurable number of concurrent callers, once with a
+pool that keeps connections alive and once with ``idle_timeout=0``, which
+closes each connection after its call as a connection-per-call client
+would. The backend is a minimal asyncio HTTP server in a forked process.
+Reports requests/sec, latency percentiles and the pool's counters.
+
+Usage:
+    python benchmarks/bench_backend.py --requests 5000 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import socket
+import time
+from typing import List
+
+from pymcpfy import BackendPool, BackendProxy, MCPRegistry
+from pymcpfy.core.transport.http_server import build_response, read_request
+
+def serve(sock: socket.socket):
+    """Answer every request with its own body, keeping connections open."""
+    async def handle(reader, writer):
+        while True:
+            request = await read_request(reader)
+            if request is None:
+                break
+            writer.write(build_response(200, request.body))
+            await writer.drain()
+        writer.close()
+
+    async def main():
+        server = await asyncio.start_server(handle, sock=sock)
+        await server.serve_forever()
+
+    asyncio.run(main())
+
+async def caller(registry: MCPRegistry, counter, latencies: List[float]):
+    """Call the proxied function through the registry's dispatcher."""
+    dispatcher = registry.dispatcher
+    for value in counter:
+        started = time.perf_counter()
+        response = await dispatcher.dispatch(
+            {"id": str(value), "function": "echo", "parameters": {"value": value}}, "bench"
+        )
+        assert response["status"] == 200, response
+        latencies.append(time.perf_counter() - started)
+
+def report(label: str, requests: int, elapsed: float, latencies: List[float]):
+    """Print throughput and latency percentiles."""
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(f"{label:>12}  {requests / elapsed:>10.1f} req/s  p50 {p50:>8.3f} ms  p99 {p99:>8.3f} ms")
+
+async def run(url: str, label: str, pool: BackendPool, requests: int, concurrency: int):
+    """Benchmark one pool configuration."""
+    proxy = BackendProxy(url, pool)
+    registry = MCPRegistry()
+    proxy.register(registry, "echo", "/echo")
+    latencies: List[float] = []
+    counter = iter(range(requests))
+    started = time.perf_counter()
+    await asyncio.gather(*[caller(registry, counter, latencies) for _ in range(concurrency)])
+    report(label, requests, time.perf_counter() - started, latencies)
+    print(f"{'':>12}  {pool.metrics()[url]}")
+    await proxy.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    sock = socket.socket()
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(1024)
+    server = multiprocessing.get_context("fork").Process(target=serve, args=(sock,), daemon=True)
+    server.start()
+    url = f"http://127.0.0.1:{sock.getsockname()[1]}"
+    try:
+        pooled = BackendPool(max_connections=args.concurrency)
+        asyncio.run(run(url, "pooled", pooled, args.requests, args.concurrency))
+        fresh = BackendPool(max_connections=args.concurrency, idle_timeout=0)
+        asyncio.run(run(url, "per-call", fresh, args.requests, args.concurrency))
+    finally:
+        server.terminate()
+        server.join()
+        sock.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Benchmark encode/decode cost and payload size of each wire codec.
+
+Encodes a response carrying ``--rows`` result rows, similar to a tool that
+returns a list of records, with every codec available in this environment.
+
+Usage:
+    python benchmarks/bench_codecs.py --rows 10000 --repeat 20
+"""
+
+import argparse
+import time
+
+from pymcpfy.core.codecs import JSONCodec, get_codec
+
+def make_response(rows: int) -> dict:
+    """Build a response with ``rows`` user-like records."""
+    return {
+        "id": "bench",
+        "status": 200,
+        "metadata": {},
+        "data": [
+            {"id": i, "name": f"user{i}", "email": f"user{i}@example.com", "score": i * 0.5, "active": i % 2 == 0}
+            for i in range(rows)
+        ],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    message = make_response(args.rows)
+    codecs = [JSONCodec()]
+    for name in ("orjson", "msgpack"):
+        try:
+            codecs.append(get_codec(name))
+        except ValueError as e:
+            print(f"skipping {name}: {e}")
+
+    print(f"{'codec':>8}  {'encode ms':>10}  {'decode ms':>10}  {'bytes':>10}")
+    for codec in codecs:
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            data = codec.encode(message)
+        encode = (time.perf_counter() - started) / args.repeat * 1000
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            codec.decode(data)
+        decode = (time.perf_counter() - started) / args.repeat * 1000
+        print(f"{codec.name:>8}  {encode:>10.2f}  {decode:>10.2f}  {len(data):>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Microbenchmark the per-call overhead of request dispatch.
+
+Compares the precompiled MCPDispatcher path with the per-call lookup,
+``MCPContext``/``MCPResponse`` construction and ``is_async`` branching the
+transports used to do inline. Both paths call the same trivial functions so
+the difference is dispatch overhead only. The two paths run in alternating
+rounds and the minimum and median per-call cost over the rounds is
+reported, so a noisy round does not decide the comparison.
+
+Usage:
+    python benchmarks/bench_dispatch.py --calls 50000 --rounds 7
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any, Dict, List
+
+from pymcpfy import MCPContext, MCPRegistry, MCPResponse
+
+async def legacy_dispatch(registry: MCPRegistry, request: Dict[str, Any]) -> Dict[str, Any]:
+    """The request handling previously copied into each transport."""
+    request_id = request.get("id")
+    function_name = request.get("function")
+    parameters = request.get("parameters", {})
+
+    if not function_name:
+        return {"id": request_id, "error": "Missing function name", "status": 400}
+
+    function = registry.get_function(function_name)
+    if not function:
+        return {"id": request_id, "error": f"Function {function_name} not found", "status": 404}
+
+    context = MCPContext(
+        request_id=request_id,
+        metadata=request.get("metadata", {}),
+        transport="bench",
+        raw_request=request
+    )
+
+    try:
+        if function.is_async:
+            result = await function.func(context, **parameters)
+        else:
+            result = await asyncio.to_thread(function.func, context, **parameters)
+
+        if isinstance(result, MCPResponse):
+            response = result.to_dict()
+        else:
+            response = MCPResponse(result).to_dict()
+
+        response["id"] = request_id
+        return response
+
+    except Exception as e:
+        return {"id": request_id, "error": str(e), "status": 500}
+
+async def measure(dispatch, request: Dict[str, Any], calls: int) -> float:
+    """Run ``calls`` sequential dispatches and return the per-call cost in µs."""
+    started = time.perf_counter()
+    for _ in range(calls):
+        await dispatch(request)
+    return (time.perf_counter() - started) / calls * 1e6
+
+def report(name: str, samples: List[float]):
+    """Print the minimum and median per-call cost of the rounds."""
+    print(f"{name:>24}  min {min(samples):>8.2f} us/call  median {statistics.median(samples):>8.2f} us/call")
+
+async def main_async(calls: int, rounds: int) -> None:
+    registry = MCPRegistry()
+
+    async def add_async(context, a: int, b: int) -> int:
+        return a + b
+
+    def add_sync(context, a: int, b: int) -> int:
+        return a + b
+
+    registry.register(add_async)
+    registry.register(add_sync)
+    dispatcher = registry.dispatcher
+
+    paths = {
+        "legacy": lambda r: legacy_dispatch(registry, r),
+        "dispatcher": lambda r: dispatcher.dispatch(r, "bench")
+    }
+    for function, count in (("add_async", calls), ("add_sync", calls // 10)):
+        request = {"id": "1", "function": function, "parameters": {"a": 1, "b": 2}}
+        samples: Dict[str, List[float]] = {name: [] for name in paths}
+        for name, dispatch in paths.items():
+            await measure(dispatch, request, min(count, 1000))
+        for _ in range(rounds):
+            for name, dispatch in paths.items():
+                samples[name].append(await measure(dispatch, request, count))
+        for name in paths:
+            report(f"{name} {function}", samples[name])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=50000)
+    parser.add_argument("--rounds", type=int, default=7)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.calls, args.rounds))
+
+if __name__ == "__main__":
+    main()
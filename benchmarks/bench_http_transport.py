@@ -0,0 +1,108 @@
+"""Benchmark the asyncio and threaded HTTP transport engines.
+
+Runs a fixed number of MCP calls against each engine with a configurable
+number of concurrent clients and reports requests/sec and latency percentiles.
+With ``--keep-alive`` each client reuses one persistent connection instead of
+connecting per request.
+
+Usage:
+    python benchmarks/bench_http_transport.py --requests 2000 --concurrency 100 --delay 0.01
+    python benchmarks/bench_http_transport.py --keep-alive
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import List
+
+from pymcpfy import HTTPTransport, MCPRegistry
+
+def make_registry(delay: float) -> MCPRegistry:
+    """Build a registry with a single async tool that sleeps for ``delay``."""
+    registry = MCPRegistry()
+
+    async def echo(context, value: int) -> int:
+        if delay:
+            await asyncio.sleep(delay)
+        return value
+
+    registry.register(echo, is_async=True)
+    return registry
+
+def encode_request(value: int, keep_alive: bool) -> bytes:
+    """Encode one MCP call as an HTTP request."""
+    body = json.dumps({"id": str(value), "function": "echo", "parameters": {"value": value}}).encode()
+    connection = b"keep-alive" if keep_alive else b"close"
+    return (
+        b"POST / HTTP/1.1\r\nHost: bench\r\nConnection: " + connection
+        + f"\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+        + body
+    )
+
+async def read_response(reader: asyncio.StreamReader) -> bytes:
+    """Read one Content-Length framed response."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            return await reader.readexactly(int(line.split(b":")[1]))
+    return await reader.read()
+
+async def call(port: int, value: int) -> float:
+    """Issue one request on a fresh connection and return its latency."""
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(encode_request(value, keep_alive=False))
+    await writer.drain()
+    await reader.read()
+    writer.close()
+    return time.perf_counter() - started
+
+async def run(engine: str, requests: int, concurrency: int, delay: float, keep_alive: bool) -> None:
+    """Benchmark a single engine."""
+    transport = HTTPTransport(make_registry(delay), host="127.0.0.1", port=0, engine=engine)
+    await transport.start()
+    latencies: List[float] = []
+    counter = iter(range(requests))
+
+    async def client():
+        if not keep_alive:
+            for value in counter:
+                latencies.append(await call(transport.port, value))
+            return
+        reader, writer = None, None
+        for value in counter:
+            started = time.perf_counter()
+            if writer is None:
+                reader, writer = await asyncio.open_connection("127.0.0.1", transport.port)
+            writer.write(encode_request(value, keep_alive=True))
+            await read_response(reader)
+            latencies.append(time.perf_counter() - started)
+        if writer is not None:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    await transport.stop()
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    mode = "keep-alive" if keep_alive else "close"
+    print(f"{engine:>10} {mode:>10}  {requests / elapsed:>10.1f} req/s  p50 {p50:>8.2f} ms  p99 {p99:>8.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--delay", type=float, default=0.01, help="Simulated tool latency in seconds")
+    parser.add_argument("--engines", nargs="+", default=["threaded", "asyncio"])
+    parser.add_argument("--keep-alive", action="store_true", help="Reuse one connection per client")
+    args = parser.parse_args()
+
+    for engine in args.engines:
+        asyncio.run(run(engine, args.requests, args.concurrency, args.delay, args.keep_alive))
+
+if __name__ == "__main__":
+    main()
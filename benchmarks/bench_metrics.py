@@ -0,0 +1,103 @@
+"""Benchmark the overhead of recording call metrics.
+
+Measures the per-call cost of dispatching a trivial function with and
+without ``CallMetrics`` on the registry, then serves the same function
+over the asyncio HTTP transport with keep-alive clients, where metrics
+also time request decoding and response encoding, and reports
+requests/sec and latency percentiles for both.
+
+Usage:
+    python benchmarks/bench_metrics.py --calls 200000 --requests 20000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import List, Optional
+
+from pymcpfy import CallMetrics, HTTPTransport, MCPRegistry
+
+def make_registry(metrics: Optional[CallMetrics]) -> MCPRegistry:
+    """Build a registry with a single trivial async function."""
+    registry = MCPRegistry(metrics=metrics)
+
+    async def echo(context, value: int) -> int:
+        return value
+
+    registry.register(echo)
+    return registry
+
+async def measure_dispatch(label: str, metrics: Optional[CallMetrics], calls: int) -> float:
+    """Run ``calls`` sequential dispatches and print the per-call cost."""
+    dispatcher = make_registry(metrics).dispatcher
+    request = {"id": "1", "function": "echo", "parameters": {"value": 1}}
+    for _ in range(min(calls, 1000)):
+        await dispatcher.dispatch(request, "bench")
+    started = time.perf_counter()
+    for _ in range(calls):
+        await dispatcher.dispatch(request, "bench")
+    per_call = (time.perf_counter() - started) / calls * 1e6
+    print(f"{'dispatch ' + label:>20}  {per_call:>8.2f} us/call")
+    return per_call
+
+def encode_request(value: int) -> bytes:
+    """Encode one MCP call as a keep-alive HTTP request."""
+    body = json.dumps({"id": str(value), "function": "echo", "parameters": {"value": value}}).encode()
+    return b"POST / HTTP/1.1\r\nHost: bench\r\n" + f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+
+async def read_response(reader: asyncio.StreamReader) -> bytes:
+    """Read one Content-Length framed response."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            return await reader.readexactly(int(line.split(b":")[1]))
+    return await reader.read()
+
+async def measure_http(label: str, metrics: Optional[CallMetrics], requests: int, concurrency: int):
+    """Serve the registry over HTTP and report throughput and latency."""
+    transport = HTTPTransport(make_registry(metrics), host="127.0.0.1", port=0)
+    await transport.start()
+    latencies: List[float] = []
+    counter = iter(range(requests))
+
+    async def client():
+        reader, writer = await asyncio.open_connection("127.0.0.1", transport.port)
+        for value in counter:
+            started = time.perf_counter()
+            writer.write(encode_request(value))
+            await read_response(reader)
+            latencies.append(time.perf_counter() - started)
+        writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    await transport.stop()
+    report("http " + label, requests, elapsed, latencies)
+
+def report(label: str, requests: int, elapsed: float, latencies: List[float]):
+    """Print throughput and latency percentiles."""
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(f"{label:>20}  {requests / elapsed:>10.1f} req/s  p50 {p50:>8.2f} ms  p99 {p99:>8.2f} ms")
+
+async def main_async(calls: int, requests: int, concurrency: int):
+    plain = await measure_dispatch("plain", None, calls)
+    metrics = CallMetrics()
+    measured = await measure_dispatch("metrics", metrics, calls)
+    print(f"{'overhead':>20}  {measured - plain:>8.2f} us/call")
+    await measure_http("plain", None, requests, concurrency)
+    await measure_http("metrics", CallMetrics(), requests, concurrency)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.calls, args.requests, args.concurrency))
+
+if __name__ == "__main__":
+    main()
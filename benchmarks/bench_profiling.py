@@ -0,0 +1,60 @@
+"""Benchmark the overhead of the slow-call profiler.
+
+Measures the per-call cost of dispatching a trivial synchronous and a
+trivial async function with no profiler, with a ``CallProfiler`` whose
+threshold none of the calls reach, and with one that also samples 1% of
+calls under ``cProfile``.
+
+Usage:
+    python benchmarks/bench_profiling.py --calls 50000
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Optional
+
+from pymcpfy import CallProfiler, MCPRegistry
+
+def make_registry(profiler: Optional[CallProfiler]) -> MCPRegistry:
+    """Build a registry with a trivial sync and async function."""
+    registry = MCPRegistry(profiler=profiler)
+
+    def echo(context, value: int) -> int:
+        return value
+
+    async def aecho(context, value: int) -> int:
+        return value
+
+    registry.register(echo)
+    registry.register(aecho)
+    return registry
+
+async def measure(label: str, profiler: Optional[CallProfiler], function: str, calls: int) -> float:
+    """Run ``calls`` sequential dispatches and print the per-call cost."""
+    dispatcher = make_registry(profiler).dispatcher
+    request = {"id": "1", "function": function, "parameters": {"value": 1}}
+    for _ in range(min(calls, 1000)):
+        await dispatcher.dispatch(request, "bench")
+    started = time.perf_counter()
+    for _ in range(calls):
+        await dispatcher.dispatch(request, "bench")
+    per_call = (time.perf_counter() - started) / calls * 1e6
+    print(f"{function + ' ' + label:>20}  {per_call:>8.2f} us/call")
+    return per_call
+
+async def main_async(calls: int):
+    for function in ("echo", "aecho"):
+        plain = await measure("plain", None, function, calls)
+        watched = await measure("threshold", CallProfiler(threshold=1.0), function, calls)
+        await measure("sampled 1%", CallProfiler(threshold=1.0, sample_rate=0.01), function, calls)
+        print(f"{'overhead':>20}  {watched - plain:>8.2f} us/call")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=50000)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.calls))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark loopback TCP against Unix domain sockets for small MCP calls.
+
+Runs a fixed number of calls to an instant tool over each listener, with a
+configurable number of concurrent clients on persistent connections, for
+the asyncio HTTP transport and the WebSocket transport, and reports
+requests/sec and latency percentiles.
+
+Usage:
+    python benchmarks/bench_unix_socket.py --requests 20000 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import List
+
+import websockets
+
+from pymcpfy import HTTPTransport, MCPRegistry, WebSocketTransport
+
+def make_registry() -> MCPRegistry:
+    """Build a registry with a single instant tool."""
+    registry = MCPRegistry()
+
+    async def echo(context, value: int) -> int:
+        return value
+
+    registry.register(echo)
+    return registry
+
+def encode_request(value: int) -> bytes:
+    """Encode one MCP call as a keep-alive HTTP request."""
+    body = json.dumps({"id": str(value), "function": "echo", "parameters": {"value": value}}).encode()
+    return b"POST / HTTP/1.1\r\nHost: bench\r\n" + f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+
+async def read_response(reader: asyncio.StreamReader) -> bytes:
+    """Read one Content-Length framed response."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            return await reader.readexactly(int(line.split(b":")[1]))
+    return b""
+
+async def http_client(path: str, port: int, counter, latencies: List[float]):
+    """Issue calls over one persistent HTTP connection."""
+    if path:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for value in counter:
+        started = time.perf_counter()
+        writer.write(encode_request(value))
+        await read_response(reader)
+        latencies.append(time.perf_counter() - started)
+    writer.close()
+
+async def websocket_client(path: str, port: int, counter, latencies: List[float]):
+    """Issue calls one at a time over one WebSocket connection."""
+    if path:
+        connection = websockets.unix_connect(path)
+    else:
+        connection = websockets.connect(f"ws://127.0.0.1:{port}")
+    async with connection as ws:
+        for value in counter:
+            started = time.perf_counter()
+            await ws.send(json.dumps({"id": str(value), "function": "echo", "parameters": {"value": value}}))
+            await ws.recv()
+            latencies.append(time.perf_counter() - started)
+
+async def run(kind: str, listener: str, requests: int, concurrency: int) -> None:
+    """Benchmark one transport on one kind of listener."""
+    path = os.path.join(tempfile.mkdtemp(), "mcp.sock") if listener == "uds" else None
+    if kind == "http":
+        transport = HTTPTransport(make_registry(), host="127.0.0.1", port=0, unix_socket=path)
+        client = http_client
+    else:
+        transport = WebSocketTransport(make_registry(), host="127.0.0.1", port=0, unix_socket=path)
+        client = websocket_client
+    await transport.start()
+    latencies: List[float] = []
+    counter = iter(range(requests))
+
+    started = time.perf_counter()
+    await asyncio.gather(*[client(path, transport.port, counter, latencies) for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    await transport.stop()
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(f"{kind:>10} {listener:>4}  {requests / elapsed:>10.1f} req/s  p50 {p50:>8.3f} ms  p99 {p99:>8.3f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--transports", nargs="+", default=["http", "websocket"])
+    args = parser.parse_args()
+
+    for kind in args.transports:
+        for listener in ("tcp", "uds"):
+            asyncio.run(run(kind, listener, args.requests, args.concurrency))
+
+if __name__ == "__main__":
+    main()
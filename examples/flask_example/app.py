@@ -11,10 +11,11 @@ from flask_jwt_extended import (
     get_jwt_identity
 )
 from dataclasses import dataclass
-from pymcpfy.flask import mcpfy
+from pymcpfy.flask import init_app, mcpfy
 
 # Initialize Flask app
 app = Flask(__name__)
+init_app(app)
 
 # Configuration
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///todos.db'
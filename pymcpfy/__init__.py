@@ -2,14 +2,34 @@
 
 from .core import (
     MCPContext,
+    MCPError,
     MCPFunction,
     MCPRegistry,
     MCPResponse,
     MCPSchema,
+    MCPDispatcher,
+    MCPASGIApp,
+    BackendPool,
+    BackendProxy,
+    AIMDLimit,
+    Batcher,
+    CallMetrics,
+    CallProfiler,
+    ConcurrencyLimiter,
+    ExecutorManager,
+    RateLimiter,
+    ResultCache,
     SchemaGenerator,
     BaseTransport,
     WebSocketTransport,
     HTTPTransport,
+    SSETransport,
+    StdioTransport,
+    Supervisor,
+    create_asgi_app,
+    default_registry,
+    create_transport,
+    serve,
 )
 from .config import MCPConfig, TransportConfig, load_config
 
@@ -17,14 +37,34 @@ __version__ = "0.1.0"
 
 __all__ = [
     "MCPContext",
+    "MCPError",
     "MCPFunction",
     "MCPRegistry",
     "MCPResponse",
     "MCPSchema",
+    "MCPDispatcher",
+    "MCPASGIApp",
+    "BackendPool",
+    "BackendProxy",
+    "AIMDLimit",
+    "Batcher",
+    "CallMetrics",
+    "CallProfiler",
+    "ConcurrencyLimiter",
+    "ExecutorManager",
+    "RateLimiter",
+    "ResultCache",
     "SchemaGenerator",
     "BaseTransport",
     "WebSocketTransport",
     "HTTPTransport",
+    "SSETransport",
+    "StdioTransport",
+    "Supervisor",
+    "create_asgi_app",
+    "default_registry",
+    "create_transport",
+    "serve",
     "MCPConfig",
     "TransportConfig",
     "load_config",
@@ -1,26 +1,57 @@
 """Configuration management for PyMCPfy."""
 
 import os
-from dataclasses import dataclass
-from typing import Optional, Union
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, Optional, Union, get_args, get_origin
 import yaml
 
 @dataclass
 class TransportConfig:
     """Configuration for MCP transport."""
-    type: str = "websocket"  # "websocket" or "http"
+    type: str = "websocket"  # "websocket", "http", "sse" or "stdio"
     host: str = "localhost"
     port: int = 8765
+    unix_socket: Optional[str] = None  # listen on this Unix socket path instead of host/port
     ping_interval: int = 20
     ping_timeout: int = 20
+    max_concurrency: int = 32
+    max_queued: int = 128
+    http_engine: str = "asyncio"  # "asyncio" or "threaded"
+    keepalive_timeout: int = 5
+    max_requests_per_connection: int = 1000
+    pipeline_depth: int = 16
+    max_batch_size: int = 100
+    batch_concurrency: int = 16
+    framing: str = "newline"  # stdio framing: "newline" or "length"
 
 @dataclass
 class MCPConfig:
     """Configuration for PyMCPfy."""
-    transport: TransportConfig = TransportConfig()
+    transport: TransportConfig = field(default_factory=TransportConfig)
     backend_url: Optional[str] = None
+    backend_pool_size: int = 10  # connections per backend host
+    backend_connect_timeout: float = 5.0
+    backend_read_timeout: float = 30.0
+    backend_idle_timeout: float = 30.0
     debug: bool = False
     cors_origins: list[str] = None
+    thread_pool_size: Optional[int] = None
+    process_pool_size: Optional[int] = None
+    executors: Dict[str, int] = field(default_factory=dict)
+    workers: int = 1
+    max_inflight: Optional[int] = None  # calls executing at once across all connections
+    max_inflight_queued: int = 128
+    queue_timeout: Optional[float] = None
+    adaptive_limit: bool = False
+    rate_limit: Optional[float] = None  # calls per second per client key
+    rate_limit_burst: Optional[int] = None
+    max_concurrent_per_key: Optional[int] = None
+    rate_limit_key: str = "peer"  # "peer" (client host), "connection" (host:port) or a metadata field
+    rate_limit_idle_timeout: float = 300.0
+    metrics: bool = True  # record call metrics, served at GET /metrics
+    profile_threshold: float = 1.0  # seconds; with debug on, slower calls are profiled
+    profile_sample_rate: float = 0.0  # fraction of all calls profiled
+    profile_records: int = 100  # profiles kept, served at GET /debug/profiles
 
     @classmethod
     def from_file(cls, path: str) -> "MCPConfig":
@@ -30,25 +61,40 @@ class MCPConfig:
 
         with open(path, "r") as f:
             config_dict = yaml.safe_load(f)
-
-        transport_config = TransportConfig(**config_dict.get("transport", {}))
-        return cls(
-            transport=transport_config,
-            backend_url=config_dict.get("backend_url"),
-            debug=config_dict.get("debug", False),
-            cors_origins=config_dict.get("cors_origins", [])
-        )
+        return cls.from_dict(config_dict or {})
 
     @classmethod
     def from_dict(cls, config_dict: dict) -> "MCPConfig":
-        """Load configuration from dictionary."""
-        transport_config = TransportConfig(**config_dict.get("transport", {}))
-        return cls(
-            transport=transport_config,
-            backend_url=config_dict.get("backend_url"),
-            debug=config_dict.get("debug", False),
-            cors_origins=config_dict.get("cors_origins", [])
-        )
+        """Load configuration from dictionary.
+
+        Fields missing from it keep their defaults.
+        """
+        values = {
+            f.name: config_dict[f.name] for f in fields(cls) if f.name != "transport" and f.name in config_dict
+        }
+        values.setdefault("cors_origins", [])
+        return cls(transport=TransportConfig(**config_dict.get("transport", {})), **values)
+
+# Environment variables that are not named PYMCPFY_<FIELD>.
+_ENV_NAMES = {"type": "PYMCPFY_TRANSPORT_TYPE"}
+
+def _from_env(cls: type) -> Dict[str, Any]:
+    """Field values of a config dataclass set by ``PYMCPFY_*`` environment variables."""
+    values = {}
+    for f in fields(cls):
+        raw = os.getenv(_ENV_NAMES.get(f.name, f"PYMCPFY_{f.name.upper()}"))
+        if not raw:
+            continue
+        type_ = f.type
+        if get_origin(type_) is Union:
+            type_ = next(arg for arg in get_args(type_) if arg is not type(None))
+        if type_ is bool:
+            values[f.name] = raw.lower() == "true"
+        elif type_ in (int, float, str):
+            values[f.name] = type_(raw)
+        elif type_ is list or get_origin(type_) is list:
+            values[f.name] = raw.split(",")
+    return values
 
 def load_config(config: Union[str, dict, None] = None) -> MCPConfig:
     """Load configuration from file, dict, or environment variables."""
@@ -58,17 +104,6 @@ def load_config(config: Union[str, dict, None] = None) -> MCPConfig:
         return MCPConfig.from_dict(config)
     else:
         # Load from environment variables
-        transport_config = TransportConfig(
-            type=os.getenv("PYMCPFY_TRANSPORT_TYPE", "websocket"),
-            host=os.getenv("PYMCPFY_HOST", "localhost"),
-            port=int(os.getenv("PYMCPFY_PORT", "8765")),
-            ping_interval=int(os.getenv("PYMCPFY_PING_INTERVAL", "20")),
-            ping_timeout=int(os.getenv("PYMCPFY_PING_TIMEOUT", "20"))
-        )
-
-        return MCPConfig(
-            transport=transport_config,
-            backend_url=os.getenv("PYMCPFY_BACKEND_URL"),
-            debug=os.getenv("PYMCPFY_DEBUG", "false").lower() == "true",
-            cors_origins=os.getenv("PYMCPFY_CORS_ORIGINS", "").split(",") if os.getenv("PYMCPFY_CORS_ORIGINS") else []
-        )
+        values = _from_env(MCPConfig)
+        values.setdefault("cors_origins", [])
+        return MCPConfig(transport=TransportConfig(**_from_env(TransportConfig)), **values)
@@ -2,26 +2,61 @@
 
 from .mcp_protocol import (
     MCPContext,
+    MCPError,
     MCPFunction,
     MCPRegistry,
     MCPResponse,
     MCPSchema,
 )
+from .adapters import default_registry
+from .admission import AIMDLimit, ConcurrencyLimiter
+from .asgi import MCPASGIApp, create_asgi_app
+from .backend import BackendPool, BackendProxy
+from .batching import Batcher
+from .cache import ResultCache
+from .metrics import CallMetrics
+from .profiling import CallProfiler
+from .ratelimit import RateLimiter
+from .dispatcher import MCPDispatcher
+from .executors import ExecutorManager
 from .schema_generator import SchemaGenerator
+from .server import Supervisor, create_transport, serve
 from .transport import (
     BaseTransport,
     WebSocketTransport,
     HTTPTransport,
+    SSETransport,
+    StdioTransport,
 )
 
 __all__ = [
     "MCPContext",
+    "MCPError",
     "MCPFunction",
     "MCPRegistry",
     "MCPResponse",
     "MCPSchema",
+    "MCPDispatcher",
+    "MCPASGIApp",
+    "BackendPool",
+    "BackendProxy",
+    "AIMDLimit",
+    "Batcher",
+    "CallMetrics",
+    "CallProfiler",
+    "ConcurrencyLimiter",
+    "ExecutorManager",
+    "RateLimiter",
+    "ResultCache",
     "SchemaGenerator",
     "BaseTransport",
     "WebSocketTransport",
     "HTTPTransport",
+    "SSETransport",
+    "StdioTransport",
+    "Supervisor",
+    "create_asgi_app",
+    "default_registry",
+    "create_transport",
+    "serve",
 ]
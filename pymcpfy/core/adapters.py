@@ -0,0 +1,110 @@
+"""Shared support for the in-process framework adapters.
+
+The adapters in ``pymcpfy.django``, ``pymcpfy.flask`` and
+``pymcpfy.fastapi`` register views as MCP functions that call the view in the
+same process with a synthetic request, instead of forwarding MCP calls to
+the application over HTTP. Parameters matching the view's own arguments
+(such as URL path parameters) are passed to it directly; the remaining
+ones become the JSON body, or the query string for ``GET`` requests.
+Request headers, for example ``Authorization``, are taken from the
+``headers`` entry of the call's metadata.
+"""
+
+import inspect
+import json
+from typing import Any, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlencode
+
+from .mcp_protocol import MCPContext, MCPError, MCPRegistry, MCPResponse
+
+_default_registry: Optional[MCPRegistry] = None
+
+def default_registry() -> MCPRegistry:
+    """Registry that ``mcpfy`` registers views in when not given one."""
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = MCPRegistry()
+    return _default_registry
+
+def view_name(view: Any) -> str:
+    """Function name for a view; methods are prefixed with their class name."""
+    return view.__qualname__.rsplit("<locals>.", 1)[-1].replace(".", "_")
+
+def view_arguments(view: Any, skip: int = 0) -> Dict[str, inspect.Parameter]:
+    """Keyword-passable parameters of a view after the first ``skip``."""
+    parameters = list(inspect.signature(view).parameters.values())[skip:]
+    return {
+        p.name: p for p in parameters
+        if p.kind in (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY)
+    }
+
+def parameter_types(arguments: Dict[str, inspect.Parameter]) -> Dict[str, Any]:
+    """Annotated types of view arguments, for the function schema."""
+    return {
+        name: p.annotation for name, p in arguments.items()
+        if p.annotation is not inspect.Parameter.empty
+    }
+
+def split_parameters(names: Iterable[str], parameters: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Split call parameters into view arguments and request body fields."""
+    kwargs = {}
+    body = {}
+    for name, value in parameters.items():
+        if name in names:
+            kwargs[name] = value
+        else:
+            body[name] = value
+    return kwargs, body
+
+def request_method(method: Optional[str], body: Dict[str, Any]) -> str:
+    """HTTP method of the synthetic request: the configured one, else by body."""
+    if method:
+        return method.upper()
+    return "POST" if body else "GET"
+
+def request_headers(context: MCPContext) -> Dict[str, str]:
+    """Headers for the synthetic request, from the call's metadata.
+
+    A ``headers`` entry that is not an object is ignored.
+    """
+    headers = context.metadata.get("headers") if isinstance(context.metadata, dict) else None
+    if not isinstance(headers, dict):
+        return {}
+    return {str(name): str(value) for name, value in headers.items()}
+
+def query_string(fields: Dict[str, Any]) -> str:
+    """Encode body fields as a query string for ``GET`` requests."""
+    return urlencode({
+        name: json.dumps(value) if isinstance(value, (dict, list)) else value
+        for name, value in fields.items()
+    })
+
+def decode_body(body: bytes, content_type: Optional[str]) -> Any:
+    """Decode a response body: JSON when labelled so, text otherwise."""
+    if not body:
+        return None
+    if content_type and "json" in content_type:
+        return json.loads(body)
+    return body.decode("utf-8", errors="replace")
+
+def view_result(status: int, data: Any) -> Any:
+    """Turn a view's status and decoded body into an MCP function result.
+
+    Error statuses raise ``MCPError`` with the body's ``error``, ``detail``
+    or ``message`` field when there is one.
+    """
+    if status >= 400:
+        raise MCPError(status, _error_message(data))
+    if status != 200:
+        return MCPResponse(data, status=status)
+    return data
+
+def _error_message(data: Any) -> str:
+    """Message for an error response body."""
+    if isinstance(data, dict):
+        for key in ("error", "detail", "message"):
+            if isinstance(data.get(key), str):
+                return data[key]
+    if isinstance(data, str):
+        return data
+    return json.dumps(data, default=str)
@@ -0,0 +1,216 @@
+"""Admission control for MCP function calls.
+
+A ``ConcurrencyLimiter`` bounds how many calls execute at once. Calls over
+the limit wait in a bounded FIFO queue; once the queue is full, or a call
+has waited longer than ``queue_timeout``, further calls are rejected
+immediately instead of piling up work and memory. Rejections carry the
+limiter's status: 503 by default, suited to a registry-wide limit, while
+429 suits a limit on one function::
+
+    registry = MCPRegistry(limiter=ConcurrencyLimiter(AIMDLimit(initial=64), max_queued=256))
+    registry.register(search, limiter=ConcurrencyLimiter(8, max_queued=16, status=429))
+
+The limit may be fixed or an ``AIMDLimit`` that adapts it to the observed
+latency. Streaming calls keep their slot until the stream ends.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Union
+
+from ..config import MCPConfig
+
+class AIMDLimit:
+    """Concurrency limit with additive increase and multiplicative decrease.
+
+    Each call that completes within the latency target while at least half
+    the limit is in use raises the limit by ``1 / limit``, about one per
+    limit's worth of calls. A call slower than the target, or answered with
+    a 5xx status, multiplies the limit by ``backoff``; calls admitted
+    before that decrease do not decrease it again. Without an explicit
+    ``latency_target`` the target is ``tolerance`` times the baseline, the
+    lowest latency seen, which drifts slowly towards recent latencies.
+    """
+
+    def __init__(
+        self,
+        initial: int = 32,
+        min_limit: int = 1,
+        max_limit: int = 1024,
+        backoff: float = 0.9,
+        tolerance: float = 2.0,
+        latency_target: Optional[float] = None
+    ):
+        if not 0 < backoff < 1:
+            raise ValueError("backoff must be between 0 and 1")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.latency_target = latency_target
+        self.baseline: Optional[float] = None
+        self._limit = float(min(max(initial, min_limit), max_limit))
+        self._decreased_at = float("-inf")
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def update(self, started: float, latency: float, in_flight: int, overloaded: bool):
+        """Adjust the limit after a call admitted at ``started`` completes."""
+        if not overloaded:
+            if self.baseline is None or latency < self.baseline:
+                self.baseline = latency
+            else:
+                self.baseline += (latency - self.baseline) * 0.01
+        target = self.latency_target
+        if target is None and self.baseline is not None:
+            target = self.baseline * self.tolerance
+        if overloaded or (target is not None and latency > target):
+            if started >= self._decreased_at:
+                self._limit = max(float(self.min_limit), self._limit * self.backoff)
+                self._decreased_at = time.monotonic()
+        elif in_flight * 2 >= self._limit:
+            self._limit = min(float(self.max_limit), self._limit + 1 / self._limit)
+
+class ConcurrencyLimiter:
+    """Bound concurrent calls, queueing up to ``max_queued`` beyond the limit.
+
+    ``limit`` is a fixed number of calls or an ``AIMDLimit``. Rejected
+    calls are answered with ``status``.
+    """
+
+    def __init__(
+        self,
+        limit: Union[int, AIMDLimit] = 32,
+        max_queued: int = 128,
+        queue_timeout: Optional[float] = None,
+        status: int = 503
+    ):
+        self.adaptive = limit if isinstance(limit, AIMDLimit) else None
+        self._fixed_limit = 0 if self.adaptive is not None else int(limit)
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.status = status
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @classmethod
+    def from_config(cls, config: MCPConfig) -> "ConcurrencyLimiter":
+        """Create the registry-wide limiter configured in an MCPConfig."""
+        limit: Union[int, AIMDLimit] = config.max_inflight or 32
+        if config.adaptive_limit:
+            limit = AIMDLimit(initial=limit, max_limit=max(limit, 1024))
+        return cls(limit, max_queued=config.max_inflight_queued, queue_timeout=config.queue_timeout)
+
+    @property
+    def limit(self) -> int:
+        return self.adaptive.limit if self.adaptive is not None else self._fixed_limit
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> Optional[float]:
+        """Wait for a slot and return the admission time, or None when rejected."""
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return time.monotonic()
+        if len(self._waiters) >= self.max_queued:
+            self.rejected += 1
+            return None
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            if self.queue_timeout is None:
+                await future
+            else:
+                await asyncio.wait_for(future, self.queue_timeout)
+        except BaseException as e:
+            if future.done() and not future.cancelled():
+                # Granted a slot while giving up: hand it to the next call.
+                self.in_flight -= 1
+                self._wake()
+            else:
+                try:
+                    self._waiters.remove(future)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejected += 1
+                return None
+            raise
+        self.admitted += 1
+        return time.monotonic()
+
+    def release(self, started: float, overloaded: bool = False):
+        """Free the slot of a call admitted at ``started``."""
+        in_flight = self.in_flight
+        self.in_flight -= 1
+        if self.adaptive is not None:
+            self.adaptive.update(started, time.monotonic() - started, in_flight, overloaded)
+        self._wake()
+
+    async def run(self, invoke: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Run ``invoke`` in a slot and return its response, or a rejection.
+
+        Responses with a 5xx status count as overload for an adaptive limit.
+        A streaming response holds the slot until its stream is closed.
+        """
+        started = await self.acquire()
+        if started is None:
+            return {"error": "Too many concurrent calls, retry later", "status": self.status}
+        try:
+            response = await invoke()
+        except BaseException as e:
+            self.release(started, not isinstance(e, asyncio.CancelledError))
+            raise
+        if "stream" in response:
+            response["stream"] = hold_stream(
+                response["stream"], lambda overloaded: self.release(started, overloaded)
+            )
+        else:
+            self.release(started, response.get("status", 200) >= 500)
+        return response
+
+    def metrics(self) -> Dict[str, int]:
+        """Current ``limit``, ``in_flight`` and ``queued`` calls and ``admitted``/``rejected`` totals."""
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+    def _wake(self):
+        """Grant free slots to queued calls in arrival order."""
+        while self._waiters and self.in_flight < self.limit:
+            future = self._waiters.popleft()
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+async def hold_stream(stream: AsyncIterator[Any], release: Callable[[bool], None]) -> AsyncIterator[Any]:
+    """Pass a stream through, calling ``release(overloaded)`` when it ends.
+
+    ``overloaded`` is true when the stream failed with a 5xx status or an
+    unexpected exception.
+    """
+    overloaded = False
+    try:
+        async for chunk in stream:
+            yield chunk
+    except Exception as e:
+        overloaded = getattr(e, "status", 500) >= 500
+        raise
+    finally:
+        aclose = getattr(stream, "aclose", None)
+        if aclose is not None:
+            await aclose()
+        release(overloaded)
@@ -0,0 +1,410 @@
+"""ASGI application serving MCP over HTTP, SSE and WebSocket."""
+
+import asyncio
+import json
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs
+
+from .cancellation import InFlightCalls, cancelled_response, is_cancel_message
+from .codecs import JSON_CODEC, Codec, codec_for_content_type, codec_for_subprotocol, codecs_by_name
+from .mcp_protocol import MCPRegistry
+from .metrics import PROMETHEUS_CONTENT_TYPE, is_metrics_message, metrics_response
+from .streaming import collect_stream, encode_frames, is_stream
+from .transport.http_server import MAX_BODY_SIZE, HTTPError, etag_matches, sse_event
+from .transport.base_transport import peer_name
+from .transport.http_transport import response_status, stream_parts
+from .transport.sse_transport import SSESession
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+_INVALID = object()
+
+class MCPASGIApp:
+    """ASGI application exposing a registry's MCP endpoints.
+
+    Serves the same endpoints as the standalone transports, so a registry
+    can be mounted inside an existing ASGI application and answer tool
+    calls on its server's event loop and workers:
+
+    - ``POST /`` dispatches a request, batch or pipeline, as ``HTTPTransport``
+    - ``GET /schema`` returns the schema with an ``ETag``
+    - ``GET /metrics`` returns the registry's call metrics, when it records
+      them, in the Prometheus text format
+    - ``GET /debug/profiles`` returns the profiles of slow calls, when the
+      registry has a profiler
+    - ``GET /sse`` and ``POST /messages?session_id=...`` implement the
+      HTTP+SSE protocol of ``SSETransport``
+    - WebSocket connections on any path behave as ``WebSocketTransport``
+
+    Paths are relative to the mount point (``root_path``). Generator
+    results are streamed as the standalone transports do, and a stream or
+    an SSE session ends as soon as the client disconnects.
+    """
+    def __init__(
+        self,
+        registry: MCPRegistry,
+        max_batch_size: int = 100,
+        batch_concurrency: int = 16,
+        max_concurrency: int = 32,
+        max_queued: int = 128,
+        ping_interval: float = 20.0,
+        codecs: Optional[List[str]] = None,
+        max_body_size: int = MAX_BODY_SIZE,
+        sse_path: str = "/sse",
+        messages_path: str = "/messages"
+    ):
+        self.registry = registry
+        self.max_batch_size = max_batch_size
+        self.batch_concurrency = batch_concurrency
+        self.max_concurrency = max_concurrency
+        self.max_queued = max_queued
+        self.ping_interval = ping_interval
+        self.codecs: List[Codec] = codecs_by_name(codecs)
+        self.max_body_size = max_body_size
+        self.sse_path = sse_path
+        self.messages_path = messages_path
+        self.sessions: Dict[str, SSESession] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Handle one ASGI connection."""
+        if scope["type"] == "http":
+            await self._handle_http(scope, receive, send)
+        elif scope["type"] == "websocket":
+            await self._handle_websocket(scope, receive, send)
+        elif scope["type"] == "lifespan":
+            await self._handle_lifespan(receive, send)
+
+    def close(self):
+        """End all SSE streams and cancel their requests."""
+        for session in list(self.sessions.values()):
+            self._close_session(session)
+
+    async def _handle_lifespan(self, receive: Receive, send: Send):
+        """Answer lifespan events when the app is run on its own."""
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self.registry.get_schema_json()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _handle_http(self, scope: Scope, receive: Receive, send: Send):
+        """Route an HTTP request."""
+        method = scope["method"]
+        path = _route_path(scope)
+        headers = _headers(scope)
+        if method == "GET":
+            if path == "/schema":
+                body, etag = self.registry.get_schema_json()
+                if etag_matches(headers.get("if-none-match"), etag):
+                    await _send_response(send, 304, headers={"ETag": etag})
+                else:
+                    await _send_response(send, 200, body, headers={"ETag": etag})
+            elif path == "/metrics" and self.registry.metrics is not None:
+                body = self.registry.metrics.render().encode()
+                await _send_response(send, 200, body, content_type=PROMETHEUS_CONTENT_TYPE)
+            elif path == "/debug/profiles" and self.registry.profiler is not None:
+                await _send_response(send, 200, self.registry.profiler.render().encode())
+            elif path == self.sse_path:
+                await self._event_stream(scope, receive, send)
+            else:
+                await _send_error(send, 404, "Not found")
+            return
+        if method != "POST":
+            await _send_error(send, 405, "Method not allowed")
+            return
+
+        try:
+            body = await self._read_body(receive)
+        except HTTPError as e:
+            await _send_error(send, e.status, e.message)
+            return
+        if body is None:
+            return
+        codec, response_codec = self._negotiate(headers.get("content-type"), headers.get("accept"))
+        session = None
+        if path == self.messages_path:
+            session_id = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("session_id", [None])[0]
+            session = self.sessions.get(session_id)
+            if session is None:
+                await _send_error(send, 404, "Unknown session")
+                return
+        metrics = self.registry.metrics
+        try:
+            payload = codec.decode(body) if metrics is None else metrics.decode("http", codec, body)
+        except ValueError:
+            await _send_error(send, 400, codec.invalid_message)
+            return
+        if session is not None:
+            await session.submit(lambda message: self._dispatch(message, session.connection), payload)
+            await _send_response(send, 202)
+            return
+
+        result = []
+
+        async def call():
+            response = await self._dispatch(payload, peer_name(scope.get("client")))
+            if is_stream(response) and scope.get("http_version") == "1.0":
+                response = await collect_stream(response)
+            result.append(response)
+
+        try:
+            # A client that disconnects gives up on the call; cancel it.
+            await _until_disconnect(receive, call())
+            if not result:
+                return
+            response = result[0]
+            if not is_stream(response):
+                if metrics is None:
+                    body = response_codec.encode(response)
+                else:
+                    body = metrics.encode("http", response_codec, response)
+        except Exception as e:
+            await _send_error(send, 500, str(e))
+            return
+        if is_stream(response):
+            content_type, parts = stream_parts(response, response_codec, headers.get("accept"))
+            await self._send_stream(receive, send, content_type, parts)
+            return
+        await _send_response(send, response_status(response), body, content_type=response_codec.content_type)
+
+    async def _read_body(self, receive: Receive) -> Optional[bytes]:
+        """Read the request body, or return None if the client went away."""
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return None
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body_size:
+                raise HTTPError(413, "Request body too large")
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    async def _send_stream(self, receive: Receive, send: Send, content_type: str, parts: AsyncIterator[bytes]):
+        """Send a streaming body until it ends or the client disconnects."""
+        async def pump():
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", content_type.encode()), (b"cache-control", b"no-cache")]
+            })
+            async for part in parts:
+                await send({"type": "http.response.body", "body": part, "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+
+        try:
+            await _until_disconnect(receive, pump())
+        finally:
+            await parts.aclose()
+
+    async def _event_stream(self, scope: Scope, receive: Receive, send: Send):
+        """Open an SSE session and send its events until either side ends it."""
+        session = SSESession(uuid.uuid4().hex, self.max_concurrency, self.max_queued, peer_name(scope.get("client")))
+        self.sessions[session.id] = session
+        endpoint = f"{scope.get('root_path', '')}{self.messages_path}?session_id={session.id}"
+
+        async def pump():
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache")]
+            })
+            await send({"type": "http.response.body", "body": sse_event(endpoint, event="endpoint"), "more_body": True})
+            while True:
+                event = await session.next_event(self.ping_interval)
+                if event is None:
+                    break
+                await send({"type": "http.response.body", "body": event, "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+
+        try:
+            await _until_disconnect(receive, pump())
+        finally:
+            self._close_session(session)
+
+    async def _handle_websocket(self, scope: Scope, receive: Receive, send: Send):
+        """Serve MCP messages on a WebSocket connection."""
+        message = await receive()
+        if message["type"] != "websocket.connect":
+            return
+        subprotocol = self._select_subprotocol(scope.get("subprotocols") or [])
+        await send({"type": "websocket.accept", "subprotocol": subprotocol})
+        codec = codec_for_subprotocol(subprotocol, self.codecs)
+        in_flight = asyncio.Semaphore(self.max_concurrency + self.max_queued)
+        running = asyncio.Semaphore(self.max_concurrency)
+        calls = InFlightCalls()
+        peer = peer_name(scope.get("client"))
+        metrics = self.registry.metrics
+        try:
+            while True:
+                message = await receive()
+                if message["type"] != "websocket.receive":
+                    break
+                data = message.get("bytes")
+                if data is None:
+                    data = message.get("text", "")
+                try:
+                    request = codec.decode(data) if metrics is None else metrics.decode("websocket", codec, data)
+                except ValueError:
+                    request = _INVALID
+                if is_cancel_message(request):
+                    calls.cancel(request["cancel"])
+                    continue
+                if is_metrics_message(request):
+                    await send(_websocket_message(codec.encode(metrics_response(metrics, request)), codec))
+                    continue
+                await in_flight.acquire()
+                task = asyncio.ensure_future(self._handle_message(request, send, running, codec, calls, peer))
+                calls.add(task, request)
+                task.add_done_callback(lambda _: in_flight.release())
+        finally:
+            # The client is gone, so nothing left in flight can be delivered.
+            await calls.cancel_all()
+
+    async def _handle_message(
+        self,
+        request: Any,
+        send: Send,
+        running: asyncio.Semaphore,
+        codec: Codec,
+        calls: InFlightCalls,
+        peer: Optional[str] = None
+    ):
+        """Process a single decoded WebSocket message and send its response."""
+        try:
+            if calls.cancelled_by_client():
+                raise asyncio.CancelledError
+            if request is _INVALID:
+                response = {"error": codec.invalid_message, "status": 400}
+            else:
+                async with running:
+                    try:
+                        response = await self.registry.dispatcher.dispatch_message(
+                            request, "websocket", self.max_batch_size, self.batch_concurrency, peer
+                        )
+                    except Exception as e:
+                        response = {"error": str(e), "status": 500}
+                    if is_stream(response):
+                        frames = encode_frames(response, codec)
+                        try:
+                            async for data in frames:
+                                await send(_websocket_message(data, codec))
+                        finally:
+                            await frames.aclose()
+                        return
+        except asyncio.CancelledError:
+            if not calls.cancelled_by_client():
+                raise
+            response = cancelled_response(request)
+        metrics = self.registry.metrics
+        try:
+            data = codec.encode(response) if metrics is None else metrics.encode("websocket", codec, response)
+        except Exception as e:
+            data = codec.encode({
+                "id": response.get("id") if isinstance(response, dict) else None,
+                "error": str(e),
+                "status": 500
+            })
+        await send(_websocket_message(data, codec))
+
+    async def _dispatch(self, payload: Any, connection: Optional[str] = None) -> Any:
+        """Dispatch a decoded request body, which may be a batch."""
+        return await self.registry.dispatcher.dispatch_message(
+            payload, "http", self.max_batch_size, self.batch_concurrency, connection
+        )
+
+    def _negotiate(self, content_type: Optional[str], accept: Optional[str]) -> Tuple[Codec, Codec]:
+        """Pick the request codec and the response codec."""
+        codec = codec_for_content_type(content_type, self.codecs) or JSON_CODEC
+        return codec, codec_for_content_type(accept, self.codecs, codec) or codec
+
+    def _select_subprotocol(self, subprotocols: Sequence[str]) -> Optional[str]:
+        """Accept the first codec subprotocol offered by the client, if any."""
+        available = {codec.subprotocol for codec in self.codecs}
+        for subprotocol in subprotocols:
+            if subprotocol in available:
+                return subprotocol
+        return None
+
+    def _close_session(self, session: SSESession):
+        """Forget a session, end its stream and cancel its requests."""
+        self.sessions.pop(session.id, None)
+        session.close()
+
+def create_asgi_app(registry: MCPRegistry, **options) -> MCPASGIApp:
+    """Create an ASGI application serving a registry's MCP endpoints.
+
+    Mount it in an existing application to serve MCP from the same
+    process, for example with FastAPI::
+
+        app.mount("/mcp", create_asgi_app(registry))
+
+    ``options`` are passed to ``MCPASGIApp``.
+    """
+    return MCPASGIApp(registry, **options)
+
+def _route_path(scope: Scope) -> str:
+    """Request path relative to the mount point."""
+    path = scope.get("path") or "/"
+    root_path = scope.get("root_path", "")
+    # Servers and routers differ on whether ``path`` still includes the prefix.
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    return path or "/"
+
+def _headers(scope: Scope) -> Dict[str, str]:
+    """Request headers keyed by lowercase name."""
+    return {name.decode("latin-1"): value.decode("latin-1") for name, value in scope.get("headers", [])}
+
+async def _until_disconnect(receive: Receive, sender: Awaitable[None]):
+    """Run a response sender, cancelling it if the client disconnects first."""
+    async def disconnected():
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    sending = asyncio.ensure_future(sender)
+    watcher = asyncio.ensure_future(disconnected())
+    try:
+        await asyncio.wait({sending, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in (sending, watcher):
+            task.cancel()
+        await asyncio.gather(sending, watcher, return_exceptions=True)
+    error = None if sending.cancelled() else sending.exception()
+    # Servers raise OSError from send() once the connection is gone.
+    if error is not None and not isinstance(error, OSError):
+        raise error
+
+async def _send_response(
+    send: Send,
+    status: int,
+    body: bytes = b"",
+    content_type: str = "application/json",
+    headers: Optional[Dict[str, str]] = None
+):
+    """Send a complete response."""
+    raw = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in (headers or {}).items()]
+    if status != 304:
+        raw += [(b"content-type", content_type.encode()), (b"content-length", str(len(body)).encode())]
+    await send({"type": "http.response.start", "status": status, "headers": raw})
+    await send({"type": "http.response.body", "body": body})
+
+async def _send_error(send: Send, status: int, message: str):
+    """Send a JSON error response."""
+    await _send_response(send, status, json.dumps({"error": message, "status": status}).encode())
+
+def _websocket_message(data: bytes, codec: Codec) -> Dict[str, Any]:
+    """ASGI send event for an encoded WebSocket message."""
+    if codec.binary:
+        return {"type": "websocket.send", "bytes": data}
+    return {"type": "websocket.send", "text": data.decode()}
@@ -0,0 +1,476 @@
+"""Forward MCP calls to the backend application over pooled HTTP connections.
+
+``BackendProxy`` registers MCP functions whose calls are sent as HTTP
+requests to ``MCPConfig.backend_url``. Requests go through a
+``BackendPool``, which keeps HTTP/1.1 connections open between calls
+instead of connecting once per call:
+
+- at most ``max_connections`` connections are open per backend host;
+  further requests wait for one to be released
+- released connections are reused most recently used first, and those
+  idle for longer than ``idle_timeout`` are closed
+- connecting and each read are bounded by ``connect_timeout`` and
+  ``read_timeout``, reported as 502 and 504 errors
+
+Streaming functions pass the backend's response body to the MCP transport
+as it arrives, one chunk per frame.
+"""
+
+import asyncio
+import codecs
+import json
+import time
+from collections import deque
+from string import Formatter
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple, Type
+from urllib.parse import quote, urlsplit
+
+from ..config import MCPConfig
+from .adapters import decode_body, query_string, request_headers, view_result
+from .mcp_protocol import MCPContext, MCPError, MCPFunction, MCPRegistry
+
+READ_SIZE = 64 * 1024
+
+# Headers describing the connection or the framing, set by the pool itself.
+_HOP_HEADERS = frozenset({
+    "connection", "keep-alive", "proxy-connection", "transfer-encoding", "te",
+    "upgrade", "host", "content-length",
+})
+
+# Methods that are safe to send again when a reused connection turns out stale.
+_IDEMPOTENT = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+class _Connection:
+    """An open connection to a backend host."""
+    __slots__ = ("reader", "writer", "idle_since", "reused")
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.idle_since = 0.0
+        self.reused = False
+
+    def close(self):
+        self.writer.close()
+
+class _HostPool:
+    """Connections to one backend host."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.slots = asyncio.Semaphore(limit)
+        self.idle: Deque[_Connection] = deque()
+        self.in_use = 0
+        self.waiting = 0
+        self.requests = 0
+        self.opened = 0
+        self.reused = 0
+        self.evicted = 0
+
+    def evict(self, idle_timeout: float):
+        """Close idle connections past the idle timeout or closed by the backend."""
+        deadline = time.monotonic() - idle_timeout
+        kept: Deque[_Connection] = deque()
+        for connection in self.idle:
+            if connection.idle_since < deadline or connection.reader.at_eof():
+                connection.close()
+                self.evicted += 1
+            else:
+                kept.append(connection)
+        self.idle = kept
+
+class BackendResponse:
+    """A backend response whose body has not been read yet.
+
+    Read the body with ``read`` or ``iter_chunks``; either returns the
+    connection to the pool once the body is complete. Call ``close`` when
+    giving up on a body early, which closes the connection instead.
+    """
+
+    def __init__(
+        self,
+        pool: "BackendPool",
+        host: _HostPool,
+        connection: _Connection,
+        status: int,
+        headers: Dict[str, str],
+        keep_alive: bool,
+        has_body: bool
+    ):
+        self.status = status
+        self.headers = headers
+        self._pool = pool
+        self._host = host
+        self._connection: Optional[_Connection] = connection
+        self._keep_alive = keep_alive
+        self._has_body = has_body
+        if not has_body:
+            self._release(True)
+
+    @property
+    def content_type(self) -> Optional[str]:
+        return self.headers.get("content-type")
+
+    async def read(self) -> bytes:
+        """Read the whole body."""
+        return b"".join([chunk async for chunk in self.iter_chunks()])
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        """Yield the body in chunks as they arrive from the backend."""
+        if self._connection is None:
+            return
+        reader = self._connection.reader
+        completed = False
+        try:
+            if self.headers.get("transfer-encoding", "").lower().endswith("chunked"):
+                async for chunk in self._chunked(reader):
+                    yield chunk
+            elif "content-length" in self.headers:
+                remaining = int(self.headers["content-length"])
+                while remaining:
+                    chunk = await self._pool._read(reader.read(min(remaining, READ_SIZE)))
+                    if not chunk:
+                        raise MCPError(502, "Backend closed the connection mid-response")
+                    remaining -= len(chunk)
+                    yield chunk
+            else:
+                # Delimited by the backend closing the connection.
+                self._keep_alive = False
+                while True:
+                    chunk = await self._pool._read(reader.read(READ_SIZE))
+                    if not chunk:
+                        break
+                    yield chunk
+            completed = True
+        except (ConnectionError, asyncio.IncompleteReadError):
+            raise MCPError(502, "Backend closed the connection mid-response")
+        finally:
+            self._release(completed and self._keep_alive)
+
+    async def close(self):
+        """Give up on the rest of the body."""
+        self._release(False)
+
+    async def _chunked(self, reader: asyncio.StreamReader) -> AsyncIterator[bytes]:
+        """Decode a chunked transfer-encoded body."""
+        read = self._pool._read
+        while True:
+            line = await read(reader.readline())
+            try:
+                size = int(line.split(b";", 1)[0], 16)
+            except ValueError:
+                raise MCPError(502, "Malformed chunked response from backend")
+            if size == 0:
+                # Skip trailers up to the terminating empty line.
+                while (await read(reader.readline())).strip():
+                    pass
+                return
+            chunk = await read(reader.readexactly(size))
+            await read(reader.readexactly(2))
+            yield chunk
+
+    def _release(self, reusable: bool):
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            self._pool._release(self._host, connection, reusable)
+
+class BackendPool:
+    """Bounded pool of keep-alive HTTP/1.1 connections to backend hosts."""
+
+    def __init__(
+        self,
+        max_connections: int = 10,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        idle_timeout: float = 30.0
+    ):
+        self.max_connections = max_connections
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.idle_timeout = idle_timeout
+        self._hosts: Dict[Tuple[str, str, int], _HostPool] = {}
+        self._closed = False
+
+    @classmethod
+    def from_config(cls, config: MCPConfig) -> "BackendPool":
+        """Create a pool sized and timed from an MCPConfig."""
+        return cls(
+            max_connections=config.backend_pool_size,
+            connect_timeout=config.backend_connect_timeout,
+            read_timeout=config.backend_read_timeout,
+            idle_timeout=config.backend_idle_timeout
+        )
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        body: bytes = b"",
+        headers: Optional[Dict[str, str]] = None
+    ) -> BackendResponse:
+        """Send a request and return the response once its head arrives.
+
+        An idempotent request that fails before any response byte arrives
+        on a reused connection, which the backend may have closed while it
+        sat idle, is retried once on a new connection. Other failures are
+        reported as 502 without sending the request again.
+        """
+        if self._closed:
+            raise RuntimeError("BackendPool is closed")
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname or "localhost", port)
+        host = self._hosts.get(key)
+        if host is None:
+            host = self._hosts[key] = _HostPool(self.max_connections)
+
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {parts.netloc}"]
+        for name, value in (headers or {}).items():
+            if name.lower() not in _HOP_HEADERS:
+                lines.append(f"{name}: {value}")
+        if body or method not in ("GET", "HEAD", "DELETE", "OPTIONS"):
+            lines.append(f"Content-Length: {len(body)}")
+        data = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+        host.waiting += 1
+        try:
+            await host.slots.acquire()
+        finally:
+            host.waiting -= 1
+        host.in_use += 1
+        host.requests += 1
+        try:
+            connection = await self._checkout(host, key)
+            while True:
+                try:
+                    connection.writer.write(data)
+                    status, response_headers, version = await self._read_head(connection.reader)
+                    break
+                except (ConnectionError, asyncio.IncompleteReadError) as e:
+                    connection.close()
+                    answered = isinstance(e, asyncio.IncompleteReadError) and e.partial
+                    if not connection.reused or answered or method not in _IDEMPOTENT:
+                        raise MCPError(502, "Backend closed the connection")
+                    # Other idle connections may be just as stale; retry
+                    # on a new one, which is not retried again.
+                    connection = await self._checkout(host, key, fresh=True)
+                except BaseException:
+                    connection.close()
+                    raise
+        except BaseException:
+            host.in_use -= 1
+            host.slots.release()
+            raise
+
+        keep_alive = response_headers.get("connection", "").lower() != "close" and (
+            version != "HTTP/1.0" or response_headers.get("connection", "").lower() == "keep-alive"
+        )
+        has_body = method != "HEAD" and status not in (204, 304) and not 100 <= status < 200
+        return BackendResponse(self, host, connection, status, response_headers, keep_alive, has_body)
+
+    def metrics(self) -> Dict[str, Dict[str, int]]:
+        """Pool utilization per backend host.
+
+        For each ``scheme://host:port``: ``limit``, connections ``in_use``
+        and ``idle``, requests ``waiting`` for a connection, and the
+        running totals ``requests``, ``opened``, ``reused`` and ``evicted``.
+        """
+        return {
+            f"{scheme}://{hostname}:{port}": {
+                "limit": host.limit,
+                "in_use": host.in_use,
+                "idle": len(host.idle),
+                "waiting": host.waiting,
+                "requests": host.requests,
+                "opened": host.opened,
+                "reused": host.reused,
+                "evicted": host.evicted,
+            }
+            for (scheme, hostname, port), host in self._hosts.items()
+        }
+
+    async def close(self):
+        """Close idle connections; connections in use close when released."""
+        self._closed = True
+        for host in self._hosts.values():
+            while host.idle:
+                host.idle.pop().close()
+
+    async def _checkout(self, host: _HostPool, key: Tuple[str, str, int], fresh: bool = False) -> _Connection:
+        """Take the most recently used idle connection, or open a new one if none or ``fresh``."""
+        host.evict(self.idle_timeout)
+        if host.idle and not fresh:
+            connection = host.idle.pop()
+            connection.reused = True
+            host.reused += 1
+            return connection
+        scheme, hostname, port = key
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(hostname, port, ssl=scheme == "https", limit=READ_SIZE),
+                self.connect_timeout
+            )
+        except asyncio.TimeoutError:
+            raise MCPError(504, f"Timed out connecting to backend {hostname}:{port}")
+        except OSError as e:
+            raise MCPError(502, f"Cannot connect to backend {hostname}:{port}: {e}")
+        host.opened += 1
+        return _Connection(reader, writer)
+
+    async def _read_head(self, reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str], str]:
+        """Read a response status line and headers, skipping interim responses."""
+        while True:
+            try:
+                head = await self._read(reader.readuntil(b"\r\n\r\n"))
+            except asyncio.LimitOverrunError:
+                raise MCPError(502, "Backend response headers too large")
+            lines = head.decode("latin-1").split("\r\n")
+            try:
+                version, status_text = lines[0].split(" ", 2)[:2]
+                status = int(status_text)
+            except ValueError:
+                raise MCPError(502, "Malformed response from backend")
+            if status == 100:
+                continue
+            headers = {}
+            for line in lines[1:]:
+                name, sep, value = line.partition(":")
+                if sep:
+                    headers[name.strip().lower()] = value.strip()
+            return status, headers, version
+
+    async def _read(self, awaitable):
+        """Await one read from the backend, bounded by the read timeout."""
+        try:
+            return await asyncio.wait_for(awaitable, self.read_timeout)
+        except asyncio.TimeoutError:
+            raise MCPError(504, "Timed out waiting for the backend")
+
+    def _release(self, host: _HostPool, connection: _Connection, reusable: bool):
+        """Return a connection to its host pool, or close it."""
+        host.in_use -= 1
+        if reusable and not self._closed and not connection.reader.at_eof():
+            connection.idle_since = time.monotonic()
+            host.idle.append(connection)
+            host.evict(self.idle_timeout)
+        else:
+            connection.close()
+        host.slots.release()
+
+class BackendProxy:
+    """Registers MCP functions that forward calls to the backend application.
+
+    Each function maps to one backend route. ``{name}`` placeholders in the
+    path are filled from the call parameters of that name; the remaining
+    parameters form the JSON body, or the query string for ``GET`` and
+    ``DELETE``. Request headers are taken from the ``headers`` entry of the
+    call's metadata, as for the in-process adapters.
+    """
+
+    def __init__(self, base_url: str, pool: Optional[BackendPool] = None):
+        self.base_url = base_url.rstrip("/")
+        self.pool = pool or BackendPool()
+
+    @classmethod
+    def from_config(cls, config: MCPConfig) -> "BackendProxy":
+        """Proxy to ``config.backend_url`` through a pool configured from it."""
+        if not config.backend_url:
+            raise ValueError("backend_url is not configured")
+        return cls(config.backend_url, BackendPool.from_config(config))
+
+    def register(
+        self,
+        registry: MCPRegistry,
+        name: str,
+        path: str,
+        method: str = "POST",
+        description: Optional[str] = None,
+        parameter_types: Optional[Dict[str, Type]] = None,
+        return_type: Optional[Type] = None,
+        stream: bool = False
+    ) -> MCPFunction:
+        """Register ``name`` as a call to ``method path`` on the backend.
+
+        Non-streaming functions return the decoded body, JSON when the
+        backend labels it so; error statuses become ``MCPError``. With
+        ``stream=True`` the body is forwarded as it arrives: one frame per
+        line for ``application/x-ndjson`` responses, decoded as JSON, and
+        one text frame per received chunk otherwise.
+        """
+        method = method.upper()
+        path_fields = list(dict.fromkeys(field for _, field, _, _ in Formatter().parse(path) if field))
+
+        async def send(context: MCPContext, parameters: Dict[str, Any]) -> BackendResponse:
+            missing = [field for field in path_fields if field not in parameters]
+            if missing:
+                raise MCPError(400, f"Missing path parameter(s): {', '.join(missing)}")
+            fields = dict(parameters)
+            url = self.base_url + path.format(**{
+                field: quote(str(fields.pop(field)), safe="") for field in path_fields
+            })
+            headers = request_headers(context)
+            body = b""
+            if method in ("GET", "DELETE"):
+                if fields:
+                    url += ("&" if "?" in url else "?") + query_string(fields)
+            else:
+                body = json.dumps(fields).encode()
+                headers.setdefault("Content-Type", "application/json")
+            return await self.pool.request(method, url, body, headers)
+
+        if stream:
+            async def call(context: MCPContext, **parameters: Any) -> AsyncIterator[Any]:
+                response = await send(context, parameters)
+                try:
+                    if response.status >= 400:
+                        view_result(response.status, decode_body(await response.read(), response.content_type))
+                    async for chunk in _stream_chunks(response):
+                        yield chunk
+                finally:
+                    await response.close()
+        else:
+            async def call(context: MCPContext, **parameters: Any) -> Any:
+                response = await send(context, parameters)
+                try:
+                    body = await response.read()
+                finally:
+                    await response.close()
+                return view_result(response.status, decode_body(body, response.content_type))
+
+        return registry.register(
+            call,
+            name=name,
+            description=description or f"{method} {path} on the backend",
+            parameter_types=parameter_types,
+            return_type=return_type
+        )
+
+    async def close(self):
+        await self.pool.close()
+
+async def _stream_chunks(response: BackendResponse) -> AsyncIterator[Any]:
+    """Frames for a streamed backend body."""
+    content_type = (response.content_type or "").lower()
+    if "ndjson" in content_type or "jsonl" in content_type:
+        buffer = b""
+        async for chunk in response.iter_chunks():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line)
+        if buffer.strip():
+            yield json.loads(buffer)
+        return
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    async for chunk in response.iter_chunks():
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
@@ -0,0 +1,120 @@
+"""Automatic batching of concurrent calls to an MCP function."""
+
+import asyncio
+import inspect
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from .mcp_protocol import MCPContext
+
+class Batcher:
+    """Collect concurrent calls to a function and run them as one batch.
+
+    ``func`` receives the list of contexts and the list of parameter
+    dictionaries for the collected calls, and returns one result per call
+    in the same order. An ``Exception`` instance in the results fails only
+    the corresponding call. A batch is run once ``max_batch_size`` calls are
+    pending or ``max_delay`` seconds after the first pending call, whichever
+    comes first::
+
+        async def get_users(contexts, calls):
+            users = await User.objects.in_bulk([call["user_id"] for call in calls])
+            return [users.get(call["user_id"]) for call in calls]
+
+        registry.register(get_user, batch=Batcher(get_users, max_delay=0.002))
+
+    ``close`` runs the pending calls and waits for the batches in flight.
+    """
+
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        max_batch_size: int = 64,
+        max_delay: float = 0.005
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.func = func
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.is_async = inspect.iscoroutinefunction(func)
+        self.batches = 0
+        self.calls = 0
+        self._run: Optional[Callable[..., Awaitable[Any]]] = None
+        self._pending: List[Tuple["MCPContext", Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def bind(self, run: Optional[Callable[..., Awaitable[Any]]]):
+        """Set the executor runner used when ``func`` is synchronous."""
+        self._run = run
+
+    async def submit(self, context: "MCPContext", parameters: Dict[str, Any]) -> Any:
+        """Queue one call and wait for its result from the batch."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((context, parameters, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    async def close(self):
+        """Run the pending calls now and wait until every batch has finished."""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _flush(self):
+        """Start a batch with every pending call."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            # The loop only keeps weak references to tasks; hold this one
+            # until it is done.
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple["MCPContext", Dict[str, Any], asyncio.Future]]):
+        """Invoke the batch function and resolve each caller's future."""
+        # Callers that were cancelled while waiting are left out.
+        batch = [call for call in batch if not call[2].done()]
+        if not batch:
+            return
+        self.batches += 1
+        self.calls += len(batch)
+        contexts = [context for context, _, _ in batch]
+        calls = [parameters for _, parameters, _ in batch]
+        try:
+            if self.is_async:
+                results = await self.func(contexts, calls)
+            elif self._run is not None:
+                results = await self._run(self.func, contexts, calls)
+            else:
+                results = await asyncio.to_thread(self.func, contexts, calls)
+            results = list(results)
+            if len(results) != len(batch):
+                raise ValueError(
+                    f"Batch function returned {len(results)} results for {len(batch)} calls"
+                )
+        except asyncio.CancelledError:
+            for _, _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,118 @@
+"""Result caching for idempotent MCP functions."""
+
+import asyncio
+import functools
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+class ResultCache:
+    """LRU cache of function responses with TTL, size bounds and coalescing.
+
+    Entries are keyed by function name, canonicalized parameters and the
+    metadata fields listed in ``vary``. Only successful (status 200)
+    responses are stored. Concurrent calls with the same key share a single
+    execution instead of each running the function.
+
+    Only enable caching for functions whose result depends on nothing but
+    the key, such as idempotent reads.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = 60.0,
+        max_entries: int = 1024,
+        max_bytes: Optional[int] = None,
+        vary: Sequence[str] = ()
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.vary = tuple(vary)
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[float], int]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def make_key(self, name: str, parameters: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Build the canonical cache key for a call."""
+        key = [name, parameters]
+        if self.vary:
+            if not isinstance(metadata, dict):
+                metadata = {}
+            key.append([metadata.get(field) for field in self.vary])
+        return json.dumps(key, sort_keys=True, separators=(",", ":"), default=repr)
+
+    async def get_or_call(self, key: str, call: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Return the cached response for ``key``, or compute it once via ``call``."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at, _ = entry
+            if expires_at is None or expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self._remove(key)
+
+        future = self._inflight.get(key)
+        if future is None:
+            self.misses += 1
+            future = asyncio.ensure_future(call())
+            self._inflight[key] = future
+            future.add_done_callback(functools.partial(self._on_done, key))
+        else:
+            self.coalesced += 1
+        # Shield the shared execution so one caller giving up does not
+        # cancel it for the others.
+        return await asyncio.shield(future)
+
+    def clear(self):
+        """Drop all cached entries."""
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit, miss and size counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+        }
+
+    def _on_done(self, key: str, future: asyncio.Future):
+        """Store a finished shared execution if it succeeded."""
+        self._inflight.pop(key, None)
+        if future.cancelled() or future.exception() is not None:
+            return
+        value = future.result()
+        if value.get("status") == 200:
+            self._store(key, value)
+
+    def _store(self, key: str, value: Dict[str, Any]):
+        """Insert an entry and evict least recently used ones over the bounds."""
+        size = len(json.dumps(value, default=repr)) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        self._remove(key)
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._entries[key] = (value, expires_at, size)
+        self.bytes += size
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self.bytes > self.max_bytes
+        ):
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        """Remove an entry if present."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
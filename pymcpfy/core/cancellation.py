@@ -0,0 +1,146 @@
+"""Deadlines and cancellation of MCP calls.
+
+A call ends with status 504 once its deadline passes. The deadline is the
+earlier of the function's ``timeout``, given at registration, and the
+client's, sent in the request metadata either as ``timeout`` (seconds
+from now) or ``deadline`` (a Unix timestamp)::
+
+    {"id": "1", "function": "search", "parameters": {...}, "metadata": {"timeout": 2.5}}
+
+Over WebSocket a client can also give up on a call it sent with a
+``{"cancel": <id>}`` message; the call is answered with status 499. Calls
+still running when their connection closes are cancelled as well.
+
+Cancelling a coroutine function stops it at its next ``await``, and calls
+still waiting for an executor thread never start. Synchronous functions
+already running in a thread cannot be interrupted: they can check
+``context.cancelled`` or ``context.remaining()`` to stop early.
+"""
+
+import asyncio
+import inspect
+import time
+from typing import Any, AsyncIterator, Awaitable, Dict, Optional, Set
+
+from .mcp_protocol import MCPContext, MCPError
+
+CANCELLED_STATUS = 499
+
+def deadline_from_metadata(metadata: Any) -> Optional[float]:
+    """The ``time.monotonic()`` deadline a client requested, if any."""
+    if not metadata or not isinstance(metadata, dict):
+        return None
+    deadline = None
+    timeout = metadata.get("timeout")
+    if isinstance(timeout, (int, float)) and not isinstance(timeout, bool):
+        deadline = time.monotonic() + timeout
+    absolute = metadata.get("deadline")
+    if isinstance(absolute, (int, float)) and not isinstance(absolute, bool):
+        converted = time.monotonic() + (absolute - time.time())
+        deadline = converted if deadline is None else min(deadline, converted)
+    return deadline
+
+async def until_deadline(context: MCPContext, call: Awaitable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Await a call's response, cancelling it at ``context.deadline``.
+
+    A streaming response is bounded by the same deadline: the stream ends
+    with a 504 error frame once it passes.
+    """
+    remaining = context.deadline - time.monotonic()
+    try:
+        if remaining <= 0:
+            raise asyncio.TimeoutError
+        response = await asyncio.wait_for(call, remaining)
+    except asyncio.TimeoutError:
+        if asyncio.iscoroutine(call):
+            call.close()
+        context.cancelled = True
+        return {"error": "Deadline exceeded", "status": 504}
+    if "stream" in response:
+        response["stream"] = _bounded_stream(response["stream"], context)
+    return response
+
+async def _bounded_stream(stream: AsyncIterator[Any], context: MCPContext) -> AsyncIterator[Any]:
+    """Pass a stream through until the context's deadline."""
+    try:
+        while True:
+            remaining = context.deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                chunk = await asyncio.wait_for(stream.__anext__(), remaining)
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError:
+                context.cancelled = True
+                raise MCPError(504, "Deadline exceeded")
+            yield chunk
+    finally:
+        aclose = getattr(stream, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+class InFlightCalls:
+    """Tasks running calls on one connection, cancellable by request id.
+
+    Only single requests are registered by id; a batch is cancelled as a
+    whole when its connection closes.
+    """
+
+    def __init__(self):
+        self.tasks: Set[asyncio.Task] = set()
+        self._by_id: Dict[Any, asyncio.Task] = {}
+        self._cancelled: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def add(self, task: asyncio.Task, request: Any):
+        """Track the task running ``request``."""
+        self.tasks.add(task)
+        request_id = request.get("id") if isinstance(request, dict) else None
+        if request_id is not None and isinstance(request_id, (str, int)):
+            self._by_id[request_id] = task
+
+            def forget(_: asyncio.Task):
+                if self._by_id.get(request_id) is task:
+                    del self._by_id[request_id]
+            task.add_done_callback(forget)
+        task.add_done_callback(self._done)
+
+    def cancel(self, request_id: Any) -> bool:
+        """Cancel the call with ``request_id`` at the client's request."""
+        task = self._by_id.get(request_id) if isinstance(request_id, (str, int)) else None
+        if task is None or task.done():
+            return False
+        self._cancelled.add(task)
+        if inspect.getcoroutinestate(task.get_coro()) != inspect.CORO_CREATED:
+            # A task cancelled before it starts never runs its handlers, so
+            # one that has not started sees ``cancelled_by_client`` instead.
+            task.cancel()
+        return True
+
+    def cancelled_by_client(self) -> bool:
+        """Whether the current task was cancelled by a cancel message."""
+        return asyncio.current_task() in self._cancelled
+
+    async def cancel_all(self):
+        """Cancel every call, as when the connection has closed, and wait for them."""
+        tasks = list(self.tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _done(self, task: asyncio.Task):
+        self.tasks.discard(task)
+        self._cancelled.discard(task)
+
+def is_cancel_message(message: Any) -> bool:
+    """Whether a decoded message asks to cancel an earlier request."""
+    return isinstance(message, dict) and "cancel" in message and "function" not in message
+
+def cancelled_response(request: Any) -> Dict[str, Any]:
+    """The response sent for a call the client cancelled."""
+    request_id = request.get("id") if isinstance(request, dict) else None
+    return {"id": request_id, "error": "Cancelled", "status": CANCELLED_STATUS}
@@ -0,0 +1,149 @@
+"""Wire codecs for MCP messages.
+
+JSON is always available and uses orjson when it is installed. MessagePack
+is available when the ``msgpack`` package is installed. Transports pick a
+codec per connection: from the WebSocket subprotocol or from the HTTP
+``Content-Type``/``Accept`` headers.
+"""
+
+import abc
+import json
+from typing import Any, List, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+class Codec(abc.ABC):
+    """Encode and decode MCP messages.
+
+    ``decode`` raises ``ValueError`` for malformed input.
+    """
+    name: str = ""
+    content_type: str = ""
+    subprotocol: str = ""
+    binary: bool = False
+    invalid_message: str = "Invalid message"
+
+    @abc.abstractmethod
+    def encode(self, message: Any) -> bytes:
+        """Encode a message to bytes."""
+
+    @abc.abstractmethod
+    def decode(self, data: Union[bytes, str]) -> Any:
+        """Decode a message from bytes or text."""
+
+class JSONCodec(Codec):
+    """JSON codec using the standard library."""
+    name = "json"
+    content_type = "application/json"
+    subprotocol = "mcp.json"
+    invalid_message = "Invalid JSON"
+
+    def encode(self, message: Any) -> bytes:
+        return json.dumps(message).encode()
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+class OrjsonCodec(JSONCodec):
+    """JSON codec using orjson, falling back to the standard library."""
+    name = "orjson"
+
+    def encode(self, message: Any) -> bytes:
+        try:
+            return orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # orjson rejects some values json accepts, e.g. integers over 64 bits
+            return super().encode(message)
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+class MsgPackCodec(Codec):
+    """Binary MessagePack codec."""
+    name = "msgpack"
+    content_type = "application/msgpack"
+    subprotocol = "mcp.msgpack"
+    binary = True
+    invalid_message = "Invalid MessagePack"
+
+    def encode(self, message: Any) -> bytes:
+        return msgpack.packb(message, use_bin_type=True)
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        if isinstance(data, str):
+            raise ValueError("MessagePack messages must be binary")
+        try:
+            return msgpack.unpackb(data, raw=False)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(str(e)) from e
+
+JSON_CODEC: Codec = OrjsonCodec() if orjson is not None else JSONCodec()
+
+_MSGPACK_CONTENT_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+def available_codecs() -> List[Codec]:
+    """Codecs usable in this environment, JSON first."""
+    codecs = [JSON_CODEC]
+    if msgpack is not None:
+        codecs.append(MsgPackCodec())
+    return codecs
+
+def get_codec(name: str) -> Codec:
+    """Get a codec by name ("json", "orjson" or "msgpack")."""
+    if name == "json":
+        return JSON_CODEC
+    if name == "orjson":
+        if orjson is None:
+            raise ValueError("orjson is not installed")
+        return OrjsonCodec()
+    if name == "msgpack":
+        if msgpack is None:
+            raise ValueError("msgpack is not installed")
+        return MsgPackCodec()
+    raise ValueError(f"Unknown codec: {name}")
+
+def codec_for_content_type(
+    content_type: Optional[str],
+    codecs: List[Codec],
+    default: Codec = JSON_CODEC
+) -> Optional[Codec]:
+    """Pick the codec for a Content-Type or Accept value.
+
+    A missing or wildcard value selects ``default``; an unsupported one
+    returns None.
+    """
+    if not content_type:
+        return default
+    for media_type in content_type.split(","):
+        media_type = media_type.split(";", 1)[0].strip().lower()
+        if media_type in ("*/*", "application/*"):
+            return default
+        if media_type in _MSGPACK_CONTENT_TYPES:
+            media_type = MsgPackCodec.content_type
+        for codec in codecs:
+            if codec.content_type == media_type:
+                return codec
+    return None
+
+def codec_for_subprotocol(subprotocol: Optional[str], codecs: List[Codec]) -> Codec:
+    """Pick the codec for a negotiated WebSocket subprotocol, defaulting to JSON."""
+    for codec in codecs:
+        if codec.subprotocol == subprotocol:
+            return codec
+    return JSON_CODEC
+
+def codecs_by_name(names: Optional[List[str]]) -> List[Codec]:
+    """Resolve a list of codec names, or all available codecs when None."""
+    if names is None:
+        return available_codecs()
+    return [get_codec(name) for name in names]
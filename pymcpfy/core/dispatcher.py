@@ -0,0 +1,260 @@
+"""Request dispatch shared by all MCP transports."""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Dict, List, Optional, Union
+
+from .cancellation import deadline_from_metadata, until_deadline
+from .mcp_protocol import Invoker, MCPContext, MCPError, MCPRegistry
+from .pipeline import plan_pipeline, resolve_refs
+from .streaming import collect_stream
+
+class MCPDispatcher:
+    """Route MCP requests to the invokers compiled by an MCPRegistry."""
+
+    def __init__(self, registry: MCPRegistry):
+        self.registry = registry
+
+    async def dispatch_message(
+        self,
+        message: Any,
+        transport: str,
+        max_batch_size: int = 100,
+        batch_concurrency: int = 16,
+        connection: Optional[str] = None
+    ) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """Execute a single request, or a JSON-RPC style array of requests."""
+        if isinstance(message, list):
+            return await self.dispatch_batch(message, transport, max_batch_size, batch_concurrency, connection)
+        return await self.dispatch(message, transport, connection)
+
+    async def dispatch_batch(
+        self,
+        requests: List[Any],
+        transport: str,
+        max_batch_size: int = 100,
+        concurrency: int = 16,
+        connection: Optional[str] = None
+    ) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """Execute an array of requests concurrently.
+
+        At most ``concurrency`` requests of the batch run at once. Responses
+        are returned in request order, each carrying its request's ``id``;
+        streaming results are collected into lists. An empty or oversized
+        batch is rejected with a single error response.
+        """
+        if not requests:
+            return {"error": "Empty batch", "status": 400}
+        if len(requests) > max_batch_size:
+            return {"error": f"Batch exceeds {max_batch_size} requests", "status": 413}
+        if len(requests) <= concurrency:
+            return list(await asyncio.gather(*[
+                self._dispatch_collected(request, transport, connection) for request in requests
+            ]))
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def dispatch(request: Any) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._dispatch_collected(request, transport, connection)
+
+        return list(await asyncio.gather(*[dispatch(request) for request in requests]))
+
+    def dispatch(
+        self,
+        request: Dict[str, Any],
+        transport: str,
+        connection: Optional[str] = None
+    ) -> Awaitable[Dict[str, Any]]:
+        """Execute a single ``{"function", "parameters", "id"}`` request.
+
+        Requests with a ``pipeline`` list instead of a function run as a
+        pipeline; see ``dispatch_pipeline``. Function calls are checked
+        against the registry's per-client rate limiter, if any, then wait
+        for a slot of its limiter, and are rejected when either is full.
+        Generator functions return a response with a ``stream`` of chunks,
+        see ``pymcpfy.core.streaming``. A ``timeout`` or ``deadline`` in
+        the request metadata bounds the whole call, including its wait for
+        the limiters, and a call past it is answered with 504; see
+        ``pymcpfy.core.cancellation``. The registry's ``metrics``, if any,
+        count and time the call.
+
+        Returns an awaitable of the response. When no limiter, metrics or
+        deadline apply, that is the compiled invoker's own coroutine, so
+        dispatch adds no coroutine frame to the call.
+        """
+        if not isinstance(request, dict):
+            return _resolved({"error": "Invalid request", "status": 400})
+
+        request_id = request.get("id")
+        function_name = request.get("function")
+        if not function_name:
+            if "pipeline" in request:
+                return self.dispatch_pipeline(request, transport, connection=connection)
+            return _resolved({
+                "id": request_id,
+                "error": "Missing function name",
+                "status": 400
+            })
+
+        if not isinstance(function_name, str):
+            return _resolved({"id": request_id, "error": "Function name must be a string", "status": 400})
+        registry = self.registry
+        invoker = registry.invokers.get(function_name)
+        if invoker is None:
+            return _resolved({
+                "id": request_id,
+                "error": f"Function {function_name} not found",
+                "status": 404
+            })
+
+        parameters = request.get("parameters")
+        if parameters is None:
+            parameters = {}
+        elif not isinstance(parameters, dict):
+            return _resolved({"id": request_id, "error": "Parameters must be an object", "status": 400})
+        metadata = request.get("metadata")
+        if metadata is None:
+            metadata = {}
+        elif not isinstance(metadata, dict):
+            return _resolved({"id": request_id, "error": "Metadata must be an object", "status": 400})
+        context = MCPContext(request_id, metadata, transport, request, connection)
+        if metadata:
+            context.deadline = deadline_from_metadata(metadata)
+        if registry.profiler is not None:
+            context.received = time.perf_counter()
+        if (
+            context.deadline is None
+            and registry.limiter is None
+            and registry.rate_limiter is None
+            and registry.metrics is None
+        ):
+            return invoker(context, parameters)
+        return self._call(function_name, invoker, context, parameters)
+
+    async def _call(
+        self,
+        function_name: str,
+        invoker: Invoker,
+        context: MCPContext,
+        parameters: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Invoke a call through the registry's limiters, metrics and deadline."""
+        limiter = self.registry.limiter
+        rate_limiter = self.registry.rate_limiter
+        metrics = self.registry.metrics
+        if metrics is not None:
+            series = metrics.series(function_name, context.transport)
+        if limiter is None and rate_limiter is None:
+            if context.deadline is None:
+                return await metrics.call(series, invoker, context, parameters)
+            if metrics is not None:
+                invoker = metrics.timed(series, invoker, False)
+            call = invoker(context, parameters)
+        else:
+            if metrics is not None:
+                invoker = metrics.timed(series, invoker, True)
+            if limiter is None:
+                invoke = lambda: invoker(context, parameters)
+            else:
+                invoke = lambda: limiter.run(lambda: invoker(context, parameters))
+            # Per-client quotas first, so a throttled client never holds a
+            # slot of the shared limit.
+            call = invoke() if rate_limiter is None else rate_limiter.run(context, invoke)
+
+        if context.deadline is not None:
+            call = until_deadline(context, call)
+        if metrics is not None:
+            call = metrics.track(series, call)
+        response = await call
+        response.setdefault("id", context.request_id)
+        return response
+
+    async def dispatch_pipeline(
+        self,
+        request: Dict[str, Any],
+        transport: str,
+        max_steps: int = 100,
+        connection: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Execute a pipeline of dependent calls, see ``pymcpfy.core.pipeline``.
+
+        Each step starts once the steps it references have completed, and
+        steps whose dependencies failed are answered with 424. The combined
+        response maps step ids to their responses under ``data``. A
+        ``timeout`` or ``deadline`` in the pipeline's metadata bounds the
+        pipeline as a whole.
+        """
+        request_id = request.get("id")
+        steps = request.get("pipeline")
+        try:
+            dependencies = plan_pipeline(steps, max_steps)
+        except MCPError as e:
+            return {"id": request_id, "error": e.message, "status": e.status}
+
+        metadata = request.get("metadata")
+        results: Dict[str, Dict[str, Any]] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run(step: Dict[str, Any]) -> Dict[str, Any]:
+            step_id = step["id"]
+            for dependency in dependencies[step_id]:
+                if (await tasks[dependency]).get("status") != 200:
+                    return {"id": step_id, "error": f"Dependency {dependency} failed", "status": 424}
+            try:
+                parameters = resolve_refs(step.get("parameters") or {}, results)
+            except MCPError as e:
+                return {"id": step_id, "error": e.message, "status": e.status}
+            response = await self._dispatch_collected({
+                "id": step_id,
+                "function": step.get("function"),
+                "parameters": parameters,
+                "metadata": step.get("metadata", metadata)
+            }, transport, connection)
+            results[step_id] = response
+            return response
+
+        for step in steps:
+            tasks[step["id"]] = asyncio.ensure_future(run(step))
+        gathered = asyncio.gather(*tasks.values())
+        deadline = deadline_from_metadata(metadata)
+        try:
+            if deadline is None:
+                responses = await gathered
+            else:
+                try:
+                    responses = await asyncio.wait_for(gathered, max(0.0, deadline - time.monotonic()))
+                except asyncio.TimeoutError:
+                    return {"id": request_id, "error": "Deadline exceeded", "status": 504}
+        finally:
+            # Steps still running when the pipeline fails, times out or is
+            # cancelled would otherwise keep running unowned.
+            for task in tasks.values():
+                task.cancel()
+        return {
+            "id": request_id,
+            "data": dict(zip(tasks.keys(), responses)),
+            "status": 200,
+            "metadata": {}
+        }
+
+    async def _dispatch_collected(
+        self,
+        request: Any,
+        transport: str,
+        connection: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Dispatch a request, collecting a streaming result into one response.
+
+        An unexpected error is answered with a 500 for this request alone,
+        so it cannot fail the batch or pipeline the request belongs to.
+        """
+        try:
+            return await collect_stream(await self.dispatch(request, transport, connection))
+        except Exception as e:
+            request_id = request.get("id") if isinstance(request, dict) else None
+            return {"id": request_id, "error": str(e), "status": 500}
+
+async def _resolved(response: Dict[str, Any]) -> Dict[str, Any]:
+    """An awaitable of a response that is already known."""
+    return response
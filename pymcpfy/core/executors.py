@@ -0,0 +1,103 @@
+"""Executors for running synchronous MCP functions."""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+from ..config import MCPConfig
+
+Runner = Callable[..., Awaitable[Any]]
+
+class ExecutorManager:
+    """Named executors that synchronous MCP functions run in.
+
+    Functions pick an executor by name when registered:
+
+    - ``None`` or ``"default"``: the shared thread pool of size
+      ``thread_pool_size``, or the event loop's default executor
+      (``asyncio.to_thread``) when no size is configured.
+    - ``"process"``: a process pool of size ``process_pool_size`` for
+      CPU-bound functions. The function, its arguments and its result must
+      be picklable.
+    - any name added with ``add_thread_pool``: a dedicated bounded thread
+      pool, so slow functions cannot starve the others.
+
+    An ``Executor`` instance may also be passed directly. Pools are created
+    on first use and are shut down by ``shutdown``.
+    """
+
+    def __init__(
+        self,
+        thread_pool_size: Optional[int] = None,
+        process_pool_size: Optional[int] = None,
+        thread_pools: Optional[Dict[str, int]] = None
+    ):
+        self.thread_pool_size = thread_pool_size
+        self.process_pool_size = process_pool_size
+        self._pool_sizes: Dict[str, int] = dict(thread_pools or {})
+        self._executors: Dict[str, Executor] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: MCPConfig) -> "ExecutorManager":
+        """Create executors sized from an MCPConfig."""
+        return cls(
+            thread_pool_size=config.thread_pool_size,
+            process_pool_size=config.process_pool_size,
+            thread_pools=config.executors
+        )
+
+    def add_thread_pool(self, name: str, size: int):
+        """Declare a dedicated thread pool for functions registered with ``executor=name``."""
+        if name in ("default", "process"):
+            raise ValueError(f"Executor name {name} is reserved")
+        self._pool_sizes[name] = size
+
+    def runner(self, executor: Union[str, Executor, None] = None) -> Runner:
+        """Get a coroutine function ``run(func, *args, **kwargs)`` for an executor."""
+        if isinstance(executor, Executor):
+            return functools.partial(self._run, lambda: executor, isinstance(executor, ProcessPoolExecutor))
+        if executor in (None, "default"):
+            if self.thread_pool_size is None:
+                return asyncio.to_thread
+            return functools.partial(self._run, lambda: self._get("default"), False)
+        if executor == "process":
+            return functools.partial(self._run, lambda: self._get("process"), True)
+        if executor not in self._pool_sizes:
+            raise ValueError(f"Unknown executor: {executor}")
+        return functools.partial(self._run, lambda: self._get(executor), False)
+
+    def shutdown(self, wait: bool = True):
+        """Shut down all pools created so far."""
+        with self._lock:
+            executors, self._executors = self._executors, {}
+        for executor in executors.values():
+            executor.shutdown(wait=wait)
+
+    @staticmethod
+    async def _run(get_executor: Callable[[], Executor], in_process: bool, func: Callable, *args, **kwargs) -> Any:
+        """Run ``func`` in an executor, propagating context variables to threads."""
+        loop = asyncio.get_running_loop()
+        if in_process:
+            call = functools.partial(func, *args, **kwargs)
+        else:
+            call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+        return await loop.run_in_executor(get_executor(), call)
+
+    def _get(self, name: str) -> Executor:
+        """Get or lazily create a named pool."""
+        executor = self._executors.get(name)
+        if executor is None:
+            with self._lock:
+                executor = self._executors.get(name)
+                if executor is None:
+                    if name == "process":
+                        executor = ProcessPoolExecutor(max_workers=self.process_pool_size)
+                    else:
+                        size = self.thread_pool_size if name == "default" else self._pool_sizes[name]
+                        executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"pymcpfy-{name}")
+                    self._executors[name] = executor
+        return executor
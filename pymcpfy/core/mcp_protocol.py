@@ -1,9 +1,32 @@
 """Core MCP protocol implementation for PyMCPfy."""
 
+import asyncio
+import copy
+import hashlib
+import inspect
+import json
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Optional, Type, Union
+from typing import (
+    TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Set, Tuple, Type, Union
+)
 from pydantic import BaseModel
 
+from .admission import ConcurrencyLimiter
+from .batching import Batcher
+from .cache import ResultCache
+from .metrics import CallMetrics
+from .profiling import CallProfiler
+from .ratelimit import RateLimiter
+from .executors import ExecutorManager
+from .schema_generator import SchemaGenerator
+
+if TYPE_CHECKING:
+    from .dispatcher import MCPDispatcher
+
+Invoker = Callable[["MCPContext", Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
 class MCPSchema(BaseModel):
     """Schema for an MCP-exposed function."""
     name: str
@@ -14,11 +37,40 @@ class MCPSchema(BaseModel):
 
 @dataclass
 class MCPContext:
-    """Context object passed to MCP-wrapped functions."""
+    """Context object passed to MCP-wrapped functions.
+
+    ``connection`` identifies the client connection the request arrived
+    on, such as its ``host:port`` peer address, when the transport knows it.
+
+    ``deadline`` is the ``time.monotonic()`` time by which the call must
+    finish, if any, and ``cancelled`` is set once the call has been given
+    up on; see ``pymcpfy.core.cancellation``. Synchronous functions, which
+    cannot be interrupted, can check them to stop early.
+
+    ``received`` is the ``time.perf_counter()`` time the dispatcher
+    received the call, set when the registry has a profiler.
+    """
     request_id: str
     metadata: Dict[str, Any]
     transport: str
     raw_request: Any
+    connection: Optional[str] = None
+    deadline: Optional[float] = None
+    cancelled: bool = False
+    received: Optional[float] = None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left until the deadline, or None without one."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+class MCPError(Exception):
+    """Error raised by MCP-exposed functions to return a specific status."""
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
 
 class MCPResponse:
     """Wrapper for responses from MCP-exposed functions."""
@@ -35,6 +87,23 @@ class MCPResponse:
             "metadata": self.metadata
         }
 
+_STREAM_END = object()
+
+async def _iterate_sync(generator: Iterator[Any], run: Callable[..., Awaitable[Any]]) -> AsyncIterator[Any]:
+    """Drive a synchronous generator from the event loop via an executor."""
+    try:
+        while True:
+            item = await run(next, generator, _STREAM_END)
+            if item is _STREAM_END:
+                return
+            yield item
+    finally:
+        try:
+            await run(generator.close)
+        except ValueError:
+            # Still running in the executor after a cancellation.
+            pass
+
 class MCPFunction:
     """Wrapper for functions exposed via MCP."""
     def __init__(
@@ -44,54 +113,285 @@ class MCPFunction:
         description: Optional[str] = None,
         parameter_types: Optional[Dict[str, Type]] = None,
         return_type: Optional[Type] = None,
-        is_async: bool = False
+        is_async: bool = False,
+        executor: Union[str, Executor, None] = None,
+        cache: Optional[ResultCache] = None,
+        batch: Optional[Batcher] = None,
+        limiter: Optional[ConcurrencyLimiter] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        timeout: Optional[float] = None
     ):
         self.func = func
         self.name = name or func.__name__
         self.description = description or func.__doc__ or ""
         self.parameter_types = parameter_types or {}
         self.return_type = return_type
-        self.is_async = is_async
+        self.is_async = is_async or inspect.iscoroutinefunction(func)
+        self.is_stream = inspect.isasyncgenfunction(func) or inspect.isgeneratorfunction(func)
+        self.executor = executor
+        self.cache = cache
+        self.batch = batch
+        self.limiter = limiter
+        self.rate_limiter = rate_limiter
+        self.timeout = timeout
 
-    def generate_schema(self) -> MCPSchema:
-        """Generate MCP schema for the function."""
+    def generate_schema(self, defs: Optional[Dict[str, Any]] = None) -> MCPSchema:
+        """Generate MCP schema for the function.
+
+        When ``defs`` is given, Pydantic models are emitted as ``$ref``
+        entries into it rather than inlined. Types not given explicitly and
+        parameter descriptions come from the function's signature and
+        docstring, inspected once per function.
+        """
+        try:
+            inspected, descriptions, inspected_return = SchemaGenerator._inspect_function(self.func)
+        except (TypeError, ValueError, NameError):
+            # No signature or unresolvable annotations.
+            inspected, descriptions, inspected_return = [], {}, Any
         parameters = {}
-        for name, type_ in self.parameter_types.items():
+        for name, type_ in (self.parameter_types or dict(inspected)).items():
             parameters[name] = {
-                "type": self._get_type_schema(type_),
-                "description": f"Parameter {name}"  # Could be enhanced with docstring parsing
+                "type": self._get_type_schema(type_, defs),
+                "description": descriptions.get(name, f"Parameter {name}")
             }
 
         return MCPSchema(
             name=self.name,
             description=self.description,
             parameters=parameters,
-            return_type=self._get_type_schema(self.return_type or Any),
+            return_type=self._get_type_schema(self.return_type or inspected_return, defs),
             is_async=self.is_async
         )
 
+    def compile(
+        self,
+        executors: Optional[ExecutorManager] = None,
+        profiler: Optional[CallProfiler] = None
+    ) -> Invoker:
+        """Build the invoker transports use to call this function.
+
+        The call path, the executor synchronous functions run in, the
+        result cache, the batcher, the concurrency and rate limiters and
+        the accepted parameter names are resolved once here. Cache hits do
+        not count against the limiters. The invoker returns the response
+        dictionary, mapping argument mismatches to 400, ``MCPError`` to its
+        status and other exceptions to 500. With a ``timeout``, a call still running,
+        or waiting for a limiter, that many seconds after it started is
+        cancelled and answered with 504.
+
+        Generator and async generator functions are invoked lazily: their
+        response carries an async iterator of chunks under ``stream``
+        instead of ``data``, and the transport pulls chunks as it sends
+        them. Synchronous generators advance in their executor, one chunk
+        per call, so they cannot use the process pool.
+
+        With a ``profiler``, slow and sampled calls are recorded, see
+        ``pymcpfy.core.profiling``. Synchronous functions are then timed and
+        profiled inside their executor thread, except in the process pool,
+        which needs the function itself to pickle it.
+        """
+        func = self.func
+        is_async = self.is_async
+        executors = executors or ExecutorManager()
+        run = None if is_async else executors.runner(self.executor)
+        accepted, required = self._parameter_spec()
+        is_stream = self.is_stream
+        is_async_stream = inspect.isasyncgenfunction(func)
+        batch = self.batch
+        if is_stream and (batch is not None or self.cache is not None):
+            raise ValueError(f"Streaming function {self.name} cannot be cached or batched")
+        if batch is not None:
+            batch.bind(None if batch.is_async else executors.runner(self.executor))
+        in_process = self.executor == "process" or isinstance(self.executor, ProcessPoolExecutor)
+        if profiler is not None and not (is_async or is_stream or in_process):
+            func = profiler.wrap_sync(func)
+
+        def bind_error(parameters: Dict[str, Any]) -> Optional[MCPError]:
+            if accepted is not None and not parameters.keys() <= accepted:
+                unexpected = ", ".join(sorted(parameters.keys() - accepted))
+                return MCPError(400, f"Unexpected parameters: {unexpected}")
+            if not parameters.keys() >= required:
+                missing = ", ".join(sorted(required - parameters.keys()))
+                return MCPError(400, f"Missing parameters: {missing}")
+            return None
+
+        async def execute(context: MCPContext, parameters: Dict[str, Any]) -> Dict[str, Any]:
+            try:
+                try:
+                    if batch is not None:
+                        # Batched calls never reach func, so validate up front.
+                        error = bind_error(parameters)
+                        if error is not None:
+                            raise error
+                        result = await batch.submit(context, parameters)
+                    elif is_stream:
+                        if is_async_stream:
+                            stream = func(context, **parameters)
+                        else:
+                            stream = _iterate_sync(func(context, **parameters), run)
+                        return {"stream": stream, "status": 200, "metadata": {}, "id": context.request_id}
+                    elif is_async:
+                        result = await func(context, **parameters)
+                    else:
+                        result = await run(func, context, **parameters)
+                except TypeError:
+                    # Report bad arguments as a client error rather than a
+                    # failure of the function itself.
+                    error = bind_error(parameters)
+                    if error is None:
+                        raise
+                    raise error
+            except asyncio.CancelledError:
+                context.cancelled = True
+                raise
+            except MCPError as e:
+                return {"error": e.message, "status": e.status, "id": context.request_id}
+            except Exception as e:
+                return {"error": str(e), "status": 500, "id": context.request_id}
+
+            if isinstance(result, MCPResponse):
+                response = result.to_dict()
+                response["id"] = context.request_id
+                return response
+            return {"data": result, "status": 200, "metadata": {}, "id": context.request_id}
+
+        # Each optional feature below adds its layer only when set, so a
+        # plain function is invoked through ``execute`` alone.
+        unlayered = execute
+        if profiler is not None and not is_stream:
+            name = self.name
+            unprofiled = execute
+
+            async def execute(context: MCPContext, parameters: Dict[str, Any]) -> Dict[str, Any]:
+                return await profiler.run(name, unprofiled, context, parameters)
+
+        limiter = self.limiter
+        if limiter is not None:
+            unlimited = execute
+
+            async def execute(context: MCPContext, parameters: Dict[str, Any]) -> Dict[str, Any]:
+                return await limiter.run(lambda: unlimited(context, parameters))
+
+        rate_limiter = self.rate_limiter
+        if rate_limiter is not None:
+            unthrottled = execute
+
+            async def execute(context: MCPContext, parameters: Dict[str, Any]) -> Dict[str, Any]:
+                return await rate_limiter.run(context, lambda: unthrottled(context, parameters))
+
+        timeout = self.timeout
+        if timeout is not None:
+            from .cancellation import until_deadline
+            untimed = execute
+
+            async def execute(context: MCPContext, parameters: Dict[str, Any]) -> Dict[str, Any]:
+                deadline = time.monotonic() + timeout
+                if context.deadline is None or deadline < context.deadline:
+                    context.deadline = deadline
+                return await until_deadline(context, untimed(context, parameters))
+
+        cache = self.cache
+        if cache is None:
+            if execute is unlayered:
+                return execute
+
+            # The layers answer rejections and timeouts without an id.
+            async def invoke(context: MCPContext, parameters: Dict[str, Any]) -> Dict[str, Any]:
+                response = await execute(context, parameters)
+                response["id"] = context.request_id
+                return response
+        else:
+            name = self.name
+
+            async def invoke(context: MCPContext, parameters: Dict[str, Any]) -> Dict[str, Any]:
+                try:
+                    key = cache.make_key(name, parameters, context.metadata)
+                    response = dict(await cache.get_or_call(key, lambda: execute(context, parameters)))
+                except Exception as e:
+                    return {"error": str(e), "status": 500, "id": context.request_id}
+                response["id"] = context.request_id
+                return response
+
+        return invoke
+
+    def _parameter_spec(self):
+        """Return the accepted and required keyword parameter names.
+
+        Accepted is None when the function takes ``**kwargs`` or its
+        signature cannot be inspected. The first positional parameter
+        receives the ``MCPContext`` and is excluded.
+        """
+        try:
+            parameters = list(inspect.signature(self.func).parameters.values())
+        except (TypeError, ValueError):
+            return None, frozenset()
+        if parameters and parameters[0].kind in (
+            inspect.Parameter.POSITIONAL_ONLY,
+            inspect.Parameter.POSITIONAL_OR_KEYWORD
+        ):
+            parameters = parameters[1:]
+        if any(p.kind == inspect.Parameter.VAR_KEYWORD for p in parameters):
+            accepted = None
+        else:
+            accepted = frozenset(
+                p.name for p in parameters
+                if p.kind in (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY)
+            )
+        required = frozenset(
+            p.name for p in parameters
+            if p.default is inspect.Parameter.empty
+            and p.kind in (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY)
+        )
+        return accepted, required
+
     @staticmethod
-    def _get_type_schema(type_: Type) -> Dict[str, Any]:
+    def _get_type_schema(type_: Type, defs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Convert Python type to MCP type schema."""
-        if type_ == str:
-            return {"type": "string"}
-        elif type_ == int:
-            return {"type": "integer"}
-        elif type_ == float:
-            return {"type": "number"}
-        elif type_ == bool:
-            return {"type": "boolean"}
-        elif type_ == List:
+        if type_ == List:
             return {"type": "array"}
         elif type_ == Dict:
             return {"type": "object"}
-        else:
-            return {"type": "any"}
+        return SchemaGenerator._get_type_schema(type_, defs)
 
 class MCPRegistry:
-    """Registry for MCP-exposed functions."""
-    def __init__(self):
+    """Registry for MCP-exposed functions.
+
+    Synchronous functions run in the executor named at registration,
+    resolved through ``executors``. Calls dispatched to any function share
+    the slots of ``limiter`` when one is set, see ``pymcpfy.core.admission``,
+    and are checked against the per-client quotas of ``rate_limiter``
+    first, see ``pymcpfy.core.ratelimit``. With ``metrics`` set, calls are
+    counted and timed, see ``pymcpfy.core.metrics``, and with ``profiler``
+    set slow calls are profiled, see ``pymcpfy.core.profiling``.
+
+    Generated schemas are cached per function together with their JSON
+    encoding. Registering a function invalidates only its own entry; call
+    ``invalidate_schema`` after mutating a registered ``MCPFunction``.
+    Pydantic models are emitted once under a shared ``$defs`` key of the
+    schema document and referenced from each function; invalidating a
+    function that added entries to it rebuilds it with all schemas.
+    """
+    def __init__(
+        self,
+        executors: Optional[ExecutorManager] = None,
+        limiter: Optional[ConcurrencyLimiter] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        metrics: Optional[CallMetrics] = None,
+        profiler: Optional[CallProfiler] = None
+    ):
         self.functions: Dict[str, MCPFunction] = {}
+        self.executors = executors or ExecutorManager()
+        self.limiter = limiter
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        self._profiler = profiler
+        self.invokers: Dict[str, Invoker] = {}
+        self._dispatcher: Optional["MCPDispatcher"] = None
+        self._schemas: Dict[str, MCPSchema] = {}
+        self._schema_json: Dict[str, bytes] = {}
+        self._schema_defs: Dict[str, Any] = {}
+        self._schema_def_owners: Set[str] = set()
+        self._schema_document: Optional[Tuple[bytes, str]] = None
 
     def register(
         self,
@@ -100,7 +400,13 @@ class MCPRegistry:
         description: Optional[str] = None,
         parameter_types: Optional[Dict[str, Type]] = None,
         return_type: Optional[Type] = None,
-        is_async: bool = False
+        is_async: bool = False,
+        executor: Union[str, Executor, None] = None,
+        cache: Optional[ResultCache] = None,
+        batch: Optional[Batcher] = None,
+        limiter: Optional[ConcurrencyLimiter] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        timeout: Optional[float] = None
     ) -> MCPFunction:
         """Register a function with the MCP registry."""
         if isinstance(func, MCPFunction):
@@ -112,19 +418,92 @@ class MCPRegistry:
                 description=description,
                 parameter_types=parameter_types,
                 return_type=return_type,
-                is_async=is_async
+                is_async=is_async,
+                executor=executor,
+                cache=cache,
+                batch=batch,
+                limiter=limiter,
+                rate_limiter=rate_limiter,
+                timeout=timeout
             )
 
+        self.invokers[mcp_func.name] = mcp_func.compile(self.executors, self._profiler)
         self.functions[mcp_func.name] = mcp_func
+        self.invalidate_schema(mcp_func.name)
         return mcp_func
 
+    @property
+    def profiler(self) -> Optional[CallProfiler]:
+        """Profiler of slow calls, if any; setting it recompiles the invokers."""
+        return self._profiler
+
+    @profiler.setter
+    def profiler(self, profiler: Optional[CallProfiler]):
+        self._profiler = profiler
+        for name, mcp_func in self.functions.items():
+            self.invokers[name] = mcp_func.compile(self.executors, profiler)
+
+    @property
+    def dispatcher(self) -> "MCPDispatcher":
+        """Dispatcher shared by all transports serving this registry."""
+        if self._dispatcher is None:
+            from .dispatcher import MCPDispatcher
+            self._dispatcher = MCPDispatcher(self)
+        return self._dispatcher
+
     def get_function(self, name: str) -> Optional[MCPFunction]:
         """Get a registered function by name."""
         return self.functions.get(name)
 
     def get_schema(self) -> Dict[str, MCPSchema]:
-        """Get schema for all registered functions."""
-        return {
-            name: func.generate_schema()
-            for name, func in self.functions.items()
-        }
+        """Get schema for all registered functions.
+
+        Pydantic models are referenced via ``$ref``; see ``get_schema_defs``.
+        """
+        return {name: schema.model_copy(deep=True) for name, schema in self._generate_schemas().items()}
+
+    def get_schema_defs(self) -> Dict[str, Any]:
+        """Get the shared ``$defs`` referenced by the function schemas."""
+        self._generate_schemas()
+        return copy.deepcopy(self._schema_defs)
+
+    def get_schema_json(self) -> Tuple[bytes, str]:
+        """Get the JSON-encoded schema document and its ETag."""
+        if self._schema_document is None:
+            encoded = self._schema_json
+            for name, schema in self._generate_schemas().items():
+                if name not in encoded:
+                    encoded[name] = json.dumps(name).encode() + b":" + schema.model_dump_json().encode()
+            entries = [encoded[name] for name in self.functions]
+            if self._schema_defs:
+                entries.append(b'"$defs":' + json.dumps(self._schema_defs).encode())
+            body = b"{" + b",".join(entries) + b"}"
+            etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+            self._schema_document = (body, etag)
+        return self._schema_document
+
+    def _generate_schemas(self) -> Dict[str, MCPSchema]:
+        """Generate the schemas missing from the cache, noting which add ``$defs``."""
+        schemas = self._schemas
+        defs = self._schema_defs
+        for name, func in self.functions.items():
+            if name not in schemas:
+                count = len(defs)
+                schemas[name] = func.generate_schema(defs)
+                if len(defs) != count:
+                    self._schema_def_owners.add(name)
+        return schemas
+
+    def invalidate_schema(self, name: Optional[str] = None):
+        """Drop cached schemas for one function, or for all when name is None."""
+        if name is None or name in self._schema_def_owners:
+            # Other functions may reference the $defs entries it added, so
+            # drop them all rather than leave stale ones behind.
+            self._schemas.clear()
+            self._schema_json.clear()
+            self._schema_defs.clear()
+            self._schema_def_owners.clear()
+        else:
+            self._schemas.pop(name, None)
+            self._schema_json.pop(name, None)
+        self._schema_document = None
@@ -0,0 +1,282 @@
+"""Call counts, in-flight gauges and latency histograms for MCP calls.
+
+A registry with ``metrics`` set records, per function and transport, the
+calls dispatched, those answered with an error status, the calls in
+flight and two latency histograms: ``queue``, the time a call waits for
+the registry's limiters, and ``execute``, the time from the invoker
+starting until the response is ready or, for streams, until the stream
+closes. Transports add ``decode`` and ``encode`` histograms of the time
+spent on request and response bodies::
+
+    registry = MCPRegistry(metrics=CallMetrics())
+
+``render()`` gives the Prometheus text exposition served at ``GET
+/metrics`` over HTTP, and ``snapshot()`` a JSON-friendly summary with
+estimated percentiles, sent in reply to a ``{"metrics": true}`` message
+over WebSocket.
+
+Recording a call costs a few clock reads and bucket lookups; histograms
+have fixed bounds, so memory stays constant whatever the traffic. Only
+registered functions get series, which keeps the label set bounded.
+Each worker process keeps its own metrics. Updates take no lock, so the
+threaded HTTP engine, which decodes and encodes in its handler threads,
+may rarely lose a phase observation.
+"""
+
+import time
+from bisect import bisect_left
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .admission import hold_stream
+from .codecs import Codec
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds, from 100µs to 10s.
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+class Histogram:
+    """Latency histogram over fixed bucket bounds, in seconds."""
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """Record one duration."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the ``q`` quantile, or None when empty.
+
+        Values above the last bound report the last bound.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.bounds[-1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Count, sum and estimated p50 and p99."""
+        return {"count": self.count, "sum": self.sum, "p50": self.quantile(0.5), "p99": self.quantile(0.99)}
+
+class _CallSeries:
+    """Counters and histograms of one function on one transport."""
+    __slots__ = ("calls", "errors", "in_flight", "queue", "execute")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.queue = Histogram(bounds)
+        self.execute = Histogram(bounds)
+
+class CallMetrics:
+    """Metrics of the calls dispatched to a registry."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._calls: Dict[Tuple[str, str], _CallSeries] = {}
+        self._phases: Dict[Tuple[str, str], Histogram] = {}
+
+    def series(self, function: str, transport: str) -> _CallSeries:
+        """The series of ``function`` called over ``transport``."""
+        series = self._calls.get((function, transport))
+        if series is None:
+            series = self._calls[(function, transport)] = _CallSeries(self.buckets)
+        return series
+
+    def observe(self, transport: str, phase: str, seconds: float):
+        """Record the duration of a transport phase such as ``decode``."""
+        histogram = self._phases.get((transport, phase))
+        if histogram is None:
+            histogram = self._phases[(transport, phase)] = Histogram(self.buckets)
+        histogram.observe(seconds)
+
+    def decode(self, transport: str, codec: Codec, data: bytes) -> Any:
+        """Decode a request body, timing it as the ``decode`` phase."""
+        started = time.perf_counter()
+        try:
+            return codec.decode(data)
+        finally:
+            self.observe(transport, "decode", time.perf_counter() - started)
+
+    def encode(self, transport: str, codec: Codec, value: Any) -> bytes:
+        """Encode a response body, timing it as the ``encode`` phase."""
+        started = time.perf_counter()
+        try:
+            return codec.encode(value)
+        finally:
+            self.observe(transport, "encode", time.perf_counter() - started)
+
+    async def call(
+        self,
+        series: _CallSeries,
+        invoker: Callable[[Any, Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        context: Any,
+        parameters: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Invoke a call that does not queue, counting and timing it.
+
+        Equivalent to ``track`` around ``timed``, in one step for the
+        common case of a registry without limiters.
+        """
+        series.calls += 1
+        series.in_flight += 1
+        started = time.perf_counter()
+        try:
+            response = await invoker(context, parameters)
+        except BaseException:
+            series.execute.observe(time.perf_counter() - started)
+            series.in_flight -= 1
+            series.errors += 1
+            raise
+        if response.get("status", 200) >= 400:
+            series.errors += 1
+        if "stream" in response:
+            response["stream"] = hold_stream(
+                response["stream"], lambda failed: self._end_stream(series, failed, started)
+            )
+        else:
+            series.execute.observe(time.perf_counter() - started)
+            series.in_flight -= 1
+        return response
+
+    async def track(self, series: _CallSeries, call: Awaitable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Await a call's response, counting it and holding it in flight.
+
+        Responses with a status of 400 or above, and streams that fail
+        with a 5xx error, count as errors.
+        """
+        series.calls += 1
+        series.in_flight += 1
+        try:
+            response = await call
+        except BaseException:
+            series.in_flight -= 1
+            series.errors += 1
+            raise
+        if response.get("status", 200) >= 400:
+            series.errors += 1
+        if "stream" in response:
+            response["stream"] = hold_stream(response["stream"], lambda failed: self._end_stream(series, failed))
+        else:
+            series.in_flight -= 1
+        return response
+
+    def timed(
+        self,
+        series: _CallSeries,
+        invoker: Callable[[Any, Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        queued: bool
+    ) -> Callable[[Any, Dict[str, Any]], Awaitable[Dict[str, Any]]]:
+        """Wrap an invoker to record its ``execute`` time, and ``queue`` time when ``queued``."""
+        received = time.perf_counter() if queued else None
+
+        async def invoke(context: Any, parameters: Dict[str, Any]) -> Dict[str, Any]:
+            started = time.perf_counter()
+            if received is not None:
+                series.queue.observe(started - received)
+            try:
+                response = await invoker(context, parameters)
+            except BaseException:
+                series.execute.observe(time.perf_counter() - started)
+                raise
+            if "stream" in response:
+                response["stream"] = hold_stream(
+                    response["stream"], lambda _: series.execute.observe(time.perf_counter() - started)
+                )
+            else:
+                series.execute.observe(time.perf_counter() - started)
+            return response
+        return invoke
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current metrics by function and transport, with estimated percentiles."""
+        functions: Dict[str, Dict[str, Any]] = {}
+        for (function, transport), series in self._calls.items():
+            functions.setdefault(function, {})[transport] = {
+                "calls": series.calls,
+                "errors": series.errors,
+                "in_flight": series.in_flight,
+                "queue": series.queue.snapshot(),
+                "execute": series.execute.snapshot()
+            }
+        transports: Dict[str, Dict[str, Any]] = {}
+        for (transport, phase), histogram in self._phases.items():
+            transports.setdefault(transport, {})[phase] = histogram.snapshot()
+        return {"functions": functions, "transports": transports}
+
+    def render(self) -> str:
+        """Metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        calls = sorted(self._calls.items())
+        for name, kind, help_text, value in (
+            ("pymcpfy_calls_total", "counter", "Calls dispatched.", lambda s: s.calls),
+            ("pymcpfy_errors_total", "counter", "Calls answered with an error status.", lambda s: s.errors),
+            ("pymcpfy_in_flight", "gauge", "Calls queued or executing, including open streams.", lambda s: s.in_flight),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (function, transport), series in calls:
+                lines.append(f"{name}{{{_labels(function=function, transport=transport)}}} {value(series)}")
+
+        name = "pymcpfy_phase_seconds"
+        lines.append(f"# HELP {name} Time spent per call phase: decode, queue, execute and encode.")
+        lines.append(f"# TYPE {name} histogram")
+        for (function, transport), series in calls:
+            for phase in ("queue", "execute"):
+                histogram = getattr(series, phase)
+                if histogram.count:
+                    _render_histogram(lines, name, _labels(function=function, transport=transport, phase=phase), histogram)
+        for (transport, phase), histogram in sorted(self._phases.items()):
+            _render_histogram(lines, name, _labels(transport=transport, phase=phase), histogram)
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _end_stream(series: _CallSeries, failed: bool, started: Optional[float] = None):
+        """Account for a stream that has closed."""
+        if started is not None:
+            series.execute.observe(time.perf_counter() - started)
+        series.in_flight -= 1
+        if failed:
+            series.errors += 1
+
+def is_metrics_message(message: Any) -> bool:
+    """Whether a decoded message asks for the server's metrics."""
+    return isinstance(message, dict) and message.get("metrics") is True and "function" not in message
+
+def metrics_response(metrics: Optional[CallMetrics], message: Dict[str, Any]) -> Dict[str, Any]:
+    """The reply to a metrics message."""
+    if metrics is None:
+        return {"id": message.get("id"), "error": "Metrics are disabled", "status": 404}
+    return {"id": message.get("id"), "data": metrics.snapshot(), "status": 200, "metadata": {}}
+
+def _labels(**labels: str) -> str:
+    """Format Prometheus labels, escaping their values."""
+    return ",".join(
+        name + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in labels.items()
+    )
+
+def _render_histogram(lines: List[str], name: str, labels: str, histogram: Histogram):
+    """Append the cumulative buckets, sum and count of one histogram."""
+    cumulative = 0
+    for bound, count in zip(histogram.bounds, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.sum:.9g}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
@@ -0,0 +1,115 @@
+"""Server-side pipelines of dependent MCP calls.
+
+A pipeline request lists steps, each a regular call with a unique ``id``.
+A parameter value of the form ``{"$ref": "<step>"}`` is replaced by the
+``data`` of that step's response, and ``{"$ref": "<step>.<path>"}`` by a
+value inside it, following dictionary keys and list indexes separated by
+dots::
+
+    {"id": "1", "pipeline": [
+        {"id": "login", "function": "login", "parameters": {"user": "ada"}},
+        {"id": "inbox", "function": "get_messages",
+         "parameters": {"token": {"$ref": "login.token"}}},
+        {"id": "profile", "function": "get_user",
+         "parameters": {"user_id": {"$ref": "login.user_id"}}}
+    ]}
+
+Steps run as soon as the steps they reference have succeeded, so
+independent branches execute concurrently.
+"""
+
+from typing import Any, Dict, List, Set, Tuple
+
+from .mcp_protocol import MCPError
+
+def plan_pipeline(steps: Any, max_steps: int = 100) -> Dict[str, Set[str]]:
+    """Validate pipeline steps and return each step's dependencies.
+
+    Raises ``MCPError`` (400) for malformed steps, unknown references and
+    cycles.
+    """
+    if not isinstance(steps, list) or not steps:
+        raise MCPError(400, "Pipeline must be a non-empty list of steps")
+    if len(steps) > max_steps:
+        raise MCPError(413, f"Pipeline exceeds {max_steps} steps")
+
+    dependencies: Dict[str, Set[str]] = {}
+    for step in steps:
+        if not isinstance(step, dict):
+            raise MCPError(400, "Invalid pipeline step")
+        step_id = step.get("id")
+        if not isinstance(step_id, str) or not step_id or "." in step_id:
+            raise MCPError(400, "Pipeline steps need a string id without dots")
+        if step_id in dependencies:
+            raise MCPError(400, f"Duplicate pipeline step: {step_id}")
+        refs: Set[str] = set()
+        _collect_refs(step.get("parameters"), refs)
+        dependencies[step_id] = refs
+
+    for step_id, refs in dependencies.items():
+        unknown = refs - dependencies.keys()
+        if unknown:
+            raise MCPError(400, f"Step {step_id} references unknown steps: {', '.join(sorted(unknown))}")
+
+    # Kahn's algorithm; anything left over is part of a cycle.
+    remaining = {step_id: set(refs) for step_id, refs in dependencies.items()}
+    ready = [step_id for step_id, refs in remaining.items() if not refs]
+    while ready:
+        done = ready.pop()
+        del remaining[done]
+        for step_id, refs in remaining.items():
+            if done in refs:
+                refs.discard(done)
+                if not refs:
+                    ready.append(step_id)
+    if remaining:
+        raise MCPError(400, f"Pipeline has a cycle between: {', '.join(sorted(remaining))}")
+    return dependencies
+
+def resolve_refs(value: Any, results: Dict[str, Dict[str, Any]]) -> Any:
+    """Replace ``$ref`` markers in ``value`` with completed step results."""
+    if isinstance(value, dict):
+        ref = _ref(value)
+        if ref is not None:
+            step_id, path = _split_ref(ref)
+            return _lookup(results[step_id].get("data"), path, ref)
+        return {key: resolve_refs(item, results) for key, item in value.items()}
+    if isinstance(value, list):
+        return [resolve_refs(item, results) for item in value]
+    return value
+
+def _ref(value: Dict[str, Any]):
+    """Return the reference string if ``value`` is a ``$ref`` marker."""
+    if len(value) == 1 and isinstance(value.get("$ref"), str):
+        return value["$ref"]
+    return None
+
+def _split_ref(ref: str) -> Tuple[str, List[str]]:
+    """Split ``"step.a.0"`` into ``("step", ["a", "0"])``."""
+    step_id, *path = ref.split(".")
+    return step_id, path
+
+def _collect_refs(value: Any, refs: Set[str]):
+    """Collect the step ids referenced anywhere in ``value``."""
+    if isinstance(value, dict):
+        ref = _ref(value)
+        if ref is not None:
+            refs.add(_split_ref(ref)[0])
+            return
+        for item in value.values():
+            _collect_refs(item, refs)
+    elif isinstance(value, list):
+        for item in value:
+            _collect_refs(item, refs)
+
+def _lookup(data: Any, path: List[str], ref: str) -> Any:
+    """Follow a dotted path into a step result."""
+    for part in path:
+        try:
+            if isinstance(data, list):
+                data = data[int(part)]
+            else:
+                data = data[part]
+        except (KeyError, IndexError, TypeError, ValueError):
+            raise MCPError(400, f"Cannot resolve reference {ref}")
+    return data
@@ -0,0 +1,288 @@
+"""Profiles of slow MCP calls.
+
+A registry with a ``profiler`` records where the time of its slow calls
+went. Any call that takes longer than ``threshold`` seconds, and a random
+``sample_rate`` fraction of all calls, is kept in a ring buffer of the
+last ``max_records`` such calls::
+
+    registry = MCPRegistry(profiler=CallProfiler(threshold=0.5, sample_rate=0.01))
+
+Each record breaks the call down into phases: ``queue``, the wait for
+limiters after the dispatcher received it; ``executor_wait``, the wait for
+a thread of the executor; and ``run``, the function itself. Once a call
+has run past the threshold, a background thread samples its stack every
+``interval`` seconds: the worker thread's frames for synchronous
+functions, the task's chain of coroutines for coroutine functions. The
+samples are kept as collapsed stacks with their counts. Sampled
+synchronous calls run under ``cProfile`` from the start, and their
+busiest functions are kept as well; sampled coroutine functions have
+their stack sampled from the start instead, since a profiler on the
+event loop would also time every other task.
+
+Streams are not profiled, and the samples of batched and process-pool
+functions stop at the await of their result. With ``MCPConfig.debug``
+on, ``serve`` installs a profiler and the HTTP transport and the ASGI app
+serve the records at ``GET /debug/profiles``.
+"""
+
+import asyncio
+import contextvars
+import cProfile
+import json
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from ..config import MCPConfig
+
+_current_call: contextvars.ContextVar = contextvars.ContextVar("pymcpfy_profiled_call")
+
+class _Call:
+    """State of one profiled call, shared with the sampler thread."""
+    __slots__ = (
+        "name", "context", "sampled", "received", "started", "thread_started", "thread_ended",
+        "thread_id", "task", "samples", "profile"
+    )
+
+    def __init__(self, name: str, context: Any, sampled: bool, received: float, started: float):
+        self.name = name
+        self.context = context
+        self.sampled = sampled
+        self.received = received
+        self.started = started
+        self.thread_started: Optional[float] = None
+        self.thread_ended: Optional[float] = None
+        self.thread_id = threading.get_ident()
+        self.task: Optional[asyncio.Task] = None
+        self.samples: Dict[str, int] = {}
+        self.profile: Optional[List[Dict[str, Any]]] = None
+
+    def stack(self, frames: Dict[int, Any], max_depth: int) -> Optional[str]:
+        """The call's current stack, collapsed into one ``;`` separated line."""
+        task = self.task
+        if task is not None:
+            stack = _coroutine_frames(task.get_coro(), frames.get(self.thread_id))
+        else:
+            stack = []
+            frame = frames.get(self.thread_id)
+            while frame is not None:
+                stack.append(frame)
+                frame = frame.f_back
+            stack.reverse()
+        if not stack:
+            return None
+        return ";".join(_frame_name(frame) for frame in stack[-max_depth:])
+
+class CallProfiler:
+    """Capture phase timings and stack samples of slow or sampled calls.
+
+    ``threshold`` is None to keep only sampled calls. ``top`` bounds the
+    number of stacks and profiled functions kept per record.
+    """
+
+    def __init__(
+        self,
+        threshold: Optional[float] = 1.0,
+        sample_rate: float = 0.0,
+        max_records: int = 100,
+        interval: float = 0.005,
+        max_depth: int = 48,
+        top: int = 20
+    ):
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.max_depth = max_depth
+        self.top = top
+        self.records: Deque[Dict[str, Any]] = deque(maxlen=max_records)
+        self._calls: Set[_Call] = set()
+        self._lock = threading.Lock()
+        self._active = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, config: MCPConfig) -> "CallProfiler":
+        """Create the profiler configured in an MCPConfig."""
+        return cls(
+            threshold=config.profile_threshold,
+            sample_rate=config.profile_sample_rate,
+            max_records=config.profile_records
+        )
+
+    async def run(
+        self,
+        name: str,
+        execute: Callable[[Any, Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        context: Any,
+        parameters: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Execute a call, keeping a record of it if it is slow or sampled."""
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        if self.threshold is None and not sampled:
+            return await execute(context, parameters)
+        started = time.perf_counter()
+        received = getattr(context, "received", None) or started
+        call = _Call(name, context, sampled, received, started)
+        call.task = asyncio.current_task()
+        token = _current_call.set(call)
+        self._watch(call)
+        try:
+            response = await execute(context, parameters)
+        finally:
+            _current_call.reset(token)
+            self._unwatch(call)
+        ended = time.perf_counter()
+        if sampled or ended - received >= self.threshold:
+            self.records.append(self._record(call, response, ended))
+        return response
+
+    def wrap_sync(self, func: Callable) -> Callable:
+        """Wrap a synchronous function to time and profile it in its executor thread."""
+        def profiled(context: Any, *args: Any, **kwargs: Any) -> Any:
+            call = _current_call.get(None)
+            if call is None:
+                return func(context, *args, **kwargs)
+            call.thread_started = time.perf_counter()
+            call.thread_id = threading.get_ident()
+            call.task = None
+            profile = cProfile.Profile() if call.sampled else None
+            if profile is not None:
+                try:
+                    profile.enable()
+                except ValueError:
+                    # Another profiler is active; Python 3.12+ allows one at a time.
+                    profile = None
+            try:
+                return func(context, *args, **kwargs)
+            finally:
+                if profile is not None:
+                    profile.disable()
+                    call.profile = _top_functions(profile, self.top)
+                call.thread_ended = time.perf_counter()
+        return profiled
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """The kept records, newest first."""
+        return list(reversed(self.records))
+
+    def render(self) -> str:
+        """The kept records as the JSON document served at ``GET /debug/profiles``."""
+        return json.dumps({"profiles": self.snapshot()}, default=str)
+
+    def _record(self, call: _Call, response: Dict[str, Any], ended: float) -> Dict[str, Any]:
+        """Build the record of a finished call."""
+        context = call.context
+        phases = {"queue": call.started - call.received}
+        if call.thread_started is not None:
+            phases["executor_wait"] = call.thread_started - call.started
+            phases["run"] = (call.thread_ended or ended) - call.thread_started
+        else:
+            phases["run"] = ended - call.started
+        record = {
+            "function": call.name,
+            "transport": context.transport,
+            "id": context.request_id,
+            "time": time.time() - (ended - call.received),
+            "duration": ended - call.received,
+            "status": response.get("status", 200),
+            "reason": "sampled" if call.sampled else "slow",
+            "phases": phases
+        }
+        if call.samples:
+            stacks = sorted(call.samples.items(), key=lambda item: item[1], reverse=True)
+            record["interval"] = self.interval
+            record["samples"] = [{"stack": stack, "count": count} for stack, count in stacks[:self.top]]
+        if call.profile is not None:
+            record["profile"] = call.profile
+        return record
+
+    def _watch(self, call: _Call):
+        """Let the sampler thread see a call, waking it if it is idle.
+
+        Set updates are atomic, so watching a call takes no lock.
+        """
+        self._calls.add(call)
+        if not self._active.is_set():
+            with self._lock:
+                if self._sampler is None:
+                    self._sampler = threading.Thread(target=self._sample, name="pymcpfy-profiler", daemon=True)
+                    self._sampler.start()
+            self._active.set()
+
+    def _unwatch(self, call: _Call):
+        self._calls.discard(call)
+
+    def _sample(self):
+        """Sample the stacks of calls past the threshold, sleeping while there are none."""
+        while True:
+            self._active.wait()
+            time.sleep(self.interval)
+            calls = list(self._calls)
+            if not calls:
+                self._active.clear()
+                # A call watched before the clear is seen here, one watched
+                # after it sets the event again.
+                if self._calls:
+                    self._active.set()
+                continue
+            now = time.perf_counter()
+            threshold = self.threshold
+            due = [
+                call for call in calls
+                if call.thread_ended is None
+                and (call.sampled or (threshold is not None and now - call.received >= threshold))
+            ]
+            if not due:
+                continue
+            frames = sys._current_frames()
+            for call in due:
+                stack = call.stack(frames, self.max_depth)
+                if stack is not None:
+                    call.samples[stack] = call.samples.get(stack, 0) + 1
+            del frames
+
+def _coroutine_frames(coroutine: Any, thread_frame: Any) -> List[Any]:
+    """Frames of a chain of awaiting coroutines, outermost first.
+
+    When the innermost coroutine is running, the frames it has called on
+    its thread are appended.
+    """
+    frames = []
+    while coroutine is not None:
+        frame = getattr(coroutine, "cr_frame", None) or getattr(coroutine, "gi_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coroutine = getattr(coroutine, "cr_await", None) or getattr(coroutine, "gi_yieldfrom", None)
+    if frames and thread_frame is not None:
+        called = []
+        frame = thread_frame
+        while frame is not None and frame is not frames[-1]:
+            called.append(frame)
+            frame = frame.f_back
+        if frame is not None:
+            frames.extend(reversed(called))
+    return frames
+
+def _frame_name(frame: Any) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+def _top_functions(profile: cProfile.Profile, top: int) -> List[Dict[str, Any]]:
+    """The functions with the most cumulative time in a profile."""
+    stats = pstats.Stats(profile).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:top]
+    return [
+        {
+            "function": f"{name} ({os.path.basename(filename)}:{line})",
+            "calls": calls,
+            "total": round(total, 6),
+            "cumulative": round(cumulative, 6)
+        }
+        for (filename, line, name), (_, calls, total, cumulative, _) in rows
+    ]
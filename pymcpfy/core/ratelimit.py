@@ -0,0 +1,192 @@
+"""Per-client rate limits and concurrency quotas for MCP calls.
+
+A ``RateLimiter`` gives every client its own token bucket, refilled at
+``rate`` calls per second up to ``burst``, and optionally caps the calls
+each client has executing at once. Clients are told apart by a key taken
+from each call: the peer host it connected from (the default), a field of
+the request metadata such as ``"tenant"``, the connection itself, or any
+function of the ``MCPContext``::
+
+    registry = MCPRegistry(rate_limiter=RateLimiter(rate=20, burst=40, max_concurrent=8, key="tenant"))
+    registry.register(search, rate_limiter=RateLimiter(rate=1, key="tenant"))
+
+Calls over a limit are answered at once with 429, and rate-limited ones
+carry ``retry_after`` seconds in their metadata. Metadata is supplied by
+the caller, so key on fields that a trusted layer in front of the server
+sets, or on the peer. A client reconnecting keeps its peer host, and with
+it its quota; keying on ``"connection"`` (``host:port``) instead gives
+every new connection a fresh one.
+
+Checking a call costs O(1): a dictionary lookup and the bucket arithmetic,
+plus a bounded eviction step when a new key is added. Keys unused for
+``idle_timeout`` seconds, and the least recently used ones beyond
+``max_keys``, are dropped as new keys arrive; a dropped key starts again
+from a full bucket.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+from ..config import MCPConfig
+from .admission import hold_stream
+
+class _Quota:
+    """Token bucket and in-flight count of one key."""
+    __slots__ = ("tokens", "updated", "in_flight")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+        self.in_flight = 0
+
+class RateLimiter:
+    """Token-bucket rate limits and concurrency quotas keyed per client.
+
+    ``key`` is ``"peer"`` to key on the host the call's connection comes
+    from, ``"connection"`` to key on the connection itself, a metadata
+    field, falling back to the peer when a call does not carry it, or a
+    function from ``MCPContext`` to a key. Calls without any key, such as
+    those over stdio or a Unix socket, share one quota. ``burst`` defaults
+    to ``rate``, at least 1.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        max_concurrent: Optional[int] = None,
+        key: Union[str, Callable[[Any], Optional[str]]] = "peer",
+        idle_timeout: float = 300.0,
+        max_keys: int = 100000,
+        status: int = 429
+    ):
+        if rate is None and max_concurrent is None:
+            raise ValueError("RateLimiter needs a rate, a max_concurrent quota or both")
+        self.rate = rate
+        self.burst = float(burst if burst is not None else max(1, int(rate or 1)))
+        self.max_concurrent = max_concurrent
+        self.idle_timeout = idle_timeout
+        self.max_keys = max_keys
+        self.status = status
+        self.limited = 0
+        self._key = key if callable(key) else _key_function(key)
+        self._quotas: "OrderedDict[str, _Quota]" = OrderedDict()
+
+    @classmethod
+    def from_config(cls, config: MCPConfig) -> "RateLimiter":
+        """Create the per-client limiter configured in an MCPConfig."""
+        return cls(
+            rate=config.rate_limit,
+            burst=config.rate_limit_burst,
+            max_concurrent=config.max_concurrent_per_key,
+            key=config.rate_limit_key,
+            idle_timeout=config.rate_limit_idle_timeout
+        )
+
+    async def run(self, context: Any, invoke: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Run ``invoke`` within the caller's quota and return its response, or a rejection.
+
+        A streaming response counts against the concurrency quota until its
+        stream is closed.
+        """
+        quota = self._admit(context)
+        if isinstance(quota, dict):
+            return quota
+        if self.max_concurrent is None:
+            return await invoke()
+        try:
+            response = await invoke()
+        except BaseException:
+            quota.in_flight -= 1
+            raise
+        if "stream" in response:
+            response["stream"] = hold_stream(response["stream"], lambda _: self._release(quota))
+        else:
+            quota.in_flight -= 1
+        return response
+
+    def metrics(self) -> Dict[str, int]:
+        """Number of tracked ``keys`` and the total of ``limited`` calls."""
+        return {"keys": len(self._quotas), "limited": self.limited}
+
+    def _admit(self, context: Any) -> Union[_Quota, Dict[str, Any]]:
+        """Take a token and a concurrency slot for a call, or build its rejection."""
+        now = time.monotonic()
+        key = self._key(context)
+        key = "" if key is None else str(key)
+        quotas = self._quotas
+        quota = quotas.get(key)
+        if quota is None:
+            # The store only grows here, so this is where it is trimmed.
+            if quotas:
+                self._evict(now)
+            quota = quotas[key] = _Quota(self.burst, now)
+        else:
+            quotas.move_to_end(key)
+
+        rate = self.rate
+        if rate is not None:
+            tokens = min(self.burst, quota.tokens + (now - quota.updated) * rate)
+            if tokens < 1:
+                quota.tokens = tokens
+                quota.updated = now
+                self.limited += 1
+                return {
+                    "error": "Rate limit exceeded",
+                    "status": self.status,
+                    "metadata": {"retry_after": round((1 - tokens) / rate, 3)}
+                }
+            quota.tokens = tokens - 1
+        quota.updated = now
+
+        if self.max_concurrent is not None:
+            if quota.in_flight >= self.max_concurrent:
+                if rate is not None:
+                    quota.tokens += 1
+                self.limited += 1
+                return {"error": "Too many concurrent calls", "status": self.status}
+            quota.in_flight += 1
+        return quota
+
+    @staticmethod
+    def _release(quota: _Quota):
+        quota.in_flight -= 1
+
+    def _evict(self, now: float):
+        """Drop at most two idle or excess keys, oldest first."""
+        quotas = self._quotas
+        deadline = now - self.idle_timeout
+        for _ in range(2):
+            key, quota = next(iter(quotas.items()))
+            if quota.updated >= deadline and len(quotas) < self.max_keys:
+                return
+            if quota.in_flight:
+                # Keep the count of running calls; look at it again later.
+                if self.rate is not None:
+                    quota.tokens = min(self.burst, quota.tokens + (now - quota.updated) * self.rate)
+                quota.updated = now
+                quotas.move_to_end(key)
+            else:
+                del quotas[key]
+                if not quotas:
+                    return
+
+def _key_function(field: str) -> Callable[[Any], Optional[str]]:
+    """Key a call on a metadata field, falling back to its peer host."""
+    if field == "connection":
+        return lambda context: context.connection
+    if field == "peer":
+        return lambda context: _peer_host(context.connection)
+
+    def key(context: Any) -> Optional[str]:
+        metadata = context.metadata
+        value = metadata.get(field) if isinstance(metadata, dict) else None
+        return value if value is not None else _peer_host(context.connection)
+    return key
+
+def _peer_host(connection: Optional[str]) -> Optional[str]:
+    """The host of a ``host:port`` connection identity."""
+    if connection is None:
+        return None
+    return connection.rsplit(":", 1)[0]
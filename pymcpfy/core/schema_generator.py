@@ -1,66 +1,127 @@
 """Schema generator for MCP functions."""
 
+import copy
 import inspect
-from typing import Any, Callable, Dict, Optional, Type, get_type_hints
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union, get_type_hints
 
 from pydantic import BaseModel
 
 class SchemaGenerator:
-    """Generate MCP schema from Python functions."""
+    """Generate MCP schema from Python functions.
 
-    @staticmethod
-    def generate_parameter_schema(func: Callable) -> Dict[str, Dict[str, Any]]:
-        """Generate parameter schema from function signature."""
-        params = {}
-        signature = inspect.signature(func)
-        type_hints = get_type_hints(func)
+    Signatures, type hints, docstrings and type schemas are memoized, so a
+    type or Pydantic model shared by many functions is only converted once.
+    Passing a ``defs`` dictionary emits Pydantic models as ``$ref`` entries
+    into it instead of inlining them, letting callers share one ``$defs``
+    section across many functions.
 
-        for name, param in signature.parameters.items():
-            # Skip self, cls, and context parameters
-            if name in ("self", "cls", "context"):
-                continue
+    Functions and models are cached weakly, so they are dropped with them;
+    type hints are kept for the last ``max_cached_types`` used. Cached
+    schemas are handed out as deep copies.
+    """
 
-            param_type = type_hints.get(name, Any)
-            params[name] = SchemaGenerator._get_type_schema(param_type)
+    max_cached_types = 1024
 
-            # Add description from docstring if available
-            if func.__doc__:
-                param_desc = SchemaGenerator._extract_param_description(func.__doc__, name)
-                if param_desc:
-                    params[name]["description"] = param_desc
+    _function_cache: "weakref.WeakKeyDictionary[Callable, Tuple]" = weakref.WeakKeyDictionary()
+    _type_cache: "OrderedDict[Any, Dict[str, Any]]" = OrderedDict()
+    _model_cache: "weakref.WeakKeyDictionary[Type[BaseModel], Dict[str, Any]]" = weakref.WeakKeyDictionary()
 
+    @staticmethod
+    def generate_parameter_schema(
+        func: Callable,
+        defs: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Generate parameter schema from function signature."""
+        params = {}
+        parameters, descriptions, _ = SchemaGenerator._inspect_function(func)
+        for name, param_type in parameters:
+            params[name] = SchemaGenerator._get_type_schema(param_type, defs)
+            if name in descriptions:
+                params[name]["description"] = descriptions[name]
         return params
 
     @staticmethod
-    def generate_return_schema(func: Callable) -> Dict[str, Any]:
+    def generate_return_schema(func: Callable, defs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Generate return type schema from function."""
-        return_type = get_type_hints(func).get("return", Any)
-        return SchemaGenerator._get_type_schema(return_type)
+        _, _, return_type = SchemaGenerator._inspect_function(func)
+        return SchemaGenerator._get_type_schema(return_type, defs)
+
+    @classmethod
+    def clear_cache(cls):
+        """Drop all memoized signatures and schemas."""
+        cls._function_cache.clear()
+        cls._type_cache.clear()
+        cls._model_cache.clear()
 
     @staticmethod
-    def _get_type_schema(type_hint: Type) -> Dict[str, Any]:
+    def _inspect_function(func: Callable) -> Tuple[List[Tuple[str, Any]], Dict[str, str], Any]:
+        """Return (parameters, descriptions, return type) for a function, memoized."""
+        try:
+            return SchemaGenerator._function_cache[func]
+        except (KeyError, TypeError):
+            pass
+
+        signature = inspect.signature(func)
+        type_hints = get_type_hints(func)
+        parameters = [
+            # Skip self, cls, context and *args/**kwargs parameters
+            (name, type_hints.get(name, Any))
+            for name, parameter in signature.parameters.items()
+            if name not in ("self", "cls", "context")
+            and parameter.kind not in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD)
+        ]
+        descriptions = SchemaGenerator._parse_param_descriptions(func.__doc__ or "")
+        info = (parameters, descriptions, type_hints.get("return", Any))
+        try:
+            SchemaGenerator._function_cache[func] = info
+        except TypeError:
+            pass
+        return info
+
+    @staticmethod
+    def _get_type_schema(type_hint: Type, defs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Convert Python type hint to MCP type schema."""
+        if defs is not None:
+            return SchemaGenerator._build_type_schema(type_hint, defs)
+        cache = SchemaGenerator._type_cache
+        try:
+            schema = cache.get(type_hint)
+        except TypeError:
+            return SchemaGenerator._build_type_schema(type_hint, None)
+        if schema is None:
+            schema = cache[type_hint] = SchemaGenerator._build_type_schema(type_hint, None)
+            while len(cache) > SchemaGenerator.max_cached_types:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(type_hint)
+        return copy.deepcopy(schema)
+
+    @staticmethod
+    def _build_type_schema(type_hint: Type, defs: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the schema for a type hint without consulting the type cache."""
         if hasattr(type_hint, "__origin__"):  # Handle generic types
             origin = type_hint.__origin__
             if origin in (list, List):
                 return {
                     "type": "array",
-                    "items": SchemaGenerator._get_type_schema(type_hint.__args__[0])
+                    "items": SchemaGenerator._get_type_schema(type_hint.__args__[0], defs)
                 }
             elif origin in (dict, Dict):
                 return {
                     "type": "object",
-                    "additionalProperties": SchemaGenerator._get_type_schema(type_hint.__args__[1])
+                    "additionalProperties": SchemaGenerator._get_type_schema(type_hint.__args__[1], defs)
                 }
             elif origin in (Optional, Union):
                 non_none_types = [t for t in type_hint.__args__ if t != type(None)]
                 if len(non_none_types) == 1:
-                    schema = SchemaGenerator._get_type_schema(non_none_types[0])
+                    schema = SchemaGenerator._get_type_schema(non_none_types[0], defs)
                     schema["nullable"] = True
                     return schema
-                return {"oneOf": [SchemaGenerator._get_type_schema(t) for t in non_none_types]}
+                return {"oneOf": [SchemaGenerator._get_type_schema(t, defs) for t in non_none_types]}
         elif inspect.isclass(type_hint) and issubclass(type_hint, BaseModel):
-            return type_hint.model_json_schema()
+            return SchemaGenerator._model_schema(type_hint, defs)
         elif type_hint == str:
             return {"type": "string"}
         elif type_hint == int:
@@ -71,21 +132,54 @@ class SchemaGenerator:
             return {"type": "boolean"}
         elif type_hint == bytes:
             return {"type": "string", "format": "binary"}
-        else:
-            return {"type": "any"}
+        return {"type": "any"}
+
+    @staticmethod
+    def _model_schema(model: Type[BaseModel], defs: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Get the schema for a Pydantic model, inline or as a ``$ref`` into defs."""
+        schema = SchemaGenerator._model_cache.get(model)
+        if schema is None:
+            schema = model.model_json_schema()
+            SchemaGenerator._model_cache[model] = schema
+        if defs is None:
+            return copy.deepcopy(schema)
+
+        name = model.__name__
+        nested = schema.get("$defs", {})
+        body = {key: value for key, value in schema.items() if key != "$defs"}
+        conflicts = [
+            key for key, value in list(nested.items()) + [(name, body)]
+            if key in defs and defs[key] != value
+        ]
+        if conflicts:
+            # A different model already owns one of these names; inline it.
+            return copy.deepcopy(schema)
+        defs.update(copy.deepcopy(nested))
+        defs[name] = copy.deepcopy(body)
+        return {"$ref": f"#/$defs/{name}"}
+
+    @staticmethod
+    def _parse_param_descriptions(docstring: str) -> Dict[str, str]:
+        """Extract all ``:param name:`` descriptions from a docstring in one pass."""
+        descriptions = {}
+        current = None
+        for line in docstring.split("\n"):
+            stripped = line.strip()
+            if stripped.startswith(":param "):
+                current = None
+                marker, sep, desc = stripped[len(":param "):].partition(":")
+                if sep:
+                    # ":param int user_id:" style includes the type before the name
+                    current = marker.split()[-1] if marker.split() else None
+                    if current:
+                        descriptions[current] = desc.strip()
+            elif current and stripped and not stripped.startswith(":"):
+                descriptions[current] += " " + stripped
+            else:
+                current = None
+        return descriptions
 
     @staticmethod
     def _extract_param_description(docstring: str, param_name: str) -> Optional[str]:
         """Extract parameter description from docstring."""
-        lines = docstring.split("\n")
-        param_marker = f":param {param_name}:"
-        for i, line in enumerate(lines):
-            if param_marker in line:
-                desc = line.split(param_marker)[1].strip()
-                # Check for multi-line description
-                j = i + 1
-                while j < len(lines) and lines[j].strip() and not lines[j].strip().startswith(":"):
-                    desc += " " + lines[j].strip()
-                    j += 1
-                return desc
-        return None
+        return SchemaGenerator._parse_param_descriptions(docstring).get(param_name)
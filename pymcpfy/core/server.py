@@ -0,0 +1,276 @@
+"""Running MCP servers from configuration, in one or several processes."""
+
+import asyncio
+import dataclasses
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+from typing import Callable, Dict, List
+
+from ..config import MCPConfig, TransportConfig
+from .admission import ConcurrencyLimiter
+from .mcp_protocol import MCPRegistry
+from .metrics import CallMetrics
+from .profiling import CallProfiler
+from .ratelimit import RateLimiter
+from .transport import BaseTransport, HTTPTransport, SSETransport, StdioTransport, WebSocketTransport
+
+def create_transport(
+    registry: MCPRegistry,
+    config: TransportConfig,
+    reuse_port: bool = False
+) -> BaseTransport:
+    """Create the transport described by a TransportConfig."""
+    common = dict(
+        max_batch_size=config.max_batch_size,
+        batch_concurrency=config.batch_concurrency
+    )
+    if config.type == "websocket":
+        return WebSocketTransport(
+            registry,
+            host=config.host,
+            port=config.port,
+            ping_interval=config.ping_interval,
+            ping_timeout=config.ping_timeout,
+            max_concurrency=config.max_concurrency,
+            max_queued=config.max_queued,
+            unix_socket=config.unix_socket,
+            reuse_port=reuse_port,
+            **common
+        )
+    if config.type == "http":
+        return HTTPTransport(
+            registry,
+            host=config.host,
+            port=config.port,
+            engine=config.http_engine,
+            keepalive_timeout=config.keepalive_timeout,
+            max_requests_per_connection=config.max_requests_per_connection,
+            pipeline_depth=config.pipeline_depth,
+            unix_socket=config.unix_socket,
+            reuse_port=reuse_port,
+            **common
+        )
+    if config.type == "sse":
+        return SSETransport(
+            registry,
+            host=config.host,
+            port=config.port,
+            ping_interval=config.ping_interval,
+            max_concurrency=config.max_concurrency,
+            max_queued=config.max_queued,
+            keepalive_timeout=config.keepalive_timeout,
+            max_requests_per_connection=config.max_requests_per_connection,
+            unix_socket=config.unix_socket,
+            reuse_port=reuse_port,
+            **common
+        )
+    if config.type == "stdio":
+        return StdioTransport(
+            registry,
+            framing=config.framing,
+            max_concurrency=config.max_concurrency,
+            max_queued=config.max_queued,
+            **common
+        )
+    raise ValueError(f"Unknown transport type: {config.type}")
+
+async def run_transport(transport: BaseTransport):
+    """Run a transport until SIGTERM or SIGINT, then stop it gracefully."""
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):  # pragma: no cover - non-Unix or non-main thread
+            pass
+    await transport.start()
+    try:
+        waiters = [asyncio.ensure_future(stop.wait())]
+        if isinstance(transport, StdioTransport):
+            waiters.append(asyncio.ensure_future(transport.wait_closed()))
+        await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        for waiter in waiters:
+            waiter.cancel()
+    finally:
+        await transport.stop()
+
+def serve(registry: MCPRegistry, config: MCPConfig) -> int:
+    """Serve a registry as configured, forking ``config.workers`` processes.
+
+    With more than one worker, each worker binds the same port with
+    ``SO_REUSEPORT`` so the kernel spreads connections across them. The
+    registry is built before forking, so its functions, compiled invokers
+    and schemas are shared copy-on-write. Blocks until SIGTERM or SIGINT
+    and returns the exit status.
+
+    A registry without a limiter gets the one configured by
+    ``max_inflight`` or ``adaptive_limit``, and one without a rate limiter
+    the one configured by ``rate_limit`` or ``max_concurrent_per_key``;
+    over a Unix socket, that one must key on a metadata field. Each
+    worker enforces them on its own calls. Unless ``metrics`` is off, a
+    registry without metrics gets a ``CallMetrics``, kept by each worker
+    for its own calls. With ``debug`` on, a registry without a
+    profiler gets the ``CallProfiler`` configured by ``profile_threshold``,
+    ``profile_sample_rate`` and ``profile_records``.
+    """
+    if registry.limiter is None and (config.max_inflight or config.adaptive_limit):
+        registry.limiter = ConcurrencyLimiter.from_config(config)
+    if registry.rate_limiter is None and (config.rate_limit or config.max_concurrent_per_key):
+        if config.transport.unix_socket and config.rate_limit_key in ("peer", "connection"):
+            # Unix socket peers have no address, so they would share one quota.
+            raise ValueError("Rate limits over a Unix socket need rate_limit_key to name a metadata field")
+        registry.rate_limiter = RateLimiter.from_config(config)
+    if registry.metrics is None and config.metrics:
+        registry.metrics = CallMetrics()
+    if registry.profiler is None and config.debug:
+        registry.profiler = CallProfiler.from_config(config)
+    transport_config = config.transport
+    if config.workers <= 1:
+        asyncio.run(run_transport(create_transport(registry, transport_config)))
+        return 0
+    if transport_config.type == "stdio":
+        raise ValueError("The stdio transport cannot run multiple workers")
+    if transport_config.unix_socket:
+        raise ValueError("Multiple workers need a TCP port; SO_REUSEPORT does not apply to Unix sockets")
+
+    reserved = None
+    if transport_config.port == 0:
+        # Pick the port once so every worker binds the same one.
+        reserved = _reserve_port(transport_config.host)
+        transport_config = dataclasses.replace(transport_config, port=reserved.getsockname()[1])
+
+    # Fill all caches that touch the registry before forking.
+    registry.get_schema_json()
+    registry.dispatcher
+    gc.collect()
+    gc.freeze()
+
+    def worker():
+        asyncio.run(run_transport(create_transport(registry, transport_config, reuse_port=True)))
+
+    try:
+        return Supervisor(worker, config.workers).run()
+    finally:
+        if reserved is not None:
+            reserved.close()
+
+class Supervisor:
+    """Fork worker processes and keep them running.
+
+    Workers that exit while the supervisor is running are restarted, with
+    an increasing delay when they keep crashing right after starting. On
+    SIGTERM or SIGINT every worker is sent SIGTERM to drain its
+    connections, and those still running after ``shutdown_timeout``
+    seconds are killed.
+    """
+
+    def __init__(
+        self,
+        target: Callable[[], None],
+        workers: int,
+        shutdown_timeout: float = 30.0,
+        min_uptime: float = 1.0,
+        max_restart_delay: float = 5.0
+    ):
+        self.target = target
+        self.workers = workers
+        self.shutdown_timeout = shutdown_timeout
+        self.min_uptime = min_uptime
+        self.max_restart_delay = max_restart_delay
+        self.pids: Dict[int, float] = {}
+        self.restarts = 0
+        self._stopping = False
+        self._restart_delay = 0.0
+        self._pending: List[float] = []
+
+    def run(self) -> int:
+        """Start the workers and supervise them until asked to stop."""
+        previous = {sig: signal.signal(sig, self._request_stop) for sig in (signal.SIGTERM, signal.SIGINT)}
+        try:
+            for _ in range(self.workers):
+                self._spawn()
+            while not self._stopping:
+                self._reap()
+                now = time.monotonic()
+                for due in [due for due in self._pending if due <= now]:
+                    self._pending.remove(due)
+                    self._spawn()
+                time.sleep(0.05)
+            self._shutdown()
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+        return 0
+
+    def _request_stop(self, signum, frame):
+        """Signal handler starting a graceful shutdown."""
+        self._stopping = True
+
+    def _spawn(self):
+        """Fork one worker process."""
+        pid = os.fork()
+        if pid == 0:
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(sig, signal.SIG_DFL)
+            status = 0
+            try:
+                self.target()
+            except BaseException:
+                traceback.print_exc()
+                status = 1
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(status)
+        self.pids[pid] = time.monotonic()
+
+    def _reap(self):
+        """Collect exited workers and schedule their replacements."""
+        while self.pids:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            started = self.pids.pop(pid, None)
+            if started is None or self._stopping:
+                continue
+            if time.monotonic() - started < self.min_uptime:
+                self._restart_delay = min(max(self._restart_delay * 2, 0.1), self.max_restart_delay)
+            else:
+                self._restart_delay = 0.0
+            self.restarts += 1
+            print(f"MCP worker {pid} exited, restarting", file=sys.stderr)
+            self._pending.append(time.monotonic() + self._restart_delay)
+
+    def _shutdown(self):
+        """Ask every worker to drain, then kill the ones that do not exit."""
+        for pid in list(self.pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.shutdown_timeout
+        while self.pids and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.05)
+        for pid in list(self.pids):
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+            self.pids.pop(pid, None)
+
+def _reserve_port(host: str) -> socket.socket:
+    """Bind a SO_REUSEPORT socket to a free port without listening on it."""
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, 0))
+    return sock
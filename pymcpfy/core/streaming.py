@@ -0,0 +1,79 @@
+"""Streaming responses from generator functions.
+
+A streaming function's response carries an async iterator under ``stream``
+instead of ``data``. Transports send it as a sequence of frames tagged
+with the request ``id`` and a sequence number::
+
+    {"id": "1", "seq": 0, "data": <chunk>, "status": 200}
+    {"id": "1", "seq": 1, "data": <chunk>, "status": 200}
+    {"id": "1", "seq": 2, "done": true, "status": 200}
+
+If the function fails part way, the last frame carries ``error`` and its
+status instead. Chunks are pulled from the function only as fast as the
+transport sends them, so at most one chunk is buffered per stream.
+"""
+
+from typing import Any, AsyncIterator, Dict
+
+from .codecs import Codec
+from .mcp_protocol import MCPError
+
+def is_stream(response: Any) -> bool:
+    """Check whether a dispatch result is a streaming response."""
+    return isinstance(response, dict) and "stream" in response
+
+async def stream_frames(response: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    """Yield the frames of a streaming response, closing the stream at the end."""
+    request_id = response.get("id")
+    stream = response["stream"]
+    seq = 0
+    try:
+        async for chunk in stream:
+            yield {"id": request_id, "seq": seq, "data": chunk, "status": 200}
+            seq += 1
+    except MCPError as e:
+        yield {"id": request_id, "seq": seq, "error": e.message, "status": e.status, "done": True}
+        return
+    except Exception as e:
+        yield {"id": request_id, "seq": seq, "error": str(e), "status": 500, "done": True}
+        return
+    finally:
+        aclose = getattr(stream, "aclose", None)
+        if aclose is not None:
+            await aclose()
+    yield {"id": request_id, "seq": seq, "done": True, "status": 200}
+
+async def encode_frames(response: Dict[str, Any], codec: Codec) -> AsyncIterator[bytes]:
+    """Yield the encoded frames of a streaming response.
+
+    A chunk the codec cannot encode ends the stream with an error frame.
+    """
+    frames = stream_frames(response)
+    try:
+        async for frame in frames:
+            try:
+                data = codec.encode(frame)
+            except Exception as e:
+                yield codec.encode({
+                    "id": frame["id"], "seq": frame["seq"], "error": str(e), "status": 500, "done": True
+                })
+                return
+            yield data
+    finally:
+        await frames.aclose()
+
+async def collect_stream(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a streaming response into a regular one with a list of chunks.
+
+    Used where a response must fit in one message, such as batch and
+    pipeline results. Non-streaming responses are returned unchanged.
+    """
+    if not is_stream(response):
+        return response
+    chunks = []
+    async for frame in stream_frames(response):
+        if "error" in frame:
+            return {"id": frame["id"], "error": frame["error"], "status": frame["status"]}
+        if not frame.get("done"):
+            chunks.append(frame["data"])
+    return {"id": response.get("id"), "data": chunks, "status": 200, "metadata": response.get("metadata", {})}
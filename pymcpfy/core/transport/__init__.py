@@ -3,5 +3,7 @@
 from .base_transport import BaseTransport
 from .websocket_transport import WebSocketTransport
 from .http_transport import HTTPTransport
+from .sse_transport import SSETransport
+from .stdio_transport import StdioTransport
 
-__all__ = ["BaseTransport", "WebSocketTransport", "HTTPTransport"]
+__all__ = ["BaseTransport", "WebSocketTransport", "HTTPTransport", "SSETransport", "StdioTransport"]
@@ -1,7 +1,9 @@
 """Base transport interface for MCP."""
 
+import os
+import stat
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Any, Optional
 
 from ..mcp_protocol import MCPRegistry
 
@@ -21,3 +23,24 @@ class BaseTransport(ABC):
     async def stop(self):
         """Stop the transport server."""
         pass
+
+def peer_name(address: Any) -> Optional[str]:
+    """Connection identity for a socket peer address: ``host:port``.
+
+    Unix socket peers have no address and get None.
+    """
+    if isinstance(address, (tuple, list)) and len(address) >= 2:
+        return f"{address[0]}:{address[1]}"
+    return None
+
+def unlink_unix_socket(path: str):
+    """Remove a Unix socket file left behind at ``path``, if any.
+
+    Other kinds of files are left alone, so binding fails instead of
+    deleting them.
+    """
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
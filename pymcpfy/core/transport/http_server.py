@@ -0,0 +1,156 @@
+"""Minimal asyncio HTTP/1.1 primitives used by the MCP HTTP transports."""
+
+import asyncio
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+class HTTPError(Exception):
+    """Error raised while reading a malformed or unsupported HTTP request."""
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+@dataclass
+class HTTPRequest:
+    """A parsed HTTP request."""
+    method: str
+    target: str
+    version: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+    peer: Optional[str] = None  # identity of the client connection
+
+    @property
+    def path(self) -> str:
+        """Request path without the query string."""
+        return urlsplit(self.target).path
+
+    @property
+    def query(self) -> Dict[str, list]:
+        """Parsed query string parameters."""
+        return parse_qs(urlsplit(self.target).query)
+
+    @property
+    def keep_alive(self) -> bool:
+        """Whether the client wants the connection kept open after this request."""
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+async def read_request(
+    reader: asyncio.StreamReader,
+    max_body_size: int = MAX_BODY_SIZE
+) -> Optional[HTTPRequest]:
+    """Read one request from the stream, returning None on a clean EOF."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if not e.partial.strip():
+            return None
+        raise HTTPError(400, "Incomplete request")
+    except asyncio.LimitOverrunError:
+        raise HTTPError(431, "Request header fields too large")
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Malformed request line")
+    if not version.startswith("HTTP/1."):
+        raise HTTPError(505, "HTTP version not supported")
+
+    headers = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, sep, value = line.partition(":")
+        if not sep:
+            raise HTTPError(400, "Malformed header")
+        headers[name.strip().lower()] = value.strip()
+
+    if "transfer-encoding" in headers:
+        raise HTTPError(501, "Transfer-Encoding not supported")
+    try:
+        content_length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HTTPError(400, "Invalid Content-Length")
+    if content_length < 0:
+        raise HTTPError(400, "Invalid Content-Length")
+    if content_length > max_body_size:
+        raise HTTPError(413, "Request body too large")
+
+    body = await reader.readexactly(content_length) if content_length else b""
+    return HTTPRequest(method=method, target=target, version=version, headers=headers, body=body)
+
+def build_response(
+    status: int,
+    body: bytes = b"",
+    content_type: str = "application/json",
+    headers: Optional[Dict[str, str]] = None,
+    keep_alive: bool = True
+) -> bytes:
+    """Serialize a complete HTTP/1.1 response with Content-Length framing."""
+    try:
+        reason = HTTPStatus(status).phrase
+    except ValueError:
+        reason = ""
+    lines = [f"HTTP/1.1 {status} {reason}"]
+    if body:
+        lines.append(f"Content-Type: {content_type}")
+    if status not in (204, 304):
+        lines.append(f"Content-Length: {len(body)}")
+    lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+    for name, value in (headers or {}).items():
+        lines.append(f"{name}: {value}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+def build_stream_head(
+    status: int,
+    content_type: str,
+    headers: Optional[Dict[str, str]] = None,
+    keep_alive: bool = True
+) -> bytes:
+    """Serialize the head of a response with a chunked body."""
+    lines = [
+        f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+        f"Content-Type: {content_type}",
+        "Transfer-Encoding: chunked",
+        "Connection: keep-alive" if keep_alive else "Connection: close",
+    ]
+    for name, value in (headers or {}).items():
+        lines.append(f"{name}: {value}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+def encode_chunk(data: bytes) -> bytes:
+    """Frame bytes as one HTTP/1.1 chunk; empty data ends the body."""
+    return b"%x\r\n%s\r\n" % (len(data), data) if data else b"0\r\n\r\n"
+
+def sse_event(data: str, event: Optional[str] = None, event_id: Optional[str] = None) -> bytes:
+    """Serialize one Server-Sent Events event."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.extend(f"data: {line}" for line in data.split("\n"))
+    return ("\n".join(lines) + "\n\n").encode()
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an ``If-None-Match`` header value against an entity tag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
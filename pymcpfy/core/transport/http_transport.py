@@ -2,134 +2,544 @@
 
 import asyncio
 import json
-from typing import Any, Dict, Optional, Tuple, Callable
-from urllib.parse import parse_qs
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import socketserver
+import threading
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple, Union
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 
-from ..mcp_protocol import MCPRegistry, MCPContext, MCPResponse
+from ..codecs import JSON_CODEC, Codec, codec_for_content_type, codecs_by_name
+from ..mcp_protocol import MCPRegistry
+from ..metrics import PROMETHEUS_CONTENT_TYPE
+from ..streaming import collect_stream, encode_frames, is_stream
+from .base_transport import BaseTransport, peer_name, unlink_unix_socket
+from .http_server import (
+    HTTPError, HTTPRequest, build_response, build_stream_head, encode_chunk, etag_matches, read_request, sse_event
+)
+
+def stream_parts(
+    response: Dict[str, Any],
+    codec: Codec,
+    accept: Optional[str]
+) -> Tuple[str, AsyncIterator[bytes]]:
+    """Pick the stream format and return its content type and body parts."""
+    if accept and "text/event-stream" in accept:
+        async def events() -> AsyncIterator[bytes]:
+            frames = encode_frames(response, JSON_CODEC)
+            try:
+                seq = 0
+                async for data in frames:
+                    yield sse_event(data.decode(), event_id=str(seq))
+                    seq += 1
+            finally:
+                await frames.aclose()
+        return "text/event-stream", events()
+    if codec.binary:
+        return codec.content_type, encode_frames(response, codec)
+
+    async def lines() -> AsyncIterator[bytes]:
+        frames = encode_frames(response, codec)
+        try:
+            async for data in frames:
+                yield data + b"\n"
+        finally:
+            await frames.aclose()
+    return "application/x-ndjson", lines()
+
+def response_status(response: Union[Dict[str, Any], List[Dict[str, Any]]]) -> int:
+    """HTTP status for a dispatch result; batches carry per-request statuses."""
+    if isinstance(response, list):
+        return 200
+    return response.get("status", 200)
 
 class MCPHTTPRequestHandler(BaseHTTPRequestHandler):
-    """HTTP request handler for MCP."""
+    """HTTP request handler for MCP, used by the threaded engine."""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    timeout = 5.0  # Idle keep-alive timeout in seconds
+    max_requests = 1000  # Requests served per connection before closing
     registry: MCPRegistry
+    transport: "HTTPTransport"
     event_loop: asyncio.AbstractEventLoop
 
+    def address_string(self) -> str:
+        """Client address for logging; Unix socket peers have none."""
+        if isinstance(self.client_address, tuple):
+            return super().address_string()
+        return "unix"
+
+    def handle(self):
+        """Serve requests on a persistent connection."""
+        self.requests_served = 0
+        super().handle()
+
     def do_POST(self):
         """Handle POST requests."""
         try:
             content_length = int(self.headers.get('Content-Length', 0))
-            request_body = self.rfile.read(content_length).decode('utf-8')
-            request = json.loads(request_body)
+        except ValueError:
+            content_length = -1
+        if content_length < 0:
+            # The body cannot be framed, so the connection cannot be reused.
+            self.close_connection = True
+            self._send_error(400, "Invalid Content-Length")
+            return
+        request_body = self.rfile.read(content_length)
+        codec, response_codec = self.transport._negotiate(
+            self.headers.get("Content-Type"), self.headers.get("Accept")
+        )
 
-            response = self.event_loop.run_until_complete(
-                self._handle_request(request)
-            )
+        metrics = self.registry.metrics
+        try:
+            request = codec.decode(request_body) if metrics is None else metrics.decode("http", codec, request_body)
+        except ValueError:
+            self._send_error(400, codec.invalid_message)
+            return
+        try:
+            response = asyncio.run_coroutine_threadsafe(
+                self.transport._dispatch(request, peer_name(self.client_address)),
+                self.event_loop
+            ).result()
 
-            self.send_response(response.get("status", 200))
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode())
+            if is_stream(response):
+                if self.request_version != "HTTP/1.0":
+                    self._send_stream(response, response_codec)
+                    return
+                response = asyncio.run_coroutine_threadsafe(collect_stream(response), self.event_loop).result()
 
-        except json.JSONDecodeError:
-            self._send_error(400, "Invalid JSON")
+            self._send_body(
+                response_status(response),
+                response_codec.encode(response) if metrics is None else metrics.encode("http", response_codec, response),
+                content_type=response_codec.content_type
+            )
         except Exception as e:
             self._send_error(500, str(e))
 
     def do_GET(self):
-        """Handle GET requests for schema."""
+        """Handle GET requests for the schema, metrics and call profiles."""
         if self.path == "/schema":
-            schema = self.registry.get_schema()
-            self.send_response(200)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
-            self.wfile.write(json.dumps(schema).encode())
+            body, etag = self.registry.get_schema_json()
+            if etag_matches(self.headers.get("If-None-Match"), etag):
+                self._send_not_modified(etag)
+            else:
+                self._send_body(200, body, headers={"ETag": etag})
+        elif self.path == "/metrics" and self.registry.metrics is not None:
+            self._send_body(200, self.registry.metrics.render().encode(), content_type=PROMETHEUS_CONTENT_TYPE)
+        elif self.path == "/debug/profiles" and self.registry.profiler is not None:
+            self._send_body(200, self.registry.profiler.render().encode())
         else:
             self._send_error(404, "Not found")
 
     def _send_error(self, status: int, message: str):
         """Send error response."""
-        self.send_response(status)
-        self.send_header("Content-Type", "application/json")
-        self.end_headers()
-        self.wfile.write(json.dumps({
+        self._send_body(status, json.dumps({
             "error": message,
             "status": status
         }).encode())
 
-    async def _handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
-        """Handle MCP request."""
-        request_id = request.get("id")
-        function_name = request.get("function")
-        parameters = request.get("parameters", {})
-
-        if not function_name:
-            return {
-                "id": request_id,
-                "error": "Missing function name",
-                "status": 400
-            }
-
-        function = self.registry.get_function(function_name)
-        if not function:
-            return {
-                "id": request_id,
-                "error": f"Function {function_name} not found",
-                "status": 404
-            }
-
-        context = MCPContext(
-            request_id=request_id,
-            metadata=request.get("metadata", {}),
-            transport="http",
-            raw_request=request
-        )
+    def _send_body(
+        self,
+        status: int,
+        body: bytes,
+        content_type: str = "application/json",
+        headers: Optional[Dict[str, str]] = None
+    ):
+        """Send a response framed with Content-Length."""
+        self.requests_served += 1
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if self.requests_served >= self.max_requests:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
 
+    def _send_stream(self, response: Dict[str, Any], codec: Codec):
+        """Send a streaming response with chunked transfer encoding."""
+        self.requests_served += 1
+        content_type, parts = stream_parts(response, codec, self.headers.get("Accept"))
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        if self.requests_served >= self.max_requests:
+            self.send_header("Connection", "close")
+        self.end_headers()
         try:
-            if function.is_async:
-                result = await function.func(context, **parameters)
-            else:
-                result = await asyncio.to_thread(function.func, context, **parameters)
+            while True:
+                try:
+                    part = asyncio.run_coroutine_threadsafe(parts.__anext__(), self.event_loop).result()
+                except StopAsyncIteration:
+                    break
+                self.wfile.write(encode_chunk(part))
+            self.wfile.write(encode_chunk(b""))
+        except OSError:
+            self.close_connection = True
+        finally:
+            asyncio.run_coroutine_threadsafe(parts.aclose(), self.event_loop).result()
 
-            if isinstance(result, MCPResponse):
-                response = result.to_dict()
-            else:
-                response = MCPResponse(result).to_dict()
+    def _send_not_modified(self, etag: str):
+        """Send a bodiless 304 response."""
+        self.requests_served += 1
+        self.send_response(304)
+        self.send_header("ETag", etag)
+        if self.requests_served >= self.max_requests:
+            self.send_header("Connection", "close")
+        self.end_headers()
 
-            response["id"] = request_id
-            return response
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded HTTP server listening on a Unix domain socket."""
+    daemon_threads = True
 
-        except Exception as e:
-            return {
-                "id": request_id,
-                "error": str(e),
-                "status": 500
-            }
-
-class HTTPTransport:
-    """HTTP transport for MCP communication."""
+class HTTPTransport(BaseTransport):
+    """HTTP transport for MCP communication.
+
+    The default ``"asyncio"`` engine serves HTTP/1.1 directly on the running
+    event loop, so requests are dispatched concurrently. The ``"threaded"``
+    engine keeps the ``http.server`` based handler, serving each connection
+    from its own thread.
+
+    Request bodies are decoded according to ``Content-Type`` (JSON, or
+    MessagePack when installed) and responses are encoded with the codec
+    named by ``Accept``, defaulting to the request's codec. ``codecs``
+    restricts the available codecs by name.
+
+    Connections are persistent: they are closed after ``keepalive_timeout``
+    seconds of inactivity or after ``max_requests_per_connection`` requests.
+    The asyncio engine also reads pipelined requests ahead, dispatching up to
+    ``pipeline_depth`` of them concurrently while writing responses in order.
+
+    A POST body may also be an array of requests, answered with an array of
+    responses; up to ``batch_concurrency`` of them execute at once and
+    arrays longer than ``max_batch_size`` are rejected.
+
+    Results of generator functions are streamed with chunked transfer
+    encoding, one frame per chunk: newline-delimited JSON, MessagePack
+    objects, or Server-Sent Events when the client accepts
+    ``text/event-stream``. HTTP/1.0 clients receive the collected result.
+
+    When the registry records metrics, ``GET /metrics`` serves them in the
+    Prometheus text format; see ``pymcpfy.core.metrics``. When it has a
+    profiler, ``GET /debug/profiles`` serves the profiles of slow calls;
+    see ``pymcpfy.core.profiling``.
+
+    When ``unix_socket`` is set the server listens on that Unix domain
+    socket path instead of ``host`` and ``port``. ``reuse_port`` sets
+    ``SO_REUSEPORT`` so several worker processes can share the port.
+    """
     def __init__(
         self,
         registry: MCPRegistry,
         host: str = "localhost",
-        port: int = 8080
+        port: int = 8080,
+        engine: str = "asyncio",
+        backlog: int = 1024,
+        keepalive_timeout: float = 5.0,
+        max_requests_per_connection: int = 1000,
+        pipeline_depth: int = 16,
+        codecs: Optional[List[str]] = None,
+        max_batch_size: int = 100,
+        batch_concurrency: int = 16,
+        unix_socket: Optional[str] = None,
+        reuse_port: bool = False
     ):
-        self.registry = registry
+        if engine not in ("asyncio", "threaded"):
+            raise ValueError(f"Unknown HTTP engine: {engine}")
+        super().__init__(registry)
         self.host = host
         self.port = port
-        self._server: Optional[HTTPServer] = None
-        self._event_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.engine = engine
+        self.backlog = backlog
+        self.keepalive_timeout = keepalive_timeout
+        self.max_requests_per_connection = max_requests_per_connection
+        self.pipeline_depth = pipeline_depth
+        self.codecs: List[Codec] = codecs_by_name(codecs)
+        self.max_batch_size = max_batch_size
+        self.batch_concurrency = batch_concurrency
+        self.unix_socket = unix_socket
+        self.reuse_port = reuse_port
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._http_server: Optional[socketserver.BaseServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._connections: Set[asyncio.StreamWriter] = set()
+        self._handlers: Set[asyncio.Task] = set()
 
-    def start(self):
+    async def start(self):
         """Start the HTTP server."""
-        class Handler(MCPHTTPRequestHandler):
-            registry = self.registry
-            event_loop = asyncio.new_event_loop()
+        if self.engine == "threaded":
+            mcp_transport = self
 
-        self._server = HTTPServer((self.host, self.port), Handler)
-        print(f"MCP HTTP server running at http://{self.host}:{self.port}")
-        self._server.serve_forever()
+            class Handler(MCPHTTPRequestHandler):
+                registry = mcp_transport.registry
+                transport = mcp_transport
+                event_loop = asyncio.get_running_loop()
+                timeout = mcp_transport.keepalive_timeout
+                max_requests = mcp_transport.max_requests_per_connection
+                # TCP_NODELAY does not apply to Unix sockets
+                disable_nagle_algorithm = not mcp_transport.unix_socket
+
+            if self.unix_socket:
+                unlink_unix_socket(self.unix_socket)
+                self._http_server = ThreadingUnixHTTPServer(self.unix_socket, Handler, bind_and_activate=False)
+            else:
+                self._http_server = ThreadingHTTPServer((self.host, self.port), Handler, bind_and_activate=False)
+            self._http_server.request_queue_size = self.backlog
+            self._http_server.allow_reuse_port = self.reuse_port
+            self._http_server.server_bind()
+            self._http_server.server_activate()
+            if not self.unix_socket:
+                self.port = self._http_server.server_address[1]
+            self._thread = threading.Thread(target=self._http_server.serve_forever, daemon=True)
+            self._thread.start()
+        elif self.unix_socket:
+            unlink_unix_socket(self.unix_socket)
+            self._server = await asyncio.start_unix_server(
+                self._handle_connection,
+                self.unix_socket,
+                backlog=self.backlog
+            )
+        else:
+            self._server = await asyncio.start_server(
+                self._handle_connection,
+                self.host,
+                self.port,
+                backlog=self.backlog,
+                reuse_port=self.reuse_port or None
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+        if self.unix_socket:
+            print(f"MCP HTTP server running at unix:{self.unix_socket}")
+        else:
+            print(f"MCP HTTP server running at http://{self.host}:{self.port}")
 
-    def stop(self):
+    async def stop(self):
         """Stop the HTTP server."""
+        if self._http_server:
+            # shutdown() blocks until serve_forever returns, and an in-flight
+            # handler may be waiting on this loop, so wait from a thread.
+            await asyncio.to_thread(self._http_server.shutdown)
+            self._http_server.server_close()
+            self._http_server = None
         if self._server:
-            self._server.shutdown()
-            self._server.server_close()
+            self._server.close()
+            for writer in list(self._connections):
+                writer.close()
+            if self._handlers:
+                # Let connection handlers see the close and finish.
+                await asyncio.wait(set(self._handlers), timeout=self.keepalive_timeout)
+            await self._server.wait_closed()
+            self._server = None
+        if self.unix_socket:
+            unlink_unix_socket(self.unix_socket)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve HTTP requests from a single client connection.
+
+        Requests are read by a separate task and their responses queued in
+        arrival order, so pipelined requests are dispatched concurrently.
+        When the client closes the connection, requests still in flight,
+        including open streams, are cancelled.
+        """
+        self._connections.add(writer)
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        responses: asyncio.Queue = asyncio.Queue(maxsize=self.pipeline_depth)
+        peer = peer_name(writer.get_extra_info("peername"))
+        idle = asyncio.Event()
+        idle.set()
+        reader_task = asyncio.create_task(self._read_requests(reader, responses, peer, handler, idle))
+        try:
+            while True:
+                if responses.empty():
+                    idle.set()
+                response = await responses.get()
+                idle.clear()
+                if response is None:
+                    break
+                if not isinstance(response, bytes):
+                    response = await response
+                if isinstance(response, bytes):
+                    writer.write(response)
+                    await writer.drain()
+                    continue
+                try:
+                    # A streaming body: write each part once the previous
+                    # one has drained, so the producer runs at socket speed.
+                    async for part in response:
+                        writer.write(part)
+                        await writer.drain()
+                finally:
+                    await response.aclose()
+        except ConnectionError:
+            pass
+        except asyncio.CancelledError:
+            # The reader cancels this handler once the client has closed the
+            # connection; the connection ends quietly then.
+            if not (reader_task.done() and not reader_task.cancelled() and reader_task.result()):
+                raise
+        finally:
+            reader_task.cancel()
+            while not responses.empty():
+                response = responses.get_nowait()
+                if isinstance(response, asyncio.Task):
+                    response.cancel()
+            self._connections.discard(writer)
+            self._handlers.discard(handler)
+            writer.close()
+
+    async def _read_requests(
+        self,
+        reader: asyncio.StreamReader,
+        responses: asyncio.Queue,
+        peer: Optional[str] = None,
+        handler: Optional[asyncio.Task] = None,
+        idle: Optional[asyncio.Event] = None
+    ) -> bool:
+        """Read requests from a connection and queue their responses.
+
+        A ``None`` sentinel is queued once the connection should be closed:
+        after the last request it may serve, or after ``keepalive_timeout``
+        seconds without a request while ``idle`` is set and no response is
+        queued. Until the handler has written every response, the
+        connection is still watched; if the client closes it, ``handler``
+        is cancelled along with the responses it has yet to write, and
+        True is returned.
+        """
+        served = 0
+        read = None
+        closed = False
+        try:
+            while True:
+                if read is None:
+                    read = asyncio.ensure_future(read_request(reader))
+                done, _ = await asyncio.wait((read,), timeout=self.keepalive_timeout)
+                if not done:
+                    if (idle is None or idle.is_set()) and responses.empty():
+                        await responses.put(None)
+                        return False
+                    # Calls are still running: the idle timeout starts once they end.
+                    continue
+                try:
+                    request = read.result()
+                except HTTPError as e:
+                    await responses.put(self._error_response(e.status, e.message, keep_alive=False))
+                    break
+                finally:
+                    read = None
+                if request is None:
+                    closed = True
+                    break
+                request.peer = peer
+
+                served += 1
+                keep_alive = request.keep_alive and served < self.max_requests_per_connection
+                await responses.put(asyncio.ensure_future(self._respond(request, keep_alive)))
+                if not keep_alive:
+                    break
+            if not closed:
+                await responses.put(None)
+                # Keep watching for the client going away while the last
+                # responses are written; the handler cancels this task once done.
+                while await reader.read(65536):
+                    pass
+                closed = True
+        except (ConnectionError, asyncio.IncompleteReadError):
+            closed = True
+        finally:
+            if read is not None:
+                read.cancel()
+        if closed and handler is not None:
+            handler.cancel()
+            return True
+        if closed:
+            await responses.put(None)
+        return False
+
+    async def _respond(self, request: HTTPRequest, keep_alive: bool = True) -> Union[bytes, AsyncIterator[bytes]]:
+        """Route a parsed request and return the serialized response.
+
+        Streaming results are returned as an async iterator of bytes.
+        """
+        if request.method == "POST":
+            codec, response_codec = self._negotiate(
+                request.headers.get("content-type"), request.headers.get("accept")
+            )
+            metrics = self.registry.metrics
+            try:
+                payload = codec.decode(request.body) if metrics is None else metrics.decode("http", codec, request.body)
+            except ValueError:
+                return self._error_response(400, codec.invalid_message, keep_alive)
+            try:
+                response = await self._dispatch(payload, request.peer)
+                if is_stream(response):
+                    if request.version != "HTTP/1.0":
+                        return self._stream_response(response, response_codec, request.headers.get("accept"), keep_alive)
+                    response = await collect_stream(response)
+                if metrics is None:
+                    body = response_codec.encode(response)
+                else:
+                    body = metrics.encode("http", response_codec, response)
+            except Exception as e:
+                return self._error_response(500, str(e), keep_alive)
+            return build_response(
+                response_status(response),
+                body,
+                content_type=response_codec.content_type,
+                keep_alive=keep_alive
+            )
+        if request.method == "GET":
+            if request.path == "/schema":
+                body, etag = self.registry.get_schema_json()
+                if etag_matches(request.headers.get("if-none-match"), etag):
+                    return build_response(304, headers={"ETag": etag}, keep_alive=keep_alive)
+                return build_response(200, body, headers={"ETag": etag}, keep_alive=keep_alive)
+            if request.path == "/metrics" and self.registry.metrics is not None:
+                body = self.registry.metrics.render().encode()
+                return build_response(200, body, content_type=PROMETHEUS_CONTENT_TYPE, keep_alive=keep_alive)
+            if request.path == "/debug/profiles" and self.registry.profiler is not None:
+                body = self.registry.profiler.render().encode()
+                return build_response(200, body, keep_alive=keep_alive)
+            return self._error_response(404, "Not found", keep_alive)
+        return self._error_response(405, "Method not allowed", keep_alive)
+
+    async def _dispatch(
+        self,
+        payload: Any,
+        connection: Optional[str] = None
+    ) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """Dispatch a decoded request body, which may be a batch."""
+        return await self.registry.dispatcher.dispatch_message(
+            payload, "http", self.max_batch_size, self.batch_concurrency, connection
+        )
+
+    async def _stream_response(
+        self,
+        response: Dict[str, Any],
+        codec: Codec,
+        accept: Optional[str],
+        keep_alive: bool
+    ) -> AsyncIterator[bytes]:
+        """Serialize a streaming response with chunked transfer encoding."""
+        content_type, parts = stream_parts(response, codec, accept)
+        try:
+            yield build_stream_head(200, content_type, keep_alive=keep_alive)
+            async for part in parts:
+                yield encode_chunk(part)
+            yield encode_chunk(b"")
+        finally:
+            await parts.aclose()
+
+    def _negotiate(self, content_type: Optional[str], accept: Optional[str]) -> Tuple[Codec, Codec]:
+        """Pick the request codec and the response codec.
+
+        Unrecognized content types are decoded as JSON, so clients that do
+        not label their requests keep working.
+        """
+        codec = codec_for_content_type(content_type, self.codecs) or JSON_CODEC
+        return codec, codec_for_content_type(accept, self.codecs, codec) or codec
+
+    @staticmethod
+    def _error_response(status: int, message: str, keep_alive: bool = True) -> bytes:
+        """Serialize an error response."""
+        body = json.dumps({"error": message, "status": status}).encode()
+        return build_response(status, body, keep_alive=keep_alive)
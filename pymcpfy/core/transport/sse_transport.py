@@ -0,0 +1,208 @@
+"""Server-Sent Events transport implementation for MCP."""
+
+import asyncio
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Set, Union
+
+from ..codecs import JSON_CODEC
+from ..mcp_protocol import MCPRegistry
+from ..streaming import encode_frames, is_stream
+from .http_server import HTTPRequest, build_response, build_stream_head, encode_chunk, sse_event
+from .http_transport import HTTPTransport
+
+def message_event(message: Any) -> bytes:
+    """Serialize a message as an SSE ``message`` event."""
+    return sse_event(JSON_CODEC.encode(message).decode(), event="message")
+
+class SSESession:
+    """A client's event stream and the requests it has in flight."""
+
+    def __init__(self, session_id: str, max_concurrency: int, max_queued: int, connection: Optional[str] = None):
+        self.id = session_id
+        self.connection = connection
+        self.events: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self.running = asyncio.Semaphore(max_concurrency)
+        self.in_flight = asyncio.Semaphore(max_concurrency + max_queued)
+        self.tasks: Set[asyncio.Task] = set()
+        self.closed = False
+
+    async def send(self, event: bytes):
+        """Queue a serialized event, waiting while the queue is full."""
+        if not self.closed:
+            await self.events.put(event)
+
+    async def submit(self, dispatch: Callable[[Any], Awaitable[Any]], payload: Any):
+        """Start processing a request, waiting while too many are in flight."""
+        await self.in_flight.acquire()
+        task = asyncio.ensure_future(self._process(dispatch, payload))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        task.add_done_callback(lambda _: self.in_flight.release())
+
+    async def next_event(self, ping_interval: float) -> Optional[bytes]:
+        """Wait for the next event, or a ping comment after ``ping_interval``.
+
+        Returns None once the session has been closed.
+        """
+        try:
+            return await asyncio.wait_for(self.events.get(), ping_interval)
+        except asyncio.TimeoutError:
+            return b": ping\n\n"
+
+    def close(self):
+        """End the stream and cancel the session's requests."""
+        if self.closed:
+            return
+        self.closed = True
+        for task in list(self.tasks):
+            task.cancel()
+        # Drop undelivered events so the end-of-stream marker fits.
+        while not self.events.empty():
+            self.events.get_nowait()
+        self.events.put_nowait(None)
+
+    async def _process(self, dispatch: Callable[[Any], Awaitable[Any]], payload: Any):
+        """Dispatch a request and queue its response events."""
+        async with self.running:
+            try:
+                response = await dispatch(payload)
+            except Exception as e:
+                response = {"error": str(e), "status": 500}
+            if is_stream(response):
+                frames = encode_frames(response, JSON_CODEC)
+                try:
+                    async for data in frames:
+                        if self.closed:
+                            break
+                        await self.send(sse_event(data.decode(), event="message"))
+                finally:
+                    await frames.aclose()
+                return
+        try:
+            event = message_event(response)
+        except Exception as e:
+            event = message_event({
+                "id": response.get("id") if isinstance(response, dict) else None,
+                "error": str(e),
+                "status": 500
+            })
+        await self.send(event)
+
+class SSETransport(HTTPTransport):
+    """HTTP+SSE transport for MCP communication.
+
+    Clients open a long-lived event stream with ``GET /sse``. Its first
+    event, ``endpoint``, names the URL to POST requests to
+    (``/messages?session_id=...``). Those POSTs are answered with 202 at
+    once and the responses are delivered on the stream as ``message``
+    events; generator results arrive as one event per chunk. A comment is
+    sent every ``ping_interval`` seconds to keep idle streams open through
+    proxies and to detect clients that went away.
+
+    Each session is a coroutine and a bounded event queue, so idle streams
+    cost no threads. At most ``max_concurrency`` requests per session
+    execute at once and up to ``max_queued`` more are accepted before
+    POSTs wait for a slot. Plain POSTs to any other path and
+    ``GET /schema`` are served as by ``HTTPTransport``.
+    """
+    def __init__(
+        self,
+        registry: MCPRegistry,
+        host: str = "localhost",
+        port: int = 8080,
+        ping_interval: float = 20.0,
+        max_concurrency: int = 32,
+        max_queued: int = 128,
+        backlog: int = 1024,
+        keepalive_timeout: float = 5.0,
+        max_requests_per_connection: int = 1000,
+        max_batch_size: int = 100,
+        batch_concurrency: int = 16,
+        sse_path: str = "/sse",
+        messages_path: str = "/messages",
+        unix_socket: Optional[str] = None,
+        reuse_port: bool = False
+    ):
+        super().__init__(
+            registry,
+            host=host,
+            port=port,
+            engine="asyncio",
+            backlog=backlog,
+            keepalive_timeout=keepalive_timeout,
+            max_requests_per_connection=max_requests_per_connection,
+            max_batch_size=max_batch_size,
+            batch_concurrency=batch_concurrency,
+            unix_socket=unix_socket,
+            reuse_port=reuse_port
+        )
+        self.ping_interval = ping_interval
+        self.max_concurrency = max_concurrency
+        self.max_queued = max_queued
+        self.sse_path = sse_path
+        self.messages_path = messages_path
+        self.sessions: Dict[str, SSESession] = {}
+
+    async def stop(self):
+        """End all event streams and stop the server."""
+        for session in list(self.sessions.values()):
+            self._close_session(session)
+        await super().stop()
+
+    async def notify(self, session_id: str, message: Dict[str, Any]) -> bool:
+        """Send a notification to one session; returns False if it is gone."""
+        session = self.sessions.get(session_id)
+        if session is None:
+            return False
+        await session.send(message_event(message))
+        return True
+
+    async def broadcast(self, message: Dict[str, Any]):
+        """Send a notification to every open session."""
+        event = message_event(message)
+        await asyncio.gather(*[session.send(event) for session in list(self.sessions.values())])
+
+    async def _respond(self, request: HTTPRequest, keep_alive: bool = True) -> Union[bytes, AsyncIterator[bytes]]:
+        """Route event stream and session message requests."""
+        path = request.path
+        if request.method == "GET" and path == self.sse_path:
+            session = SSESession(uuid.uuid4().hex, self.max_concurrency, self.max_queued, request.peer)
+            self.sessions[session.id] = session
+            return self._event_stream(session)
+        if request.method == "POST" and path == self.messages_path:
+            session_id = request.query.get("session_id", [None])[0]
+            session = self.sessions.get(session_id)
+            if session is None:
+                return self._error_response(404, "Unknown session", keep_alive)
+            codec, _ = self._negotiate(request.headers.get("content-type"), None)
+            metrics = self.registry.metrics
+            try:
+                payload = codec.decode(request.body) if metrics is None else metrics.decode("http", codec, request.body)
+            except ValueError:
+                return self._error_response(400, codec.invalid_message, keep_alive)
+            # Calls are attributed to the client holding the event stream.
+            await session.submit(lambda message: self._dispatch(message, session.connection), payload)
+            return build_response(202, keep_alive=keep_alive)
+        return await super()._respond(request, keep_alive)
+
+    async def _event_stream(self, session: SSESession) -> AsyncIterator[bytes]:
+        """Serialize a session's events as a chunked ``text/event-stream`` body."""
+        try:
+            yield build_stream_head(
+                200, "text/event-stream", headers={"Cache-Control": "no-cache"}, keep_alive=False
+            )
+            endpoint = f"{self.messages_path}?session_id={session.id}"
+            yield encode_chunk(sse_event(endpoint, event="endpoint"))
+            while True:
+                event = await session.next_event(self.ping_interval)
+                if event is None:
+                    break
+                yield encode_chunk(event)
+            yield encode_chunk(b"")
+        finally:
+            self._close_session(session)
+
+    def _close_session(self, session: SSESession):
+        """Forget a session, end its stream and cancel its requests."""
+        self.sessions.pop(session.id, None)
+        session.close()
@@ -0,0 +1,267 @@
+"""Stdio transport implementation for MCP."""
+
+import asyncio
+import struct
+import sys
+from typing import Any, BinaryIO, List, Optional, Set
+
+from ..codecs import Codec, get_codec
+from ..mcp_protocol import MCPRegistry
+from ..streaming import encode_frames, is_stream
+from .base_transport import BaseTransport
+from .http_server import MAX_BODY_SIZE
+
+_LENGTH = struct.Struct(">I")
+
+class StdioTransport(BaseTransport):
+    """Stdio transport for MCP servers launched as a child process.
+
+    Requests are read from stdin and responses written to stdout, framed
+    either one message per line (``"newline"``, JSON only) or with a 4-byte
+    big-endian length prefix (``"length"``, any codec). Reads are
+    non-blocking on the event loop and requests are dispatched
+    concurrently, so responses may arrive out of order and are matched by
+    ``id``; at most ``max_concurrency`` execute at once and up to
+    ``max_queued`` more are read ahead. Responses written in the same event
+    loop iteration are flushed with a single write, and each sender then
+    waits for stdout to drain.
+
+    Pipes, sockets and terminals are read and written on the event loop.
+    Regular files, as in ``server < requests.jsonl > out.log``, cannot be:
+    stdin is then read in a worker thread and stdout written with blocking
+    writes.
+
+    Nothing else may write to stdout while the transport runs; the startup
+    message goes to stderr.
+    """
+    def __init__(
+        self,
+        registry: MCPRegistry,
+        framing: str = "newline",
+        codec: str = "json",
+        max_concurrency: int = 32,
+        max_queued: int = 128,
+        max_message_size: int = MAX_BODY_SIZE,
+        max_batch_size: int = 100,
+        batch_concurrency: int = 16,
+        stdin: Optional[BinaryIO] = None,
+        stdout: Optional[BinaryIO] = None
+    ):
+        if framing not in ("newline", "length"):
+            raise ValueError(f"Unknown framing: {framing}")
+        super().__init__(registry)
+        self.framing = framing
+        self.codec: Codec = get_codec(codec)
+        if framing == "newline" and self.codec.binary:
+            raise ValueError("Newline framing requires a text codec")
+        self.max_concurrency = max_concurrency
+        self.max_queued = max_queued
+        self.max_message_size = max_message_size
+        self.max_batch_size = max_batch_size
+        self.batch_concurrency = batch_concurrency
+        self.stdin = stdin or sys.stdin.buffer
+        self.stdout = stdout or sys.stdout.buffer
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._feed_task: Optional[asyncio.Task] = None
+        self._serve_task: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._buffer: List[bytes] = []
+        self._flushed: Optional[asyncio.Future] = None
+
+    async def start(self):
+        """Start reading requests from stdin."""
+        loop = asyncio.get_running_loop()
+        self._reader = asyncio.StreamReader(limit=self.max_message_size + 1)
+        try:
+            await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(self._reader), self.stdin)
+        except ValueError:
+            # Not a pipe, socket or character device: a regular file.
+            self._feed_task = asyncio.create_task(self._feed_from_file(self._reader))
+        try:
+            transport, protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin, self.stdout)
+        except ValueError:
+            self._writer = None
+        else:
+            self._writer = asyncio.StreamWriter(transport, protocol, None, loop)
+        self._serve_task = asyncio.create_task(self._serve())
+        print(f"MCP stdio server running ({self.framing} framing, {self.codec.name})", file=sys.stderr)
+
+    async def stop(self):
+        """Stop reading and wait for in-flight requests to be answered."""
+        if self._serve_task:
+            self._serve_task.cancel()
+            await asyncio.gather(self._serve_task, return_exceptions=True)
+            self._serve_task = None
+        if self._feed_task:
+            self._feed_task.cancel()
+            self._feed_task = None
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._flush()
+        if self._writer:
+            await self._writer.drain()
+
+    async def wait_closed(self):
+        """Wait until stdin is closed and every request has been answered."""
+        if self._serve_task:
+            await asyncio.gather(self._serve_task, return_exceptions=True)
+
+    async def _serve(self):
+        """Read framed requests and dispatch each in its own task."""
+        in_flight = asyncio.Semaphore(self.max_concurrency + self.max_queued)
+        running = asyncio.Semaphore(self.max_concurrency)
+        try:
+            while True:
+                try:
+                    message = await self._read_message()
+                except ValueError as e:
+                    # The stream cannot be resynchronized after a bad frame.
+                    await self._send({"error": str(e), "status": 413})
+                    break
+                if message is None:
+                    break
+                await in_flight.acquire()
+                task = asyncio.create_task(self._handle_message(message, running))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+                task.add_done_callback(lambda _: in_flight.release())
+        finally:
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._flush()
+
+    async def _feed_from_file(self, reader: asyncio.StreamReader):
+        """Feed ``reader`` from a stdin that the event loop cannot poll.
+
+        Each chunk is read in a worker thread. Reading pauses while the
+        reader holds more than its limit, as a pipe transport would.
+        """
+        flow = _FileFlowControl()
+        reader.set_transport(flow)
+        try:
+            while True:
+                await flow.resumed.wait()
+                chunk = await asyncio.to_thread(self.stdin.read, 65536)
+                if not chunk:
+                    break
+                reader.feed_data(chunk)
+        except Exception as e:
+            reader.set_exception(e)
+        else:
+            reader.feed_eof()
+
+    async def _read_message(self) -> Optional[bytes]:
+        """Read one frame, returning None at end of input."""
+        try:
+            if self.framing == "newline":
+                while True:
+                    line = await self._reader.readuntil(b"\n")
+                    if line.strip():
+                        return line
+            (size,) = _LENGTH.unpack(await self._reader.readexactly(_LENGTH.size))
+            if size > self.max_message_size:
+                raise ValueError("Message too large")
+            return await self._reader.readexactly(size)
+        except asyncio.IncompleteReadError as e:
+            if self.framing == "newline" and e.partial.strip():
+                return e.partial
+            return None
+        except asyncio.LimitOverrunError:
+            raise ValueError("Message too large")
+
+    async def _handle_message(self, message: bytes, running: asyncio.Semaphore):
+        """Process a single message and send its response."""
+        async with running:
+            metrics = self.registry.metrics
+            try:
+                if metrics is None:
+                    request = self.codec.decode(message)
+                else:
+                    request = metrics.decode("stdio", self.codec, message)
+            except ValueError:
+                response = {"error": self.codec.invalid_message, "status": 400}
+            else:
+                try:
+                    response = await self.registry.dispatcher.dispatch_message(
+                        request, "stdio", self.max_batch_size, self.batch_concurrency
+                    )
+                except Exception as e:
+                    response = {"error": str(e), "status": 500}
+            if is_stream(response):
+                frames = encode_frames(response, self.codec)
+                try:
+                    async for data in frames:
+                        await self._write(data)
+                finally:
+                    await frames.aclose()
+                return
+        await self._send(response)
+
+    async def _send(self, response: Any):
+        """Encode and write a response."""
+        metrics = self.registry.metrics
+        try:
+            data = self.codec.encode(response) if metrics is None else metrics.encode("stdio", self.codec, response)
+        except Exception as e:
+            data = self.codec.encode({
+                "id": response.get("id") if isinstance(response, dict) else None,
+                "error": str(e),
+                "status": 500
+            })
+        await self._write(data)
+
+    async def _write(self, data: bytes):
+        """Write a framed message, coalescing the writes of one event loop iteration.
+
+        Returns once the frame has been handed to stdout and stdout has
+        drained, so a slow reader holds back the senders.
+        """
+        if self.framing == "newline":
+            frame = data + b"\n"
+        else:
+            frame = _LENGTH.pack(len(data)) + data
+        if not self._buffer:
+            loop = asyncio.get_running_loop()
+            self._flushed = loop.create_future()
+            loop.call_soon(self._flush)
+        self._buffer.append(frame)
+        flushed = self._flushed
+        await flushed
+        if self._writer is not None:
+            await self._writer.drain()
+
+    def _flush(self):
+        """Write all buffered frames at once."""
+        data = b"".join(self._buffer)
+        self._buffer.clear()
+        flushed, self._flushed = self._flushed, None
+        try:
+            if not data:
+                return
+            if self._writer is None:
+                # A regular file, which is never slow enough to need the loop.
+                self.stdout.write(data)
+                self.stdout.flush()
+            elif not self._writer.is_closing():
+                self._writer.write(data)
+        finally:
+            if flushed is not None and not flushed.done():
+                flushed.set_result(None)
+
+class _FileFlowControl(asyncio.ReadTransport):
+    """Stands in for a read transport so a StreamReader can pause a file feeder."""
+
+    def __init__(self):
+        super().__init__()
+        self.resumed = asyncio.Event()
+        self.resumed.set()
+
+    def pause_reading(self):
+        self.resumed.clear()
+
+    def resume_reading(self):
+        self.resumed.set()
+
+    def is_reading(self) -> bool:
+        return self.resumed.is_set()
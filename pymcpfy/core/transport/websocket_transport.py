@@ -1,39 +1,98 @@
 """WebSocket transport implementation for MCP."""
 
 import asyncio
-import json
-from typing import Any, Dict, Optional
+from typing import Any, List, Optional, Sequence
 import websockets
-from websockets.server import WebSocketServerProtocol
+from websockets.asyncio.server import Server, ServerConnection
 
-from ..mcp_protocol import MCPRegistry, MCPContext, MCPResponse
+from ..cancellation import InFlightCalls, cancelled_response, is_cancel_message
+from ..codecs import Codec, codec_for_subprotocol, codecs_by_name
+from ..mcp_protocol import MCPRegistry
+from ..metrics import is_metrics_message, metrics_response
+from ..streaming import encode_frames, is_stream
+from .base_transport import BaseTransport, peer_name, unlink_unix_socket
 
-class WebSocketTransport:
-    """WebSocket transport for MCP communication."""
+_INVALID = object()
+
+class WebSocketTransport(BaseTransport):
+    """WebSocket transport for MCP communication.
+
+    Messages on a connection are dispatched concurrently and answered as
+    they complete, so responses may arrive out of order and are matched to
+    requests by ``id``. At most ``max_concurrency`` requests execute at once
+    per connection and up to ``max_queued`` more wait for a slot; beyond that
+    the connection stops reading until a request completes.
+
+    Clients choose the wire encoding with the ``mcp.json`` or
+    ``mcp.msgpack`` subprotocol; connections without one use JSON text
+    frames. ``codecs`` restricts the available codecs by name.
+
+    A message may also be an array of requests, answered with one array of
+    responses; up to ``batch_concurrency`` of them execute at once and
+    arrays longer than ``max_batch_size`` are rejected. A batch occupies a
+    single ``max_concurrency`` slot.
+
+    Results of generator functions are sent as one frame per chunk, tagged
+    with the request ``id`` and a ``seq`` number, followed by a frame with
+    ``done`` set. The next chunk is only produced once the previous frame
+    has been written, and a stream keeps its ``max_concurrency`` slot
+    until it ends.
+
+    A ``{"cancel": <id>}`` message cancels the request with that ``id``,
+    which is answered with status 499, and requests still running when
+    the connection closes are cancelled; see ``pymcpfy.core.cancellation``.
+    A ``{"id": ..., "metrics": true}`` message is answered with the
+    registry's call metrics; see ``pymcpfy.core.metrics``.
+
+    When ``unix_socket`` is set the server listens on that Unix domain
+    socket path instead of ``host`` and ``port``. ``reuse_port`` sets
+    ``SO_REUSEPORT`` so several worker processes can share the port.
+    """
     def __init__(
         self,
         registry: MCPRegistry,
         host: str = "localhost",
         port: int = 8765,
         ping_interval: int = 20,
-        ping_timeout: int = 20
+        ping_timeout: int = 20,
+        max_concurrency: int = 32,
+        max_queued: int = 128,
+        codecs: Optional[List[str]] = None,
+        max_batch_size: int = 100,
+        batch_concurrency: int = 16,
+        unix_socket: Optional[str] = None,
+        reuse_port: bool = False
     ):
-        self.registry = registry
+        super().__init__(registry)
         self.host = host
         self.port = port
         self.ping_interval = ping_interval
         self.ping_timeout = ping_timeout
-        self._server: Optional[websockets.WebSocketServer] = None
+        self.max_concurrency = max_concurrency
+        self.max_queued = max_queued
+        self.codecs: List[Codec] = codecs_by_name(codecs)
+        self.max_batch_size = max_batch_size
+        self.batch_concurrency = batch_concurrency
+        self.unix_socket = unix_socket
+        self.reuse_port = reuse_port
+        self._server: Optional[Server] = None
 
     async def start(self):
         """Start the WebSocket server."""
-        self._server = await websockets.serve(
-            self._handle_connection,
-            self.host,
-            self.port,
+        options = dict(
             ping_interval=self.ping_interval,
-            ping_timeout=self.ping_timeout
+            ping_timeout=self.ping_timeout,
+            select_subprotocol=self._select_subprotocol
+        )
+        if self.unix_socket:
+            unlink_unix_socket(self.unix_socket)
+            self._server = await websockets.unix_serve(self._handle_connection, self.unix_socket, **options)
+            print(f"MCP WebSocket server running at unix:{self.unix_socket}")
+            return
+        self._server = await websockets.serve(
+            self._handle_connection, self.host, self.port, reuse_port=self.reuse_port or None, **options
         )
+        self.port = next(iter(self._server.sockets)).getsockname()[1]
         print(f"MCP WebSocket server running at ws://{self.host}:{self.port}")
 
     async def stop(self):
@@ -41,77 +100,105 @@ class WebSocketTransport:
         if self._server:
             self._server.close()
             await self._server.wait_closed()
+        if self.unix_socket:
+            unlink_unix_socket(self.unix_socket)
 
-    async def _handle_connection(self, websocket: WebSocketServerProtocol, path: str):
+    def _select_subprotocol(self, connection: ServerConnection, subprotocols: Sequence[str]) -> Optional[str]:
+        """Accept the first codec subprotocol offered by the client, if any."""
+        available = {codec.subprotocol for codec in self.codecs}
+        for subprotocol in subprotocols:
+            if subprotocol in available:
+                return subprotocol
+        return None
+
+    async def _handle_connection(self, websocket: ServerConnection):
         """Handle incoming WebSocket connections."""
+        codec = codec_for_subprotocol(websocket.subprotocol, self.codecs)
+        in_flight = asyncio.Semaphore(self.max_concurrency + self.max_queued)
+        running = asyncio.Semaphore(self.max_concurrency)
+        calls = InFlightCalls()
+        peer = peer_name(websocket.remote_address)
         try:
+            metrics = self.registry.metrics
             async for message in websocket:
                 try:
-                    request = json.loads(message)
-                    response = await self._handle_request(request, websocket)
-                    await websocket.send(json.dumps(response))
-                except json.JSONDecodeError:
-                    await websocket.send(json.dumps({
-                        "error": "Invalid JSON",
-                        "status": 400
-                    }))
-                except Exception as e:
-                    await websocket.send(json.dumps({
-                        "error": str(e),
-                        "status": 500
-                    }))
+                    request = codec.decode(message) if metrics is None else metrics.decode("websocket", codec, message)
+                except ValueError:
+                    request = _INVALID
+                if is_cancel_message(request):
+                    calls.cancel(request["cancel"])
+                    continue
+                if is_metrics_message(request):
+                    data = codec.encode(metrics_response(metrics, request))
+                    await websocket.send(data if codec.binary else data.decode())
+                    continue
+                await in_flight.acquire()
+                task = asyncio.create_task(self._handle_message(request, websocket, running, codec, calls, peer))
+                calls.add(task, request)
+                task.add_done_callback(lambda _: in_flight.release())
         except websockets.exceptions.ConnectionClosed:
             pass
+        finally:
+            # The client is gone, so nothing left in flight can be delivered.
+            await calls.cancel_all()
 
-    async def _handle_request(
+    async def _handle_message(
         self,
-        request: Dict[str, Any],
-        websocket: WebSocketServerProtocol
-    ) -> Dict[str, Any]:
-        """Handle incoming MCP requests."""
-        request_id = request.get("id")
-        function_name = request.get("function")
-        parameters = request.get("parameters", {})
-
-        if not function_name:
-            return {
-                "id": request_id,
-                "error": "Missing function name",
-                "status": 400
-            }
-
-        function = self.registry.get_function(function_name)
-        if not function:
-            return {
-                "id": request_id,
-                "error": f"Function {function_name} not found",
-                "status": 404
-            }
-
-        context = MCPContext(
-            request_id=request_id,
-            metadata=request.get("metadata", {}),
-            transport="websocket",
-            raw_request=request
-        )
-
+        request: Any,
+        websocket: ServerConnection,
+        running: asyncio.Semaphore,
+        codec: Codec,
+        calls: InFlightCalls,
+        peer: Optional[str] = None
+    ):
+        """Process a single decoded message and send its response."""
         try:
-            if function.is_async:
-                result = await function.func(context, **parameters)
-            else:
-                result = await asyncio.to_thread(function.func, context, **parameters)
-
-            if isinstance(result, MCPResponse):
-                response = result.to_dict()
+            if calls.cancelled_by_client():
+                raise asyncio.CancelledError
+            if request is _INVALID:
+                response = {
+                    "error": codec.invalid_message,
+                    "status": 400
+                }
             else:
-                response = MCPResponse(result).to_dict()
-
-            response["id"] = request_id
-            return response
-
+                async with running:
+                    try:
+                        response = await self.registry.dispatcher.dispatch_message(
+                            request, "websocket", self.max_batch_size, self.batch_concurrency, peer
+                        )
+                    except Exception as e:
+                        response = {
+                            "error": str(e),
+                            "status": 500
+                        }
+                    if is_stream(response):
+                        await self._send_stream(response, websocket, codec)
+                        return
+        except asyncio.CancelledError:
+            if not calls.cancelled_by_client():
+                raise
+            response = cancelled_response(request)
+        metrics = self.registry.metrics
+        try:
+            data = codec.encode(response) if metrics is None else metrics.encode("websocket", codec, response)
         except Exception as e:
-            return {
-                "id": request_id,
+            data = codec.encode({
+                "id": response.get("id") if isinstance(response, dict) else None,
                 "error": str(e),
                 "status": 500
-            }
+            })
+        try:
+            await websocket.send(data if codec.binary else data.decode())
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    async def _send_stream(self, response: dict, websocket: ServerConnection, codec: Codec):
+        """Send a streaming response as one frame per chunk."""
+        frames = encode_frames(response, codec)
+        try:
+            async for data in frames:
+                await websocket.send(data if codec.binary else data.decode())
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            await frames.aclose()
@@ -0,0 +1,254 @@
+"""Expose Django views as MCP functions called in-process."""
+
+import inspect
+import json
+import sys
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Optional, Union
+
+from django.apps import apps
+from django.core.exceptions import BadRequest, PermissionDenied, SuspiciousOperation
+from django.core.handlers.base import BaseHandler
+from django.db import close_old_connections
+from django.http import Http404, HttpRequest, HttpResponse, HttpResponseBase
+from django.test.client import RequestFactory
+from django.urls import ResolverMatch
+
+from .core.adapters import (
+    decode_body,
+    default_registry,
+    parameter_types,
+    query_string,
+    request_headers,
+    request_method,
+    split_parameters,
+    view_arguments,
+    view_name,
+    view_result,
+)
+from .core.cache import ResultCache
+from .core.mcp_protocol import MCPContext, MCPError, MCPRegistry
+
+_factory = RequestFactory()
+
+_VIEW_ERRORS = (Http404, PermissionDenied, BadRequest, SuspiciousOperation)
+
+def mcpfy(
+    name: Optional[str] = None,
+    description: Optional[str] = None,
+    registry: Optional[MCPRegistry] = None,
+    method: Optional[str] = None,
+    path: str = "/",
+    executor: Union[str, Executor, None] = None,
+    cache: Optional[ResultCache] = None,
+    middleware: bool = True
+) -> Callable[[Callable], Callable]:
+    """Register a Django view as an MCP function.
+
+    Calls build an ``HttpRequest`` directly and pass it through the
+    ``MIDDLEWARE`` setting's stack to the view, without going through the
+    WSGI/ASGI server or URL resolution. Authentication, sessions and any
+    other middleware apply as they do to HTTP requests; CSRF checks are
+    skipped, as the calls do not come from a browser.
+
+    ``middleware=False`` calls the view directly instead, with
+    ``request.user`` always ``AnonymousUser``. Only use it for views that
+    do not depend on middleware for access control.
+
+    Parameters named like the view's arguments after ``request`` (such as
+    ``pk``) are passed to it; the others form the JSON body, or the query
+    string when the request method is ``GET``.
+
+    Function views and methods of class-based views can be decorated.
+    Methods of Django REST framework viewsets are called through
+    ``as_view`` so authentication, permissions and serializers apply, and
+    their ``Response.data`` is returned without rendering it. Synchronous
+    views run in ``executor``.
+
+    The view itself is returned unchanged.
+    """
+    def decorator(view: Callable) -> Callable:
+        is_method = _is_method(view)
+        arguments = view_arguments(view, skip=2 if is_method else 1)
+        targets: Dict[str, Callable] = {}
+
+        def prepare(context: MCPContext, parameters: Dict[str, Any]):
+            kwargs, body = split_parameters(arguments, parameters)
+            http_method = request_method(method, body)
+            if is_method and view.__name__ in _HTTP_METHODS:
+                http_method = view.__name__.upper()
+            target = targets.get(http_method)
+            if target is None:
+                target = targets[http_method] = _view_callable(view, is_method, http_method)
+            return target, _build_request(context, http_method, path, body, middleware), kwargs
+
+        if inspect.iscoroutinefunction(view) and not is_method:
+            async def call(context: MCPContext, **parameters: Any) -> Any:
+                target, request, kwargs = prepare(context, parameters)
+                try:
+                    if middleware:
+                        response = await _handle_async(target, request, kwargs)
+                    else:
+                        response = await target(request, **kwargs)
+                except _VIEW_ERRORS as e:
+                    raise _error(e)
+                return _result(response)
+        else:
+            def call(context: MCPContext, **parameters: Any) -> Any:
+                target, request, kwargs = prepare(context, parameters)
+                close_old_connections()
+                try:
+                    if middleware:
+                        response = _handle(target, request, kwargs)
+                    else:
+                        response = target(request, **kwargs)
+                except _VIEW_ERRORS as e:
+                    raise _error(e)
+                finally:
+                    close_old_connections()
+                return _result(response)
+
+        (registry or default_registry()).register(
+            call,
+            name=name or view_name(view),
+            description=description or view.__doc__,
+            parameter_types=parameter_types(arguments),
+            executor=executor,
+            cache=cache
+        )
+        return view
+    return decorator
+
+_HTTP_METHODS = ("get", "post", "put", "patch", "delete", "head", "options")
+
+def _is_method(view: Callable) -> bool:
+    """Whether a view is defined in a class body and takes ``self``."""
+    parameters = list(inspect.signature(view).parameters)
+    return "." in view.__qualname__.rsplit("<locals>.", 1)[-1] and bool(parameters) and parameters[0] == "self"
+
+def _view_callable(view: Callable, is_method: bool, http_method: str) -> Callable:
+    """Build the ``callable(request, **kwargs)`` that runs a view."""
+    if not is_method:
+        return view
+    owner = _owner(view)
+    if hasattr(owner, "get_extra_actions"):
+        # A REST framework viewset: route the method to the decorated action.
+        return owner.as_view({http_method.lower(): view.__name__})
+    if hasattr(owner, "as_view") and view.__name__ in _HTTP_METHODS:
+        return owner.as_view()
+
+    def call(request: HttpRequest, **kwargs: Any) -> Any:
+        instance = owner()
+        if hasattr(instance, "setup"):
+            instance.setup(request, **kwargs)
+        return view(instance, request, **kwargs)
+    return call
+
+def _owner(view: Callable) -> type:
+    """The class a method view is defined in, looked up by qualified name."""
+    if "<locals>" in view.__qualname__:
+        raise RuntimeError(f"Cannot find the class of {view.__qualname__}; define it at module level")
+    owner: Any = sys.modules[view.__module__]
+    for part in view.__qualname__.split(".")[:-1]:
+        owner = getattr(owner, part)
+    return owner
+
+class _Handler(BaseHandler):
+    """The middleware stack, around the view an MCP call names instead of a resolved one.
+
+    Exceptions of the view are kept on the request and replaced by an empty
+    response with their status, so the middleware sees the failure and the
+    adapter can still raise them after the stack has returned.
+    """
+
+    def resolve_request(self, request: HttpRequest) -> ResolverMatch:
+        return request.resolver_match
+
+    def _get_response(self, request: HttpRequest) -> HttpResponseBase:
+        try:
+            return super()._get_response(request)
+        except Exception as e:
+            return _failed(request, e)
+
+    async def _get_response_async(self, request: HttpRequest) -> HttpResponseBase:
+        try:
+            return await super()._get_response_async(request)
+        except Exception as e:
+            return _failed(request, e)
+
+_handlers: Dict[bool, _Handler] = {}
+
+def _handler(is_async: bool) -> _Handler:
+    """The middleware stack for sync or async views, loaded on first use."""
+    handler = _handlers.get(is_async)
+    if handler is None:
+        handler = _Handler()
+        handler.load_middleware(is_async=is_async)
+        _handlers[is_async] = handler
+    return handler
+
+def _failed(request: HttpRequest, exception: Exception) -> HttpResponse:
+    request._pymcpfy_exception = exception
+    return HttpResponse(status=_error(exception).status if isinstance(exception, _VIEW_ERRORS) else 500)
+
+def _handle(target: Callable, request: HttpRequest, kwargs: Dict[str, Any]) -> Any:
+    """Call a synchronous view through the middleware stack."""
+    request.resolver_match = ResolverMatch(target, (), kwargs)
+    response = _handler(False)._middleware_chain(request)
+    return _raise_failure(request, response)
+
+async def _handle_async(target: Callable, request: HttpRequest, kwargs: Dict[str, Any]) -> Any:
+    """Call a coroutine view through the middleware stack."""
+    request.resolver_match = ResolverMatch(target, (), kwargs)
+    response = await _handler(True)._middleware_chain(request)
+    return _raise_failure(request, response)
+
+def _raise_failure(request: HttpRequest, response: Any) -> Any:
+    """Re-raise the exception of a view that no middleware answered for."""
+    exception = request.__dict__.pop("_pymcpfy_exception", None)
+    if exception is not None:
+        raise exception
+    return response
+
+def _build_request(
+    context: MCPContext, http_method: str, path: str, body: Dict[str, Any], middleware: bool
+) -> HttpRequest:
+    """Build the synthetic request for a call."""
+    extra = {}
+    for header, value in request_headers(context).items():
+        key = header.upper().replace("-", "_")
+        extra[key if key in ("CONTENT_TYPE", "CONTENT_LENGTH") else f"HTTP_{key}"] = value
+    if http_method == "GET":
+        request = _factory.generic("GET", f"{path}?{query_string(body)}" if body else path, **extra)
+    else:
+        request = _factory.generic(http_method, path, json.dumps(body), "application/json", **extra)
+    if middleware:
+        # As Django's test client does: there is no browser session to forge requests from.
+        request._dont_enforce_csrf_checks = True
+    elif apps.is_installed("django.contrib.auth"):
+        from django.contrib.auth.models import AnonymousUser
+        request.user = AnonymousUser()
+    return request
+
+def _result(response: Any) -> Any:
+    """Turn a view's response into an MCP function result."""
+    if not isinstance(response, HttpResponseBase):
+        return response
+    if hasattr(response, "data") and not response.streaming:
+        # REST framework response: skip rendering the already built data.
+        return view_result(response.status_code, response.data)
+    if response.streaming:
+        body = b"".join(response.streaming_content)
+    else:
+        if hasattr(response, "render") and not response.is_rendered:
+            response.render()
+        body = response.content
+    return view_result(response.status_code, decode_body(body, response.get("Content-Type")))
+
+def _error(exception: Exception) -> MCPError:
+    """Status for the exceptions Django's handler turns into error responses."""
+    if isinstance(exception, Http404):
+        return MCPError(404, str(exception) or "Not found")
+    if isinstance(exception, PermissionDenied):
+        return MCPError(403, str(exception) or "Permission denied")
+    return MCPError(400, str(exception) or "Bad request")
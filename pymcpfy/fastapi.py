@@ -0,0 +1,362 @@
+"""Expose FastAPI endpoints as MCP functions called in-process."""
+
+import asyncio
+import inspect
+import json
+from concurrent.futures import Executor
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Union
+
+from fastapi import BackgroundTasks, FastAPI, params
+from fastapi.encoders import jsonable_encoder
+from fastapi.params import Depends
+from fastapi.security import SecurityScopes
+from pydantic import TypeAdapter, ValidationError
+from pydantic.fields import FieldInfo
+from pydantic_core import PydanticUndefined
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+from typing_extensions import Annotated, get_args, get_origin, get_type_hints
+
+from .core.adapters import (
+    decode_body,
+    default_registry,
+    query_string,
+    request_headers,
+    request_method,
+    view_name,
+    view_result,
+)
+from .core.cache import ResultCache
+from .core.mcp_protocol import MCPContext, MCPError, MCPRegistry
+
+def mcpfy(
+    name: Optional[str] = None,
+    description: Optional[str] = None,
+    registry: Optional[MCPRegistry] = None,
+    app: Optional[FastAPI] = None,
+    method: Optional[str] = None,
+    path: str = "/",
+    executor: Union[str, Executor, None] = None,
+    cache: Optional[ResultCache] = None
+) -> Callable[[Callable], Callable]:
+    """Register a FastAPI endpoint as an MCP function.
+
+    Calls resolve the endpoint's parameters and ``Depends`` dependencies
+    directly and await the endpoint, without going through the ASGI
+    server or routing. Path, query, body and form parameters, including
+    those of dependencies, are taken from the call by name and validated
+    against their annotations. ``Header()`` and ``Cookie()`` parameters
+    are read from the headers in the call's metadata, ``Security`` scopes
+    are passed to ``SecurityScopes`` parameters as in FastAPI, and
+    ``File()`` parameters are rejected. ``Request`` parameters receive a
+    synthetic request whose JSON body holds all call parameters. ``HTTPException`` maps to
+    the MCP error status, and results are converted with
+    ``jsonable_encoder`` (``response_model`` filtering is not applied).
+    ``app.dependency_overrides`` is honored when ``app`` is given.
+    Synchronous endpoints and dependencies run in ``executor``.
+
+    The endpoint itself is returned unchanged.
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        target = registry or default_registry()
+        run = target.executors.runner(executor)
+        types = _parameter_types(endpoint)
+
+        async def call(context: MCPContext, **parameters: Any) -> Any:
+            http_method = request_method(method, parameters)
+            state = _CallState(
+                _build_request(context, http_method, path, parameters, app),
+                parameters,
+                run,
+                app.dependency_overrides if app is not None else {}
+            )
+            try:
+                async with state.stack:
+                    result = await _call(endpoint, await _solve(endpoint, state), state.run)
+                    status = state.response.status_code if state.response is not None else None
+                    result = await _result(result, status)
+            except HTTPException as e:
+                detail = e.detail if isinstance(e.detail, str) else json.dumps(jsonable_encoder(e.detail))
+                raise MCPError(e.status_code, detail)
+            except ValidationError as e:
+                raise MCPError(422, str(e))
+            if state.background is not None:
+                # Background tasks run after the response, as in FastAPI.
+                task = asyncio.ensure_future(state.background())
+                _background_tasks.add(task)
+                task.add_done_callback(_background_tasks.discard)
+            return result
+
+        target.register(
+            call,
+            name=name or view_name(endpoint),
+            description=description or endpoint.__doc__,
+            parameter_types=types,
+            return_type=_type_hints(endpoint).get("return"),
+            executor=executor,
+            cache=cache
+        )
+        return endpoint
+    return decorator
+
+_background_tasks: Set[asyncio.Task] = set()
+
+class _CallState:
+    """Per-call state shared while resolving dependencies."""
+
+    def __init__(self, request: Request, parameters: Dict[str, Any], run: Callable, overrides: Dict[Any, Any]):
+        self.request = request
+        self.parameters = parameters
+        self.run = run
+        self.overrides = overrides
+        self.cache: Dict[tuple, Any] = {}
+        self.stack = AsyncExitStack()
+        self.response: Optional[Response] = None
+        self.background: Optional[BackgroundTasks] = None
+
+_VALUE_KINDS = ("value", "header", "cookie")
+
+class _Argument:
+    """How to obtain one argument of an endpoint or dependency."""
+    __slots__ = (
+        "name", "kind", "alias", "default", "adapter", "annotation", "many", "dependency", "use_cache", "scopes"
+    )
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        alias: str = "",
+        default: Any = PydanticUndefined,
+        annotation: Any = None,
+        dependency: Any = None,
+        use_cache: bool = True,
+        scopes: Sequence[str] = ()
+    ):
+        self.name = name
+        self.kind = kind
+        self.alias = alias or name
+        self.default = default
+        self.annotation = annotation
+        self.adapter = TypeAdapter(annotation) if kind in _VALUE_KINDS and annotation is not None else None
+        self.many = get_origin(annotation) in (list, tuple, set)
+        self.dependency = dependency
+        self.use_cache = use_cache
+        self.scopes = list(scopes)
+
+_plans: Dict[int, tuple] = {}
+
+def _plan(call: Callable) -> List[_Argument]:
+    """Describe the arguments of a callable once, memoized."""
+    entry = _plans.get(id(call))
+    if entry is not None and entry[0] is call:
+        return entry[1]
+    hints = _type_hints(call)
+    arguments = []
+    for parameter in inspect.signature(call).parameters.values():
+        if parameter.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD):
+            continue
+        annotation = hints.get(parameter.name, parameter.annotation)
+        marker = parameter.default if isinstance(parameter.default, (Depends, FieldInfo)) else None
+        if get_origin(annotation) is Annotated:
+            annotation, *extras = get_args(annotation)
+            marker = next((e for e in extras if isinstance(e, (Depends, FieldInfo))), marker)
+        if annotation is inspect.Parameter.empty:
+            annotation = None
+
+        if isinstance(marker, Depends):
+            arguments.append(_Argument(
+                parameter.name,
+                "depends",
+                dependency=marker.dependency or annotation,
+                use_cache=marker.use_cache,
+                scopes=(marker.scopes or ()) if isinstance(marker, params.Security) else ()
+            ))
+        elif isinstance(marker, params.File):
+            raise TypeError(f"File parameters cannot be passed in MCP calls: {parameter.name}")
+        elif _is_subclass(annotation, SecurityScopes):
+            arguments.append(_Argument(parameter.name, "scopes"))
+        elif _is_subclass(annotation, Request):
+            arguments.append(_Argument(parameter.name, "request"))
+        elif _is_subclass(annotation, Response):
+            arguments.append(_Argument(parameter.name, "response"))
+        elif _is_subclass(annotation, BackgroundTasks):
+            arguments.append(_Argument(parameter.name, "background"))
+        else:
+            kind = "value"
+            alias = parameter.name
+            default = PydanticUndefined
+            if isinstance(marker, params.Header):
+                kind = "header"
+                if marker.convert_underscores:
+                    alias = alias.replace("_", "-")
+            elif isinstance(marker, params.Cookie):
+                kind = "cookie"
+            if isinstance(marker, FieldInfo):
+                alias = marker.alias or alias
+                default = marker.get_default(call_default_factory=True)
+            if parameter.default is not inspect.Parameter.empty and parameter.default is not marker:
+                default = parameter.default
+            arguments.append(_Argument(parameter.name, kind, alias, default, annotation))
+    _plans[id(call)] = (call, arguments)
+    return arguments
+
+async def _solve(call: Callable, state: _CallState, scopes: Sequence[str] = ()) -> Dict[str, Any]:
+    """Resolve the keyword arguments for a call, running its dependencies.
+
+    ``scopes`` are the ``Security`` scopes of the dependency chain leading
+    to ``call``.
+    """
+    kwargs = {}
+    for argument in _plan(call):
+        kind = argument.kind
+        if kind in _VALUE_KINDS:
+            value = _value(argument, state)
+        elif kind == "depends":
+            value = await _dependency(argument, state, scopes)
+        elif kind == "scopes":
+            value = SecurityScopes(scopes=list(scopes))
+        elif kind == "request":
+            value = state.request
+        elif kind == "response":
+            if state.response is None:
+                state.response = Response()
+                state.response.status_code = None
+            value = state.response
+        else:
+            if state.background is None:
+                state.background = BackgroundTasks()
+            value = state.background
+        kwargs[argument.name] = value
+    return kwargs
+
+def _value(argument: _Argument, state: _CallState) -> Any:
+    """Take a parameter from the call, or a header or cookie from the request."""
+    if argument.kind == "value":
+        found = argument.alias in state.parameters
+        value = state.parameters.get(argument.alias)
+        missing = "parameters"
+    elif argument.kind == "header":
+        headers = state.request.headers
+        value = headers.getlist(argument.alias) if argument.many else headers.get(argument.alias)
+        found = bool(value) if argument.many else value is not None
+        missing = "header"
+    else:
+        value = state.request.cookies.get(argument.alias)
+        found = value is not None
+        missing = "cookie"
+    if found:
+        return argument.adapter.validate_python(value) if argument.adapter is not None else value
+    if argument.default is PydanticUndefined or argument.default is Ellipsis:
+        raise MCPError(400, f"Missing {missing}: {argument.alias}")
+    return argument.default
+
+async def _dependency(argument: _Argument, state: _CallState, scopes: Sequence[str]) -> Any:
+    """Resolve one dependency, reusing its value within the call when cached.
+
+    As in FastAPI, a dependency is cached per set of ``Security`` scopes.
+    """
+    dependency = state.overrides.get(argument.dependency, argument.dependency)
+    scopes = [*scopes, *argument.scopes]
+    key = (id(dependency), tuple(sorted(set(scopes))))
+    if argument.use_cache and key in state.cache:
+        return state.cache[key]
+    kwargs = await _solve(dependency, state, scopes)
+    if inspect.isasyncgenfunction(dependency):
+        value = await state.stack.enter_async_context(asynccontextmanager(dependency)(**kwargs))
+    elif inspect.isgeneratorfunction(dependency):
+        value = state.stack.enter_context(contextmanager(dependency)(**kwargs))
+    else:
+        value = await _call(dependency, kwargs, state.run)
+    if argument.use_cache:
+        state.cache[key] = value
+    return value
+
+async def _call(call: Callable, kwargs: Dict[str, Any], run: Callable) -> Any:
+    """Await a coroutine function, or run a synchronous one in the executor."""
+    if inspect.iscoroutinefunction(call) or (
+        not inspect.isroutine(call) and not inspect.isclass(call)
+        and inspect.iscoroutinefunction(getattr(call, "__call__", None))
+    ):
+        return await call(**kwargs)
+    return await run(call, **kwargs)
+
+async def _result(result: Any, status: Optional[int]) -> Any:
+    """Turn an endpoint's return value into an MCP function result."""
+    if isinstance(result, StreamingResponse):
+        chunks = []
+        async for chunk in result.body_iterator:
+            chunks.append(chunk.encode(result.charset) if isinstance(chunk, str) else chunk)
+        return view_result(result.status_code, decode_body(b"".join(chunks), result.media_type))
+    if isinstance(result, Response):
+        return view_result(result.status_code, decode_body(result.body, result.media_type))
+    return view_result(status or 200, jsonable_encoder(result))
+
+def _build_request(
+    context: MCPContext,
+    http_method: str,
+    path: str,
+    parameters: Dict[str, Any],
+    app: Optional[FastAPI]
+) -> Request:
+    """Build the synthetic request passed to ``Request`` parameters."""
+    headers = [
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in request_headers(context).items()
+    ]
+    body = b""
+    query = b""
+    if http_method == "GET":
+        query = query_string(parameters).encode()
+    else:
+        body = json.dumps(parameters).encode()
+        headers.append((b"content-type", b"application/json"))
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": http_method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query,
+        "headers": headers,
+        "client": None,
+        "server": None,
+    }
+    if app is not None:
+        scope["app"] = app
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": body, "more_body": False}
+    return Request(scope, receive)
+
+def _parameter_types(endpoint: Callable) -> Dict[str, Any]:
+    """Types of the call parameters of an endpoint and its dependencies."""
+    types = {}
+    for argument in _plan(endpoint):
+        if argument.kind == "value":
+            types[argument.alias] = argument.annotation if argument.annotation is not None else Any
+        elif argument.kind == "depends" and callable(argument.dependency):
+            for name, type_ in _parameter_types(argument.dependency).items():
+                types.setdefault(name, type_)
+    return types
+
+def _type_hints(call: Callable) -> Dict[str, Any]:
+    """Resolved annotations of a function, class or callable instance."""
+    if inspect.isclass(call):
+        target = call.__init__
+    elif inspect.isroutine(call):
+        target = call
+    else:
+        target = getattr(call, "__call__", call)
+    try:
+        return get_type_hints(target, include_extras=True)
+    except Exception:
+        return {}
+
+def _is_subclass(annotation: Any, base: type) -> bool:
+    """``issubclass`` that accepts non-class annotations."""
+    return inspect.isclass(annotation) and issubclass(annotation, base)
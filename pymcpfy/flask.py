@@ -0,0 +1,140 @@
+"""Expose Flask views as MCP functions called in-process."""
+
+import inspect
+import io
+import json
+import sys
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Optional, Union
+
+from flask import Flask
+from werkzeug.exceptions import HTTPException
+
+from .core.adapters import (
+    decode_body,
+    default_registry,
+    parameter_types,
+    query_string,
+    request_headers,
+    request_method,
+    split_parameters,
+    view_arguments,
+    view_name,
+    view_result,
+)
+from .core.cache import ResultCache
+from .core.mcp_protocol import MCPContext, MCPError, MCPRegistry
+
+_app: Optional[Flask] = None
+
+def init_app(app: Flask, registry: Optional[MCPRegistry] = None) -> MCPRegistry:
+    """Call ``mcpfy`` views on ``app`` and return the registry they are in."""
+    global _app
+    _app = app
+    registry = registry or default_registry()
+    app.extensions["pymcpfy"] = registry
+    return registry
+
+def mcpfy(
+    name: Optional[str] = None,
+    description: Optional[str] = None,
+    registry: Optional[MCPRegistry] = None,
+    app: Optional[Flask] = None,
+    method: Optional[str] = None,
+    path: str = "/",
+    executor: Union[str, Executor, None] = None,
+    cache: Optional[ResultCache] = None
+) -> Callable[[Callable], Callable]:
+    """Register a Flask view as an MCP function.
+
+    Calls run the view in a request context of ``app`` (or the app given
+    to ``init_app``) built from a synthetic WSGI environ, without going
+    through the WSGI server or URL routing. Parameters named like the
+    view's arguments are passed to it; the others form the JSON body, or
+    the query string when the request method is ``GET``.
+    ``before_request`` and ``after_request`` hooks run, and so do
+    decorators applied above ``@mcpfy()``, such as authentication checks,
+    since the view is looked up in ``app.view_functions``. Views run in
+    ``executor``.
+
+    The view itself is returned unchanged.
+    """
+    def decorator(view: Callable) -> Callable:
+        arguments = view_arguments(view)
+        resolved: Dict[int, Callable] = {}
+
+        def call(context: MCPContext, **parameters: Any) -> Any:
+            flask_app = app or _app
+            if flask_app is None:
+                raise RuntimeError("No Flask app to call the view on; call pymcpfy.flask.init_app(app)")
+            target = resolved.get(id(flask_app))
+            if target is None:
+                target = resolved[id(flask_app)] = _registered_view(flask_app, view)
+            kwargs, body = split_parameters(arguments, parameters)
+            http_method = request_method(method, body)
+            environ = _environ(flask_app, http_method, path, body, request_headers(context))
+            with flask_app.request_context(environ):
+                try:
+                    rv = flask_app.preprocess_request()
+                    if rv is None:
+                        rv = flask_app.ensure_sync(target)(**kwargs)
+                except Exception as e:
+                    rv = flask_app.handle_user_exception(e)
+                    if isinstance(rv, HTTPException):
+                        # No error handler: report the description, not the HTML page.
+                        raise MCPError(rv.code or 500, rv.description or rv.name)
+                response = flask_app.process_response(flask_app.make_response(rv))
+            return view_result(response.status_code, decode_body(response.get_data(), response.mimetype))
+
+        (registry or default_registry()).register(
+            call,
+            name=name or view_name(view),
+            description=description or view.__doc__,
+            parameter_types=parameter_types(arguments),
+            executor=executor,
+            cache=cache
+        )
+        return view
+    return decorator
+
+def _registered_view(app: Flask, view: Callable) -> Callable:
+    """The view as registered on the app, with the decorators applied above it."""
+    for registered in app.view_functions.values():
+        if inspect.unwrap(registered) is view:
+            return registered
+    return view
+
+def _environ(app: Flask, http_method: str, path: str, body: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
+    """Build the WSGI environ of a synthetic request.
+
+    Assembled directly rather than with Werkzeug's ``EnvironBuilder``,
+    which costs about as much as the rest of the call.
+    """
+    if http_method == "GET":
+        query, data = query_string(body), b""
+    else:
+        query, data = "", json.dumps(body).encode()
+    environ = {
+        "REQUEST_METHOD": http_method,
+        "SCRIPT_NAME": "",
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "SERVER_NAME": app.config.get("SERVER_NAME") or "localhost",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": app.config.get("SERVER_NAME") or "localhost",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(data),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    if data:
+        environ["CONTENT_TYPE"] = "application/json"
+        environ["CONTENT_LENGTH"] = str(len(data))
+    for name, value in headers.items():
+        key = name.upper().replace("-", "_")
+        environ[key if key in ("CONTENT_TYPE", "CONTENT_LENGTH") else f"HTTP_{key}"] = value
+    return environ
@@ -30,12 +30,14 @@ setup(
         "pydantic>=2.0.0",
         "typing-extensions>=4.0.0",
         "PyYAML>=6.0",
-        "websockets>=10.0",
+        "websockets>=14.0",
     ],
     extras_require={
         "django": ["django>=3.2"],
         "flask": ["flask>=2.0.0"],
         "fastapi": ["fastapi>=0.70.0", "uvicorn>=0.15.0"],
+        "orjson": ["orjson>=3.6.0"],
+        "msgpack": ["msgpack>=1.0.0"],
         "dev": [
             "pytest>=7.0.0",
             "pytest-asyncio>=0.18.0",
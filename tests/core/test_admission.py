@@ -0,0 +1,126 @@
+"""Tests for admission control of MCP calls."""
+
+import asyncio
+
+import pytest
+
+from pymcpfy.core import AIMDLimit, ConcurrencyLimiter, MCPRegistry
+
+def _make_registry(limiter=None, function_limiter=None):
+    registry = MCPRegistry(limiter=limiter)
+    gate = asyncio.Event()
+
+    async def wait(context) -> str:
+        await gate.wait()
+        return "done"
+
+    async def ticks(context, n: int):
+        for i in range(n):
+            yield i
+
+    registry.register(wait, limiter=function_limiter)
+    registry.register(ticks)
+    return registry, gate
+
+@pytest.mark.asyncio
+async def test_registry_limit_queues_and_sheds():
+    """Test that calls beyond the limit queue, then are rejected with 503."""
+    limiter = ConcurrencyLimiter(2, max_queued=1)
+    registry, gate = _make_registry(limiter)
+    dispatcher = registry.dispatcher
+
+    tasks = [
+        asyncio.ensure_future(dispatcher.dispatch({"id": str(i), "function": "wait"}, "test"))
+        for i in range(3)
+    ]
+    await asyncio.sleep(0.01)
+    assert limiter.metrics() == {"limit": 2, "in_flight": 2, "queued": 1, "admitted": 2, "rejected": 0}
+
+    response = await dispatcher.dispatch({"id": "3", "function": "wait"}, "test")
+    assert response["id"] == "3"
+    assert response["status"] == 503
+
+    gate.set()
+    assert [r["data"] for r in await asyncio.gather(*tasks)] == ["done"] * 3
+    assert limiter.metrics() == {"limit": 2, "in_flight": 0, "queued": 0, "admitted": 3, "rejected": 1}
+
+@pytest.mark.asyncio
+async def test_function_limit_queue_timeout():
+    """Test that a per-function limit rejects calls that waited too long."""
+    limiter = ConcurrencyLimiter(1, max_queued=8, queue_timeout=0.05, status=429)
+    registry, gate = _make_registry(function_limiter=limiter)
+    dispatcher = registry.dispatcher
+
+    first = asyncio.ensure_future(dispatcher.dispatch({"id": "1", "function": "wait"}, "test"))
+    await asyncio.sleep(0)
+    response = await dispatcher.dispatch({"id": "2", "function": "wait"}, "test")
+    assert response["id"] == "2"
+    assert response["status"] == 429
+    assert limiter.queued == 0
+
+    # Other functions are not limited.
+    response = await dispatcher.dispatch({"id": "3", "function": "ticks", "parameters": {"n": 1}}, "test")
+    assert response["status"] == 200
+
+    gate.set()
+    assert (await first)["data"] == "done"
+    assert limiter.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_cancelled_waiters_give_up_their_place():
+    """Test that cancelled queued calls neither leak nor block slots."""
+    limiter = ConcurrencyLimiter(1, max_queued=8)
+    assert await limiter.acquire() is not None
+
+    waiter = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.sleep(0)
+    assert limiter.queued == 0
+
+    granted = asyncio.ensure_future(limiter.acquire())
+    after = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+    limiter.release(0.0)
+    # The slot was granted to the first waiter, which is cancelled before
+    # it resumes: the slot passes on to the next one.
+    granted.cancel()
+    assert await after is not None
+    assert limiter.in_flight == 1
+
+@pytest.mark.asyncio
+async def test_stream_holds_slot_until_closed():
+    """Test that a streaming call keeps its slot while the stream is open."""
+    limiter = ConcurrencyLimiter(1, max_queued=0)
+    registry, _ = _make_registry(limiter)
+    dispatcher = registry.dispatcher
+
+    response = await dispatcher.dispatch({"id": "1", "function": "ticks", "parameters": {"n": 3}}, "test")
+    assert limiter.in_flight == 1
+    assert (await dispatcher.dispatch({"id": "2", "function": "ticks", "parameters": {"n": 1}}, "test"))["status"] == 503
+    assert [chunk async for chunk in response["stream"]] == [0, 1, 2]
+    assert limiter.in_flight == 0
+
+def test_aimd_limit():
+    """Test additive increase under load and one decrease per window."""
+    limit = AIMDLimit(initial=10, max_limit=20, backoff=0.5)
+    for i in range(11):
+        limit.update(started=i, latency=0.01, in_flight=10, overloaded=False)
+    assert limit.limit == 11
+    assert limit.baseline == 0.01
+
+    # Below half utilization the limit does not grow.
+    before = limit.limit
+    for i in range(100):
+        limit.update(started=i, latency=0.01, in_flight=1, overloaded=False)
+    assert limit.limit == before
+
+    # A slow call halves the limit; calls admitted before that do not.
+    limit.update(started=float("-inf"), latency=1.0, in_flight=10, overloaded=False)
+    assert limit.limit == before // 2
+    limit.update(started=float("-inf"), latency=1.0, in_flight=10, overloaded=True)
+    assert limit.limit == before // 2
+
+    for _ in range(100):
+        limit.update(started=float("inf"), latency=0.01, in_flight=1, overloaded=True)
+    assert limit.limit == 1
@@ -0,0 +1,282 @@
+"""Tests for the ASGI application."""
+
+import asyncio
+import json
+from urllib.parse import urlsplit
+
+import pytest
+
+from pymcpfy.core import CallMetrics, CallProfiler, MCPRegistry, create_asgi_app
+
+def _make_registry(closed: list = None) -> MCPRegistry:
+    registry = MCPRegistry()
+
+    async def add(context, a: int, b: int) -> int:
+        return a + b
+
+    async def slow(context, delay: float) -> float:
+        await asyncio.sleep(delay)
+        return delay
+
+    async def count(context, n: int):
+        for i in range(n):
+            yield i
+
+    async def forever(context):
+        try:
+            i = 0
+            while True:
+                yield i
+                i += 1
+                await asyncio.sleep(0)
+        finally:
+            closed.append(True)
+
+    registry.register(add)
+    registry.register(slow)
+    registry.register(count)
+    registry.register(forever)
+    return registry
+
+class _Connection:
+    """Drive an ASGI app through in-memory receive and send queues."""
+
+    def __init__(self, app, scope: dict):
+        self.incoming: asyncio.Queue = asyncio.Queue()
+        self.outgoing: asyncio.Queue = asyncio.Queue()
+        self.task = asyncio.ensure_future(app(scope, self.incoming.get, self.outgoing.put))
+
+    async def next(self) -> dict:
+        return await asyncio.wait_for(self.outgoing.get(), 5)
+
+    async def response(self) -> tuple:
+        start = await self.next()
+        body = b""
+        while True:
+            message = await self.next()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        return start["status"], dict(start["headers"]), body
+
+def _http(app, method: str, path: str, body: bytes = b"", headers: dict = None, http_version: str = "1.1"):
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "http_version": http_version,
+        "method": method,
+        "path": "/mcp" + path,
+        "root_path": "/mcp",
+        "query_string": query.encode(),
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+    }
+    connection = _Connection(app, scope)
+    connection.incoming.put_nowait({"type": "http.request", "body": body, "more_body": False})
+    return connection
+
+@pytest.mark.asyncio
+async def test_call_and_schema():
+    """Test dispatching a call and fetching the schema under a mount prefix."""
+    app = create_asgi_app(_make_registry())
+    request = {"id": "1", "function": "add", "parameters": {"a": 1, "b": 2}}
+    status, headers, body = await _http(app, "POST", "/", json.dumps(request).encode()).response()
+    assert status == 200
+    assert headers[b"content-type"] == b"application/json"
+    assert json.loads(body)["data"] == 3
+
+    status, headers, body = await _http(app, "POST", "/", json.dumps([request, request]).encode()).response()
+    assert [r["data"] for r in json.loads(body)] == [3, 3]
+
+    status, headers, body = await _http(app, "GET", "/schema").response()
+    assert status == 200
+    assert "add" in json.loads(body)
+    etag = headers[b"etag"].decode()
+    status, _, body = await _http(app, "GET", "/schema", headers={"If-None-Match": etag}).response()
+    assert status == 304
+    assert body == b""
+
+@pytest.mark.asyncio
+async def test_metrics():
+    """Test GET /metrics and the WebSocket metrics message."""
+    registry = _make_registry()
+    app = create_asgi_app(registry)
+    status, _, _ = await _http(app, "GET", "/metrics").response()
+    assert status == 404
+
+    registry.metrics = CallMetrics()
+    request = {"id": "1", "function": "add", "parameters": {"a": 1, "b": 2}}
+    await _http(app, "POST", "/", json.dumps(request).encode()).response()
+    status, headers, body = await _http(app, "GET", "/metrics").response()
+    assert status == 200
+    assert headers[b"content-type"].startswith(b"text/plain")
+    assert 'pymcpfy_calls_total{function="add",transport="http"} 1' in body.decode()
+
+    connection = _Connection(app, {"type": "websocket", "path": "/mcp/", "root_path": "/mcp", "subprotocols": []})
+    connection.incoming.put_nowait({"type": "websocket.connect"})
+    await connection.next()
+    connection.incoming.put_nowait({"type": "websocket.receive", "text": json.dumps({"id": "m", "metrics": True})})
+    message = json.loads((await connection.next())["text"])
+    assert message["id"] == "m"
+    assert message["data"]["functions"]["add"]["http"]["calls"] == 1
+    connection.incoming.put_nowait({"type": "websocket.disconnect", "code": 1000})
+    await asyncio.wait_for(connection.task, 1)
+
+@pytest.mark.asyncio
+async def test_profiles():
+    """Test GET /debug/profiles."""
+    registry = _make_registry()
+    app = create_asgi_app(registry)
+    status, _, _ = await _http(app, "GET", "/debug/profiles").response()
+    assert status == 404
+
+    registry.profiler = CallProfiler(threshold=None, sample_rate=1.0)
+    request = {"id": "1", "function": "add", "parameters": {"a": 1, "b": 2}}
+    await _http(app, "POST", "/", json.dumps(request).encode()).response()
+    status, _, body = await _http(app, "GET", "/debug/profiles").response()
+    assert status == 200
+    [profile] = json.loads(body)["profiles"]
+    assert (profile["function"], profile["reason"], profile["status"]) == ("add", "sampled", 200)
+
+@pytest.mark.asyncio
+async def test_http_errors():
+    """Test malformed, unknown and oversized requests."""
+    app = create_asgi_app(_make_registry(), max_body_size=64)
+    status, _, body = await _http(app, "POST", "/", b"not json").response()
+    assert status == 400
+    status, _, _ = await _http(app, "GET", "/missing").response()
+    assert status == 404
+    status, _, _ = await _http(app, "DELETE", "/").response()
+    assert status == 405
+    status, _, _ = await _http(app, "POST", "/", b"x" * 65).response()
+    assert status == 413
+    request = {"id": "1", "function": "missing", "parameters": {}}
+    status, _, _ = await _http(app, "POST", "/", json.dumps(request).encode()).response()
+    assert status == 404
+
+@pytest.mark.asyncio
+async def test_streaming():
+    """Test streamed and collected generator results."""
+    app = create_asgi_app(_make_registry())
+    request = json.dumps({"id": "s", "function": "count", "parameters": {"n": 3}}).encode()
+    status, headers, body = await _http(app, "POST", "/", request).response()
+    assert headers[b"content-type"] == b"application/x-ndjson"
+    frames = [json.loads(line) for line in body.splitlines()]
+    assert [f.get("data") for f in frames[:-1]] == [0, 1, 2]
+    assert frames[-1]["done"] is True
+
+    status, _, body = await _http(app, "POST", "/", request, http_version="1.0").response()
+    assert json.loads(body)["data"] == [0, 1, 2]
+
+@pytest.mark.asyncio
+async def test_stream_stops_on_disconnect():
+    """Test that a stream is closed once the client goes away."""
+    closed = []
+    app = create_asgi_app(_make_registry(closed))
+    request = json.dumps({"id": "s", "function": "forever", "parameters": {}}).encode()
+    connection = _http(app, "POST", "/", request)
+    assert (await connection.next())["status"] == 200
+    await connection.next()
+    connection.incoming.put_nowait({"type": "http.disconnect"})
+    await asyncio.wait_for(connection.task, 5)
+    assert closed == [True]
+
+@pytest.mark.asyncio
+async def test_call_cancelled_on_disconnect():
+    """Test that a call is cancelled once the client goes away."""
+    registry = MCPRegistry()
+    started = asyncio.Event()
+    cancelled = []
+
+    async def wait(context):
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    registry.register(wait)
+    request = json.dumps({"id": "w", "function": "wait"}).encode()
+    connection = _http(create_asgi_app(registry), "POST", "/", request)
+    await asyncio.wait_for(started.wait(), 5)
+    connection.incoming.put_nowait({"type": "http.disconnect"})
+    await asyncio.wait_for(connection.task, 5)
+    assert cancelled == [True]
+    assert connection.outgoing.empty()
+
+@pytest.mark.asyncio
+async def test_sse_session():
+    """Test the HTTP+SSE endpoints and session cleanup on disconnect."""
+    app = create_asgi_app(_make_registry())
+    stream = _http(app, "GET", "/sse", headers={"Accept": "text/event-stream"})
+    start = await stream.next()
+    assert dict(start["headers"])[b"content-type"] == b"text/event-stream"
+    endpoint = (await stream.next())["body"].decode()
+    assert endpoint.startswith("event: endpoint\ndata: /mcp/messages?session_id=")
+    url = urlsplit(endpoint.split("data: ")[1].strip())
+
+    path = url.path[len("/mcp"):] + "?" + url.query
+    request = {"id": "1", "function": "add", "parameters": {"a": 2, "b": 3}}
+    status, _, _ = await _http(app, "POST", path, json.dumps(request).encode()).response()
+    assert status == 202
+    event = (await stream.next())["body"].decode()
+    assert event.startswith("event: message\n")
+    assert json.loads(event.split("data: ")[1])["data"] == 5
+
+    stream.incoming.put_nowait({"type": "http.disconnect"})
+    await asyncio.wait_for(stream.task, 5)
+    assert app.sessions == {}
+    status, _, _ = await _http(app, "POST", path, json.dumps(request).encode()).response()
+    assert status == 404
+
+@pytest.mark.asyncio
+async def test_websocket():
+    """Test concurrent WebSocket calls, streams, cancel messages and cancellation on disconnect."""
+    app = create_asgi_app(_make_registry())
+    connection = _Connection(app, {"type": "websocket", "path": "/mcp/", "root_path": "/mcp", "subprotocols": []})
+    connection.incoming.put_nowait({"type": "websocket.connect"})
+    assert (await connection.next()) == {"type": "websocket.accept", "subprotocol": None}
+
+    for request in (
+        {"id": "slow", "function": "slow", "parameters": {"delay": 0.2}},
+        {"id": "add", "function": "add", "parameters": {"a": 1, "b": 1}},
+        {"id": "count", "function": "count", "parameters": {"n": 2}},
+    ):
+        connection.incoming.put_nowait({"type": "websocket.receive", "text": json.dumps(request)})
+    messages = [json.loads((await connection.next())["text"]) for _ in range(5)]
+    assert messages[-1]["id"] == "slow"
+    assert [m.get("data") for m in messages if m["id"] == "count"] == [0, 1, None]
+    assert next(m for m in messages if m["id"] == "add")["data"] == 2
+
+    request = {"id": "cancelled", "function": "slow", "parameters": {"delay": 5}}
+    connection.incoming.put_nowait({"type": "websocket.receive", "text": json.dumps(request)})
+    connection.incoming.put_nowait({"type": "websocket.receive", "text": json.dumps({"cancel": "cancelled"})})
+    message = json.loads((await connection.next())["text"])
+    assert message == {"id": "cancelled", "error": "Cancelled", "status": 499}
+
+    connection.incoming.put_nowait({"type": "websocket.receive", "text": "{not json"})
+    assert json.loads((await connection.next())["text"]) == {"error": "Invalid JSON", "status": 400}
+
+    async def broken(context, parameters):
+        raise ValueError("broken invoker")
+
+    app.registry.invokers["broken"] = broken
+    connection.incoming.put_nowait({"type": "websocket.receive", "text": json.dumps({"function": "broken"})})
+    assert json.loads((await connection.next())["text"]) == {"error": "broken invoker", "status": 500}
+
+    request = {"id": "late", "function": "slow", "parameters": {"delay": 5}}
+    connection.incoming.put_nowait({"type": "websocket.receive", "text": json.dumps(request)})
+    connection.incoming.put_nowait({"type": "websocket.disconnect", "code": 1000})
+    await asyncio.wait_for(connection.task, 1)
+    assert connection.outgoing.empty()
+
+@pytest.mark.asyncio
+async def test_lifespan():
+    """Test that the app completes lifespan startup and shutdown."""
+    app = create_asgi_app(_make_registry())
+    connection = _Connection(app, {"type": "lifespan"})
+    connection.incoming.put_nowait({"type": "lifespan.startup"})
+    assert (await connection.next())["type"] == "lifespan.startup.complete"
+    connection.incoming.put_nowait({"type": "lifespan.shutdown"})
+    assert (await connection.next())["type"] == "lifespan.shutdown.complete"
+    await asyncio.wait_for(connection.task, 1)
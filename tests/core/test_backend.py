@@ -0,0 +1,253 @@
+"""Tests for proxying MCP calls to a backend over pooled connections."""
+
+import asyncio
+import json
+
+import pytest
+
+from pymcpfy.core import BackendPool, BackendProxy, MCPError, MCPRegistry
+from pymcpfy.core.transport.http_server import build_response, build_stream_head, encode_chunk, read_request
+
+class _Backend:
+    """Stand-in backend application counting its connections."""
+
+    def __init__(self):
+        self.connections = 0
+        self.active = 0
+        self.max_active = 0
+        self.requests = []
+        self.server = None
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return f"http://127.0.0.1:{self.server.sockets[0].getsockname()[1]}"
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                self.requests.append(request)
+                if request.path == "/drop":
+                    break
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+                try:
+                    await self._respond(request, writer)
+                finally:
+                    self.active -= 1
+                if request.path in ("/close", "/truncated", "/half"):
+                    break
+        finally:
+            writer.close()
+
+    async def _respond(self, request, writer):
+        if request.path == "/slow":
+            await self.release.wait()
+        if request.path == "/stream":
+            writer.write(build_stream_head(200, "application/x-ndjson"))
+            for i in range(3):
+                writer.write(encode_chunk(json.dumps({"n": i}).encode() + b"\n"))
+                await writer.drain()
+            writer.write(encode_chunk(b""))
+        elif request.path == "/half":
+            writer.write(b"HTTP/1.1 2")
+        elif request.path == "/truncated":
+            writer.write(build_stream_head(200, "application/json") + b"a\r\nabc")
+        elif request.path.startswith("/users/"):
+            body = {
+                "id": request.path.rsplit("/", 1)[1],
+                "query": request.query,
+                "auth": request.headers.get("authorization"),
+            }
+            writer.write(build_response(200, json.dumps(body).encode()))
+        elif request.path == "/missing":
+            writer.write(build_response(404, b'{"detail": "No such thing"}'))
+        else:
+            body = request.body or b"{}"
+            writer.write(build_response(200, body, keep_alive=request.path != "/close"))
+        await writer.drain()
+
+@pytest.mark.asyncio
+async def test_proxy_reuses_connections():
+    """Test that sequential calls share one keep-alive connection."""
+    backend = _Backend()
+    url = await backend.start()
+    proxy = BackendProxy(url)
+    registry = MCPRegistry()
+    proxy.register(registry, "echo", "/echo")
+    proxy.register(registry, "get_user", "/users/{user_id}", method="GET")
+    try:
+        dispatcher = registry.dispatcher
+        for i in range(5):
+            response = await dispatcher.dispatch({"id": str(i), "function": "echo", "parameters": {"i": i}}, "test")
+            assert response["data"] == {"i": i}
+
+        response = await dispatcher.dispatch({
+            "id": "u",
+            "function": "get_user",
+            "parameters": {"user_id": "a b", "fields": "name"},
+            "metadata": {"headers": {"Authorization": "Bearer t"}},
+        }, "test")
+        assert response["data"] == {"id": "a%20b", "query": {"fields": ["name"]}, "auth": "Bearer t"}
+
+        assert backend.connections == 1
+        metrics = proxy.pool.metrics()[f"{url}"]
+        assert metrics["requests"] == 6
+        assert metrics["opened"] == 1
+        assert metrics["reused"] == 5
+        assert metrics["idle"] == 1 and metrics["in_use"] == 0
+    finally:
+        await proxy.close()
+        await backend.stop()
+
+@pytest.mark.asyncio
+async def test_pool_limits_connections_per_host():
+    """Test that concurrent requests beyond the limit wait for a connection."""
+    backend = _Backend()
+    url = await backend.start()
+    pool = BackendPool(max_connections=2)
+    backend.release.clear()
+
+    async def call():
+        response = await pool.request("POST", url + "/slow", b'{"ok": true}')
+        return await response.read()
+
+    try:
+        tasks = [asyncio.ensure_future(call()) for _ in range(5)]
+        await asyncio.sleep(0.1)
+        metrics = pool.metrics()[url]
+        assert metrics["in_use"] == 2
+        assert metrics["waiting"] == 3
+        backend.release.set()
+        assert await asyncio.gather(*tasks) == [b'{"ok": true}'] * 5
+        assert backend.max_active == 2
+        assert backend.connections == 2
+    finally:
+        await pool.close()
+        await backend.stop()
+
+@pytest.mark.asyncio
+async def test_pool_replaces_closed_and_idle_connections():
+    """Test that closed and expired connections are not reused."""
+    backend = _Backend()
+    url = await backend.start()
+    pool = BackendPool(idle_timeout=0.05)
+    try:
+        await (await pool.request("POST", url + "/close", b"{}")).read()
+        await (await pool.request("POST", url + "/echo", b"{}")).read()
+        assert backend.connections == 2
+
+        await asyncio.sleep(0.1)
+        await (await pool.request("POST", url + "/echo", b"{}")).read()
+        assert backend.connections == 3
+        assert pool.metrics()[url]["evicted"] == 1
+    finally:
+        await pool.close()
+        await backend.stop()
+
+@pytest.mark.asyncio
+async def test_pool_retries_stale_connections_once():
+    """Test that an idempotent request failing on reused connections is retried once, on a new one."""
+    backend = _Backend()
+    url = await backend.start()
+    pool = BackendPool()
+    backend.release.clear()
+
+    async def call(path, method="PUT"):
+        return await (await pool.request(method, url + path, b"{}")).read()
+
+    def sent(path):
+        return [request.path for request in backend.requests].count(path)
+
+    try:
+        tasks = [asyncio.ensure_future(call("/slow")) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        backend.release.set()
+        await asyncio.gather(*tasks)
+        assert pool.metrics()[url]["idle"] == 3
+
+        with pytest.raises(MCPError) as raised:
+            await call("/drop")
+        assert raised.value.status == 502
+        assert sent("/drop") == 2
+        assert pool.metrics()[url]["in_use"] == 0
+
+        # Neither a non-idempotent request nor one the backend started
+        # answering is sent again.
+        with pytest.raises(MCPError):
+            await call("/drop", method="POST")
+        assert sent("/drop") == 3
+        assert pool.metrics()[url]["idle"] == 1
+        with pytest.raises(MCPError) as raised:
+            await call("/half", method="POST")
+        assert raised.value.status == 502
+        await call("/echo")
+        with pytest.raises(MCPError):
+            await call("/half")
+        assert sent("/half") == 2
+
+        with pytest.raises(MCPError) as raised:
+            await call("/truncated")
+        assert raised.value.status == 502
+        assert pool.metrics()[url]["in_use"] == 0
+    finally:
+        await pool.close()
+        await backend.stop()
+
+@pytest.mark.asyncio
+async def test_proxy_errors_and_timeouts():
+    """Test that backend errors, timeouts and refused connections map to statuses."""
+    backend = _Backend()
+    url = await backend.start()
+    proxy = BackendProxy(url, BackendPool(read_timeout=0.05))
+    registry = MCPRegistry()
+    proxy.register(registry, "missing", "/missing", method="GET")
+    proxy.register(registry, "slow", "/slow")
+    BackendProxy("http://127.0.0.1:1").register(registry, "down", "/")
+    backend.release.clear()
+    try:
+        dispatcher = registry.dispatcher
+        response = await dispatcher.dispatch({"id": "1", "function": "missing"}, "test")
+        assert response["status"] == 404
+        assert response["error"] == "No such thing"
+
+        response = await dispatcher.dispatch({"id": "2", "function": "slow"}, "test")
+        assert response["status"] == 504
+        assert proxy.pool.metrics()[url]["in_use"] == 0
+
+        response = await dispatcher.dispatch({"id": "3", "function": "down"}, "test")
+        assert response["status"] == 502
+
+        proxy.register(registry, "get_user", "/users/{user_id}", method="GET")
+        response = await dispatcher.dispatch({"id": "4", "function": "get_user", "parameters": {"x": 1}}, "test")
+        assert (response["status"], response["error"]) == (400, "Missing path parameter(s): user_id")
+    finally:
+        backend.release.set()
+        await proxy.close()
+        await backend.stop()
+
+@pytest.mark.asyncio
+async def test_proxy_streams_response():
+    """Test that a streamed backend body is forwarded line by line."""
+    backend = _Backend()
+    url = await backend.start()
+    proxy = BackendProxy(url)
+    registry = MCPRegistry()
+    proxy.register(registry, "feed", "/stream", method="GET", stream=True)
+    try:
+        response = await registry.dispatcher.dispatch({"id": "1", "function": "feed"}, "test")
+        assert [chunk async for chunk in response["stream"]] == [{"n": 0}, {"n": 1}, {"n": 2}]
+        await (await proxy.pool.request("POST", url + "/echo", b"{}")).read()
+        assert backend.connections == 1
+    finally:
+        await proxy.close()
+        await backend.stop()
@@ -0,0 +1,100 @@
+"""Tests for automatic call batching."""
+
+import asyncio
+
+import pytest
+
+from pymcpfy.core import Batcher, MCPError, MCPRegistry
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_are_batched():
+    """Test that concurrent calls run as one batch and fan out by id."""
+    batches = []
+
+    async def get_users(contexts, calls):
+        batches.append([call["user_id"] for call in calls])
+        return [
+            MCPError(404, "User not found") if call["user_id"] < 0 else {"id": call["user_id"]}
+            for call in calls
+        ]
+
+    async def get_user(context, user_id: int) -> dict:
+        raise AssertionError("batched functions are not called directly")
+
+    registry = MCPRegistry()
+    registry.register(get_user, batch=Batcher(get_users, max_delay=0.01))
+    dispatch = registry.dispatcher.dispatch
+
+    responses = await asyncio.gather(*[
+        dispatch({"id": str(i), "function": "get_user", "parameters": {"user_id": i - 1}}, "test")
+        for i in range(4)
+    ])
+    assert batches == [[-1, 0, 1, 2]]
+    assert responses[0] == {"id": "0", "error": "User not found", "status": 404}
+    assert [r["data"] for r in responses[1:]] == [{"id": 0}, {"id": 1}, {"id": 2}]
+    assert [r["id"] for r in responses[1:]] == ["1", "2", "3"]
+
+    response = await dispatch({"id": "bad", "function": "get_user", "parameters": {}}, "test")
+    assert response["status"] == 400
+    assert len(batches) == 1
+
+@pytest.mark.asyncio
+async def test_size_threshold_and_sync_batch():
+    """Test that a full batch runs immediately, in an executor when synchronous."""
+    sizes = []
+
+    def double_all(contexts, calls):
+        sizes.append(len(calls))
+        return [call["x"] * 2 for call in calls]
+
+    def double(context, x: int) -> int:
+        return x * 2
+
+    registry = MCPRegistry()
+    registry.register(double, batch=Batcher(double_all, max_batch_size=3, max_delay=10))
+    dispatch = registry.dispatcher.dispatch
+
+    responses = await asyncio.wait_for(asyncio.gather(*[
+        dispatch({"function": "double", "parameters": {"x": i}}, "test") for i in range(6)
+    ]), timeout=1)
+    assert sizes == [3, 3]
+    assert [r["data"] for r in responses] == [0, 2, 4, 6, 8, 10]
+
+@pytest.mark.asyncio
+async def test_batch_failure():
+    """Test that a failing or mismatched batch fails every call in it."""
+    async def broken(contexts, calls):
+        return calls[:1]
+
+    batcher = Batcher(broken, max_delay=0)
+    results = await asyncio.gather(
+        batcher.submit(None, {"a": 1}), batcher.submit(None, {"a": 2}), return_exceptions=True
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+
+@pytest.mark.asyncio
+async def test_close_and_cancel():
+    """Test that close waits for batches and a cancelled batch cancels its calls."""
+    started = asyncio.Event()
+
+    async def slow(contexts, calls):
+        started.set()
+        await asyncio.sleep(0.05)
+        return [call["a"] for call in calls]
+
+    batcher = Batcher(slow, max_delay=10)
+    calls = [asyncio.ensure_future(batcher.submit(None, {"a": i})) for i in range(2)]
+    await asyncio.sleep(0)
+    await batcher.close()
+    assert [call.result() for call in calls] == [0, 1]
+    assert not batcher._tasks
+
+    started.clear()
+    call = asyncio.ensure_future(batcher.submit(None, {"a": 1}))
+    await asyncio.sleep(0)
+    batcher._flush()
+    await started.wait()
+    for task in batcher._tasks:
+        task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(call, timeout=1)
@@ -0,0 +1,102 @@
+"""Tests for the per-function result cache."""
+
+import asyncio
+
+import pytest
+
+from pymcpfy.core import MCPError, MCPRegistry, ResultCache
+
+@pytest.mark.asyncio
+async def test_hits_and_coalescing():
+    """Test cache hits, misses and single-flight coalescing."""
+    calls = []
+    cache = ResultCache(ttl=60)
+    registry = MCPRegistry()
+
+    async def get_user(context, user_id: int) -> dict:
+        calls.append(user_id)
+        await asyncio.sleep(0.05)
+        if user_id < 0:
+            raise MCPError(404, "User not found")
+        return {"id": user_id}
+
+    registry.register(get_user, cache=cache)
+    dispatch = registry.dispatcher.dispatch
+
+    responses = await asyncio.gather(*[
+        dispatch({"id": str(i), "function": "get_user", "parameters": {"user_id": 1}}, "test")
+        for i in range(5)
+    ])
+    assert calls == [1]
+    assert [r["id"] for r in responses] == ["0", "1", "2", "3", "4"]
+    assert all(r["data"] == {"id": 1} for r in responses)
+
+    response = await dispatch({"id": "x", "function": "get_user", "parameters": {"user_id": 1}}, "test")
+    assert response["id"] == "x"
+    assert calls == [1]
+
+    await dispatch({"function": "get_user", "parameters": {"user_id": -1}}, "test")
+    await dispatch({"function": "get_user", "parameters": {"user_id": -1}}, "test")
+    assert calls == [1, -1, -1]
+
+    assert cache.stats() == {
+        "hits": 1, "misses": 3, "coalesced": 4, "evictions": 0, "entries": 1, "bytes": 0
+    }
+
+@pytest.mark.asyncio
+async def test_ttl_and_lru_eviction():
+    """Test expiry and eviction bounds."""
+    cache = ResultCache(ttl=0.05, max_entries=2)
+    counter = iter(range(100))
+
+    async def call():
+        return {"data": next(counter), "status": 200}
+
+    assert (await cache.get_or_call("a", call))["data"] == 0
+    assert (await cache.get_or_call("a", call))["data"] == 0
+    await asyncio.sleep(0.06)
+    assert (await cache.get_or_call("a", call))["data"] == 1
+
+    await cache.get_or_call("b", call)
+    await cache.get_or_call("a", call)
+    await cache.get_or_call("c", call)
+    assert cache.stats()["evictions"] == 1
+    assert (await cache.get_or_call("a", call))["data"] == 1
+    assert (await cache.get_or_call("b", call))["data"] == 4
+
+def test_make_key():
+    """Test canonical keys and metadata variation."""
+    cache = ResultCache(vary=["tenant"])
+    assert cache.make_key("f", {"a": 1, "b": 2}, {"tenant": "x"}) == cache.make_key("f", {"b": 2, "a": 1}, {"tenant": "x"})
+    assert cache.make_key("f", {"a": 1}, {"tenant": "x"}) != cache.make_key("f", {"a": 1}, {"tenant": "y"})
+    assert ResultCache().make_key("f", {"a": 1}, {"tenant": "x"}) == ResultCache().make_key("f", {"a": 1}, {"tenant": "y"})
+    assert cache.make_key("f", {"a": 1}, "oops") == cache.make_key("f", {"a": 1}, {})
+
+@pytest.mark.asyncio
+async def test_max_bytes():
+    """Test that the byte bound evicts old entries."""
+    cache = ResultCache(max_bytes=100)
+
+    async def call():
+        return {"data": "x" * 40, "status": 200}
+
+    await cache.get_or_call("a", call)
+    await cache.get_or_call("b", call)
+    assert cache.stats()["entries"] == 1
+    assert cache.bytes <= 100
+
+@pytest.mark.asyncio
+async def test_key_errors_are_mapped():
+    """Test that a failure building the key is answered as an error response."""
+    class BrokenKeys(ResultCache):
+        def make_key(self, name, parameters, metadata=None):
+            raise RuntimeError("no key")
+
+    registry = MCPRegistry()
+
+    async def double(context, x: int) -> int:
+        return x * 2
+
+    registry.register(double, cache=BrokenKeys())
+    response = await registry.dispatcher.dispatch({"id": "1", "function": "double", "parameters": {"x": 2}}, "http")
+    assert response == {"error": "no key", "status": 500, "id": "1"}
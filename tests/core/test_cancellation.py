@@ -0,0 +1,125 @@
+"""Tests for deadlines and cancellation of MCP calls."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from pymcpfy.core import ExecutorManager, MCPRegistry
+from pymcpfy.core.streaming import collect_stream
+
+@pytest.mark.asyncio
+async def test_function_timeout():
+    """Test that a call running past its function's timeout is cancelled with 504."""
+    registry = MCPRegistry()
+    contexts = []
+
+    async def slow(context, delay: float) -> float:
+        contexts.append(context)
+        await asyncio.sleep(delay)
+        return delay
+
+    registry.register(slow, timeout=0.05)
+    dispatcher = registry.dispatcher
+
+    response = await dispatcher.dispatch({"id": "1", "function": "slow", "parameters": {"delay": 1}}, "test")
+    assert response == {"id": "1", "error": "Deadline exceeded", "status": 504}
+    assert contexts[0].cancelled
+
+    response = await dispatcher.dispatch({"id": "2", "function": "slow", "parameters": {"delay": 0}}, "test")
+    assert response["data"] == 0
+    assert 0 < contexts[1].remaining() <= 0.05
+
+@pytest.mark.asyncio
+async def test_client_deadline():
+    """Test that metadata deadlines shorten, but never extend, a call's timeout."""
+    registry = MCPRegistry()
+
+    async def slow(context, delay: float) -> float:
+        await asyncio.sleep(delay)
+        return delay
+
+    registry.register(slow)
+    registry.register(slow, name="bounded", timeout=0.05)
+    dispatcher = registry.dispatcher
+
+    def call(function, delay, metadata):
+        request = {"id": "1", "function": function, "parameters": {"delay": delay}, "metadata": metadata}
+        return dispatcher.dispatch(request, "test")
+
+    assert (await call("slow", 1, {"timeout": 0.05}))["status"] == 504
+    assert (await call("slow", 1, {"deadline": time.time() + 0.05}))["status"] == 504
+    assert (await call("slow", 0.01, {"timeout": 1}))["status"] == 200
+    assert (await call("bounded", 0.2, {"timeout": 10}))["status"] == 504
+
+    started = time.monotonic()
+    assert (await call("slow", 1, {"deadline": time.time() - 1}))["status"] == 504
+    assert time.monotonic() - started < 0.05
+
+@pytest.mark.asyncio
+async def test_queued_sync_calls_never_start():
+    """Test that a timed out call waiting for an executor thread does not run."""
+    registry = MCPRegistry(executors=ExecutorManager(thread_pool_size=1))
+    release = threading.Event()
+    ran = []
+
+    def block(context, label: str) -> str:
+        ran.append(label)
+        release.wait(1)
+        return label
+
+    registry.register(block)
+    dispatcher = registry.dispatcher
+    first = asyncio.ensure_future(dispatcher.dispatch({"id": "1", "function": "block", "parameters": {"label": "a"}}, "test"))
+    await asyncio.sleep(0.01)
+
+    request = {"id": "2", "function": "block", "parameters": {"label": "b"}, "metadata": {"timeout": 0.05}}
+    assert (await dispatcher.dispatch(request, "test"))["status"] == 504
+    release.set()
+    assert (await first)["data"] == "a"
+    await asyncio.sleep(0.01)
+    assert ran == ["a"]
+    registry.executors.shutdown()
+
+@pytest.mark.asyncio
+async def test_stream_deadline():
+    """Test that a stream ends with a 504 error once its deadline passes."""
+    registry = MCPRegistry()
+    closed = []
+
+    async def ticks(context):
+        try:
+            for i in range(100):
+                yield i
+                await asyncio.sleep(0.02)
+        finally:
+            closed.append(True)
+
+    registry.register(ticks, timeout=0.05)
+    response = await registry.dispatcher.dispatch({"id": "1", "function": "ticks"}, "test")
+    response = await collect_stream(response)
+    assert response["status"] == 504
+    assert response["error"] == "Deadline exceeded"
+    assert closed == [True]
+
+@pytest.mark.asyncio
+async def test_pipeline_deadline():
+    """Test that a pipeline timeout bounds all of its steps."""
+    registry = MCPRegistry()
+
+    async def slow(context, delay: float) -> float:
+        await asyncio.sleep(delay)
+        return delay
+
+    registry.register(slow)
+    request = {
+        "id": "p",
+        "pipeline": [
+            {"id": "a", "function": "slow", "parameters": {"delay": 0.04}},
+            {"id": "b", "function": "slow", "parameters": {"delay": {"$ref": "a"}}}
+        ],
+        "metadata": {"timeout": 0.06}
+    }
+    response = await registry.dispatcher.dispatch(request, "test")
+    assert response == {"id": "p", "error": "Deadline exceeded", "status": 504}
@@ -0,0 +1,68 @@
+"""Tests for wire codecs."""
+
+import pytest
+
+from pymcpfy.core.codecs import (
+    JSON_CODEC,
+    Codec,
+    JSONCodec,
+    codec_for_content_type,
+    codec_for_subprotocol,
+    codecs_by_name,
+    get_codec,
+)
+
+MESSAGE = {"id": "1", "data": {"rows": [1, 2.5, "three", None, True]}, "status": 200, "metadata": {}}
+
+@pytest.mark.parametrize("name", ["json", "orjson", "msgpack"])
+def test_round_trip(name):
+    """Test that each codec decodes what it encodes."""
+    if name != "json":
+        pytest.importorskip(name)
+    codec = get_codec(name)
+    assert codec.decode(codec.encode(MESSAGE)) == MESSAGE
+
+@pytest.mark.parametrize("name", ["json", "msgpack"])
+def test_invalid_input(name):
+    """Test that malformed input raises ValueError."""
+    if name != "json":
+        pytest.importorskip(name)
+    with pytest.raises(ValueError):
+        get_codec(name).decode(b"\xc1\xff{")
+
+def test_orjson_fallback():
+    """Test that values orjson rejects fall back to the stdlib encoder."""
+    pytest.importorskip("orjson")
+    assert get_codec("orjson").decode(get_codec("orjson").encode({"big": 2 ** 70})) == {"big": 2 ** 70}
+
+def test_negotiation():
+    """Test codec selection from headers and subprotocols."""
+    pytest.importorskip("msgpack")
+    codecs = codecs_by_name(["json", "msgpack"])
+    msgpack_codec = codecs[1]
+
+    assert codec_for_content_type(None, codecs) is JSON_CODEC
+    assert codec_for_content_type("application/json; charset=utf-8", codecs) is JSON_CODEC
+    assert codec_for_content_type("application/x-msgpack", codecs) is msgpack_codec
+    assert codec_for_content_type("*/*", codecs, msgpack_codec) is msgpack_codec
+    assert codec_for_content_type("text/html, application/msgpack", codecs) is msgpack_codec
+    assert codec_for_content_type("text/html", codecs) is None
+    assert codec_for_content_type("application/msgpack", codecs[:1]) is None
+
+    assert codec_for_subprotocol("mcp.msgpack", codecs) is msgpack_codec
+    assert codec_for_subprotocol(None, codecs) is JSON_CODEC
+
+def test_unknown_codec():
+    """Test that unknown codec names are rejected."""
+    with pytest.raises(ValueError):
+        get_codec("xml")
+    assert isinstance(JSON_CODEC, JSONCodec)
+
+def test_incomplete_codec():
+    """Test that a codec missing decode cannot be instantiated."""
+    class EncodeOnly(Codec):
+        def encode(self, message):
+            return b""
+
+    with pytest.raises(TypeError):
+        EncodeOnly()
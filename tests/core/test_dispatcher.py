@@ -0,0 +1,131 @@
+"""Tests for the shared MCP dispatcher."""
+
+import asyncio
+
+import pytest
+
+from pymcpfy.core import MCPError, MCPRegistry, MCPResponse
+
+def _make_registry() -> MCPRegistry:
+    registry = MCPRegistry()
+
+    def add(context, a: int, b: int = 0) -> int:
+        return a + b
+
+    async def whoami(context) -> dict:
+        return {"transport": context.transport, "user": context.metadata.get("user")}
+
+    def find(context, user_id: int):
+        if user_id != 1:
+            raise MCPError(404, "User not found")
+        return MCPResponse({"id": 1}, metadata={"cached": False})
+
+    def fail(context, **kwargs):
+        raise RuntimeError("boom")
+
+    for func in (add, whoami, find, fail):
+        registry.register(func)
+    return registry
+
+@pytest.mark.asyncio
+async def test_dispatch_sync_and_async():
+    """Test dispatching to sync and async functions."""
+    dispatcher = _make_registry().dispatcher
+
+    response = await dispatcher.dispatch({"id": "1", "function": "add", "parameters": {"a": 2, "b": 3}}, "http")
+    assert response == {"data": 5, "status": 200, "metadata": {}, "id": "1"}
+
+    response = await dispatcher.dispatch({"id": "2", "function": "whoami", "metadata": {"user": "u"}}, "websocket")
+    assert response["data"] == {"transport": "websocket", "user": "u"}
+
+@pytest.mark.asyncio
+async def test_dispatch_errors():
+    """Test error mapping in the compiled invokers."""
+    dispatcher = _make_registry().dispatcher
+
+    assert (await dispatcher.dispatch({"id": "1"}, "http"))["status"] == 400
+    assert (await dispatcher.dispatch({"id": "1", "function": "nope"}, "http"))["status"] == 404
+    assert (await dispatcher.dispatch([], "http"))["status"] == 400
+    assert (await dispatcher.dispatch({"id": "1", "function": ["add"]}, "http"))["status"] == 400
+    assert (await dispatcher.dispatch({"id": "1", "function": {"name": "add"}}, "http"))["status"] == 400
+    response = await dispatcher.dispatch({"id": "1", "function": "add", "parameters": [1, 2]}, "http")
+    assert response == {"id": "1", "error": "Parameters must be an object", "status": 400}
+    response = await dispatcher.dispatch({"id": "1", "function": "add", "parameters": {"a": 1}, "metadata": "oops"}, "http")
+    assert response == {"id": "1", "error": "Metadata must be an object", "status": 400}
+
+    response = await dispatcher.dispatch({"id": "1", "function": "add", "parameters": {"c": 1}}, "http")
+    assert response["status"] == 400
+    assert "Unexpected parameters: c" in response["error"]
+
+    response = await dispatcher.dispatch({"id": "1", "function": "add", "parameters": {"b": 1}}, "http")
+    assert response["status"] == 400
+    assert "Missing parameters: a" in response["error"]
+
+    response = await dispatcher.dispatch({"id": "1", "function": "find", "parameters": {"user_id": 2}}, "http")
+    assert response == {"id": "1", "error": "User not found", "status": 404}
+
+    response = await dispatcher.dispatch({"id": "1", "function": "find", "parameters": {"user_id": 1}}, "http")
+    assert response["metadata"] == {"cached": False}
+
+    response = await dispatcher.dispatch({"id": "1", "function": "fail", "parameters": {"x": 1}}, "http")
+    assert response == {"id": "1", "error": "boom", "status": 500}
+
+def test_dispatcher_is_shared():
+    """Test that a registry hands out a single dispatcher."""
+    registry = MCPRegistry()
+    assert registry.dispatcher is registry.dispatcher
+
+def test_async_detection():
+    """Test that coroutine functions are registered as async."""
+    registry = MCPRegistry()
+
+    async def func(context):
+        return None
+
+    assert registry.register(func).is_async
+
+@pytest.mark.asyncio
+async def test_dispatch_batch():
+    """Test array requests, their ordering and the concurrency cap."""
+    registry = _make_registry()
+    dispatcher = registry.dispatcher
+
+    responses = await dispatcher.dispatch_message([
+        {"id": "a", "function": "add", "parameters": {"a": 1}},
+        {"id": "b", "function": "nope"},
+        "junk",
+    ], "http")
+    assert [r.get("id") for r in responses] == ["a", "b", None]
+    assert [r["status"] for r in responses] == [200, 404, 400]
+
+    async def broken(context, parameters):
+        raise RuntimeError("broken invoker")
+
+    registry.invokers["broken"] = broken
+    responses = await dispatcher.dispatch_message([
+        {"id": "a", "function": "add", "parameters": {"a": 1}},
+        {"id": "b", "function": "broken"},
+    ], "http")
+    assert responses[0]["status"] == 200
+    assert responses[1] == {"id": "b", "error": "broken invoker", "status": 500}
+
+    assert (await dispatcher.dispatch_message([], "http"))["status"] == 400
+    assert (await dispatcher.dispatch_message([{}] * 3, "http", max_batch_size=2))["status"] == 413
+
+    active = 0
+    peak = 0
+
+    async def tracked(context) -> int:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return 0
+
+    registry.register(tracked)
+    responses = await dispatcher.dispatch_message(
+        [{"id": str(i), "function": "tracked"} for i in range(10)], "http", batch_concurrency=3
+    )
+    assert [r["id"] for r in responses] == [str(i) for i in range(10)]
+    assert peak == 3
@@ -0,0 +1,62 @@
+"""Tests for executor selection."""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pymcpfy.config import MCPConfig
+from pymcpfy.core import ExecutorManager, MCPRegistry
+
+def _pid(context) -> int:
+    return os.getpid()
+
+def _thread_name(context) -> str:
+    return threading.current_thread().name
+
+@pytest.mark.asyncio
+async def test_named_thread_pools():
+    """Test that functions run in the executor they were registered with."""
+    executors = ExecutorManager(thread_pool_size=2, thread_pools={"db": 1})
+    registry = MCPRegistry(executors=executors)
+    registry.register(_thread_name, name="default")
+    registry.register(_thread_name, name="db", executor="db")
+    custom = ThreadPoolExecutor(max_workers=1, thread_name_prefix="custom")
+    registry.register(_thread_name, name="custom", executor=custom)
+    try:
+        dispatch = registry.dispatcher.dispatch
+        assert (await dispatch({"function": "default"}, "test"))["data"].startswith("pymcpfy-default")
+        assert (await dispatch({"function": "db"}, "test"))["data"].startswith("pymcpfy-db")
+        assert (await dispatch({"function": "custom"}, "test"))["data"].startswith("custom")
+    finally:
+        executors.shutdown()
+        custom.shutdown()
+
+@pytest.mark.asyncio
+async def test_process_pool():
+    """Test that process-pool functions run outside this process."""
+    executors = ExecutorManager(process_pool_size=1)
+    registry = MCPRegistry(executors=executors)
+    registry.register(_pid, executor="process")
+    try:
+        response = await registry.dispatcher.dispatch({"function": "_pid"}, "test")
+        assert response["status"] == 200
+        assert response["data"] != os.getpid()
+    finally:
+        executors.shutdown()
+
+def test_unknown_executor():
+    """Test that registering with an undeclared executor fails fast."""
+    with pytest.raises(ValueError):
+        MCPRegistry().register(_pid, executor="missing")
+    with pytest.raises(ValueError):
+        ExecutorManager().add_thread_pool("process", 1)
+
+def test_from_config():
+    """Test executor sizing from MCPConfig."""
+    config = MCPConfig.from_dict({"thread_pool_size": 4, "process_pool_size": 2, "executors": {"db": 3}})
+    executors = ExecutorManager.from_config(config)
+    assert executors.thread_pool_size == 4
+    assert executors.process_pool_size == 2
+    executors.runner("db")
@@ -1,7 +1,7 @@
 """Tests for core MCP protocol functionality."""
 
 import pytest
-from typing import Dict, Any
+from typing import Any, Dict, List, Optional
 
 from pymcpfy.core import (
     MCPContext,
@@ -78,3 +78,86 @@ def test_mcp_context():
     assert context.metadata == {"user": "test"}
     assert context.transport == "websocket"
     assert context.raw_request == {"type": "request"}
+
+def test_mcp_registry_schema_cache():
+    """Test that schemas are cached and invalidated per function."""
+    registry = MCPRegistry()
+    calls = []
+
+    class CountingFunction(MCPFunction):
+        def generate_schema(self, defs=None) -> MCPSchema:
+            calls.append(self.name)
+            return super().generate_schema(defs)
+
+    registry.register(CountingFunction(lambda context: 1, name="one"))
+    registry.register(CountingFunction(lambda context: 2, name="two"))
+
+    body, etag = registry.get_schema_json()
+    assert registry.get_schema_json() == (body, etag)
+    assert registry.get_schema().keys() == {"one", "two"}
+    assert sorted(calls) == ["one", "two"]
+
+    registry.register(CountingFunction(lambda context: 2, name="two", description="changed"))
+    new_body, new_etag = registry.get_schema_json()
+    assert new_etag != etag
+    assert b"changed" in new_body
+    assert sorted(calls) == ["one", "two", "two"]
+
+def test_mcp_registry_shared_defs():
+    """Test that models shared by several functions are emitted once."""
+    import json
+    from pydantic import BaseModel
+
+    class User(BaseModel):
+        name: str
+
+    registry = MCPRegistry()
+    for name in ("get_user", "update_user"):
+        registry.register(lambda context, user: user, name=name, parameter_types={"user": User}, return_type=User)
+
+    document = json.loads(registry.get_schema_json()[0])
+    assert document["get_user"]["parameters"]["user"]["type"] == {"$ref": "#/$defs/User"}
+    assert document["update_user"]["return_type"] == {"$ref": "#/$defs/User"}
+    assert list(document["$defs"]) == ["User"]
+    assert registry.get_schema_defs()["User"]["properties"]["name"]["type"] == "string"
+
+def test_mcp_registry_prunes_defs():
+    """Test that replacing a function drops the $defs only it used."""
+    import json
+    from pydantic import BaseModel
+
+    class User(BaseModel):
+        name: str
+
+    class Item(BaseModel):
+        sku: str
+
+    registry = MCPRegistry()
+    registry.register(lambda context, user: user, name="get", parameter_types={"user": User})
+    registry.register(lambda context, user: user, name="put", parameter_types={"user": User})
+    registry.get_schema_json()
+    registry.register(lambda context, item: item, name="get", parameter_types={"item": Item})
+    assert set(json.loads(registry.get_schema_json()[0])["$defs"]) == {"User", "Item"}
+    registry.register(lambda context, item: item, name="put", parameter_types={"item": Item})
+    assert list(json.loads(registry.get_schema_json()[0])["$defs"]) == ["Item"]
+
+    registry.get_schema_defs()["Item"]["properties"].clear()
+    registry.get_schema()["get"].parameters["item"]["type"].clear()
+    assert registry.get_schema_defs()["Item"]["properties"]["sku"]["type"] == "string"
+    assert registry.get_schema()["get"].parameters["item"]["type"] == {"$ref": "#/$defs/Item"}
+
+def test_mcp_function_schema_from_signature():
+    """Test that types and descriptions default to the function's own."""
+    def find(context, user_id: int, *args, tags: Optional[List[str]] = None, **kwargs) -> Dict[str, Any]:
+        """Find a user.
+
+        :param user_id: Id of the user
+        """
+        return {}
+
+    schema = MCPFunction(find).generate_schema()
+    assert schema.parameters == {
+        "user_id": {"type": {"type": "integer"}, "description": "Id of the user"},
+        "tags": {"type": {"type": "array", "items": {"type": "string"}, "nullable": True}, "description": "Parameter tags"},
+    }
+    assert schema.return_type == {"type": "object", "additionalProperties": {"type": "any"}}
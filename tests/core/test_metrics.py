@@ -0,0 +1,100 @@
+"""Tests for call metrics."""
+
+import asyncio
+
+import pytest
+
+from pymcpfy.core import CallMetrics, ConcurrencyLimiter, MCPRegistry
+from pymcpfy.core.metrics import Histogram
+
+def _make_registry(limiter=None) -> MCPRegistry:
+    registry = MCPRegistry(limiter=limiter, metrics=CallMetrics())
+
+    async def add(context, a: int, b: int) -> int:
+        return a + b
+
+    async def ticks(context, n: int):
+        for i in range(n):
+            yield i
+
+    registry.register(add)
+    registry.register(ticks)
+    return registry
+
+def test_histogram():
+    """Test bucket placement and percentile estimates."""
+    histogram = Histogram((0.001, 0.01, 0.1))
+    assert histogram.quantile(0.5) is None
+    for value in (0.0005, 0.001, 0.005, 0.05, 5):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1, 1]
+    assert histogram.count == 5
+    assert histogram.quantile(0.5) == 0.01
+    assert histogram.quantile(0.99) == 0.1
+
+@pytest.mark.asyncio
+async def test_calls_are_counted_per_function_and_transport():
+    """Test call, error and in-flight counts, including open streams."""
+    registry = _make_registry()
+    dispatcher = registry.dispatcher
+    await dispatcher.dispatch({"id": "1", "function": "add", "parameters": {"a": 1, "b": 2}}, "http")
+    await dispatcher.dispatch({"id": "2", "function": "add", "parameters": {"a": 1}}, "http")
+    await dispatcher.dispatch({"id": "3", "function": "add", "parameters": {"a": 1, "b": 2}}, "websocket")
+    await dispatcher.dispatch({"id": "4", "function": "missing"}, "http")
+
+    response = await dispatcher.dispatch({"id": "5", "function": "ticks", "parameters": {"n": 2}}, "http")
+    snapshot = registry.metrics.snapshot()
+    assert snapshot["functions"]["ticks"]["http"]["in_flight"] == 1
+    assert [chunk async for chunk in response["stream"]] == [0, 1]
+
+    snapshot = registry.metrics.snapshot()
+    add = snapshot["functions"]["add"]
+    assert (add["http"]["calls"], add["http"]["errors"], add["http"]["in_flight"]) == (2, 1, 0)
+    assert add["http"]["execute"]["count"] == 2
+    assert add["http"]["queue"]["count"] == 0
+    assert add["websocket"]["calls"] == 1
+    assert snapshot["functions"]["ticks"]["http"]["in_flight"] == 0
+    assert snapshot["functions"]["ticks"]["http"]["execute"]["count"] == 1
+    assert "missing" not in snapshot["functions"]
+
+@pytest.mark.asyncio
+async def test_queue_wait_and_rejections():
+    """Test that calls waiting for the registry limiter record their queue time."""
+    limiter = ConcurrencyLimiter(1, max_queued=1)
+    registry = _make_registry(limiter)
+    gate = asyncio.Event()
+
+    async def wait(context) -> None:
+        await gate.wait()
+
+    registry.register(wait)
+    dispatcher = registry.dispatcher
+    tasks = [asyncio.ensure_future(dispatcher.dispatch({"id": str(i), "function": "wait"}, "http")) for i in range(3)]
+    await asyncio.sleep(0.02)
+    assert registry.metrics.snapshot()["functions"]["wait"]["http"]["in_flight"] == 2
+    gate.set()
+    await asyncio.gather(*tasks)
+
+    series = registry.metrics.snapshot()["functions"]["wait"]["http"]
+    assert (series["calls"], series["errors"], series["in_flight"]) == (3, 1, 0)
+    assert series["queue"]["count"] == 2
+    assert series["queue"]["p99"] >= 0.01
+
+@pytest.mark.asyncio
+async def test_prometheus_rendering():
+    """Test the Prometheus text exposition."""
+    registry = _make_registry()
+    metrics = registry.metrics
+    await registry.dispatcher.dispatch({"id": "1", "function": "add", "parameters": {"a": 1, "b": 2}}, "http")
+    metrics.observe("http", "decode", 0.00002)
+    text = metrics.render()
+
+    assert "# TYPE pymcpfy_calls_total counter" in text
+    assert 'pymcpfy_calls_total{function="add",transport="http"} 1' in text
+    assert 'pymcpfy_errors_total{function="add",transport="http"} 0' in text
+    assert 'pymcpfy_in_flight{function="add",transport="http"} 0' in text
+    assert 'pymcpfy_phase_seconds_bucket{function="add",transport="http",phase="execute",le="+Inf"} 1' in text
+    assert 'pymcpfy_phase_seconds_bucket{transport="http",phase="decode",le="0.0001"} 1' in text
+    assert 'pymcpfy_phase_seconds_count{transport="http",phase="decode"} 1' in text
+    assert 'phase="queue"' not in text
+    assert text.endswith("\n")
@@ -0,0 +1,113 @@
+"""Tests for server-side call pipelines."""
+
+import asyncio
+
+import pytest
+
+from pymcpfy.core import MCPError, MCPRegistry
+
+def _make_registry(log: list) -> MCPRegistry:
+    registry = MCPRegistry()
+
+    async def login(context, user: str) -> dict:
+        log.append(("login", user))
+        return {"token": f"t-{user}", "user_id": 7}
+
+    async def get_messages(context, token: str) -> list:
+        log.append(("start", "messages"))
+        await asyncio.sleep(0.05)
+        log.append(("end", "messages"))
+        return [{"text": f"hello {token}"}]
+
+    async def get_user(context, user_id: int) -> dict:
+        log.append(("start", "user"))
+        await asyncio.sleep(0.05)
+        log.append(("end", "user"))
+        if user_id < 0:
+            raise MCPError(404, "User not found")
+        return {"id": user_id}
+
+    async def summarize(context, messages: list, user: dict) -> str:
+        return f"{user['id']}: {messages[0]['text']}"
+
+    for func in (login, get_messages, get_user, summarize):
+        registry.register(func)
+    return registry
+
+@pytest.mark.asyncio
+async def test_pipeline_runs_dag():
+    """Test references between steps and parallel independent branches."""
+    log = []
+    dispatcher = _make_registry(log).dispatcher
+    response = await dispatcher.dispatch({"id": "p", "pipeline": [
+        {"id": "summary", "function": "summarize", "parameters": {
+            "messages": {"$ref": "inbox"}, "user": {"$ref": "profile"}
+        }},
+        {"id": "login", "function": "login", "parameters": {"user": "ada"}},
+        {"id": "inbox", "function": "get_messages", "parameters": {"token": {"$ref": "login.token"}}},
+        {"id": "profile", "function": "get_user", "parameters": {"user_id": {"$ref": "login.user_id"}}},
+    ]}, "test")
+
+    assert response["id"] == "p"
+    assert response["status"] == 200
+    assert response["data"]["summary"]["data"] == "7: hello t-ada"
+    assert response["data"]["inbox"]["id"] == "inbox"
+    # Both branches start before either finishes.
+    assert [kind for kind, _ in log[1:3]] == ["start", "start"]
+
+@pytest.mark.asyncio
+async def test_pipeline_failures():
+    """Test validation errors and failed dependencies."""
+    dispatcher = _make_registry([]).dispatcher
+
+    response = await dispatcher.dispatch({"id": "p", "pipeline": [
+        {"id": "profile", "function": "get_user", "parameters": {"user_id": -1}},
+        {"id": "summary", "function": "summarize", "parameters": {
+            "messages": [], "user": {"$ref": "profile"}
+        }},
+        {"id": "bad", "function": "get_user", "parameters": {"user_id": {"$ref": "profile.missing"}}},
+    ]}, "test")
+    steps = response["data"]
+    assert steps["profile"]["status"] == 404
+    assert steps["summary"]["status"] == 424
+    assert steps["bad"]["status"] == 424
+
+    cycle = [
+        {"id": "a", "function": "login", "parameters": {"user": {"$ref": "b"}}},
+        {"id": "b", "function": "login", "parameters": {"user": {"$ref": "a"}}},
+    ]
+    assert (await dispatcher.dispatch({"pipeline": cycle}, "test"))["status"] == 400
+    unknown = [{"id": "a", "function": "login", "parameters": {"user": {"$ref": "z"}}}]
+    assert (await dispatcher.dispatch({"pipeline": unknown}, "test"))["status"] == 400
+    assert (await dispatcher.dispatch({"pipeline": []}, "test"))["status"] == 400
+
+    response = await dispatcher.dispatch({"pipeline": [
+        {"id": "login", "function": "login", "parameters": {"user": "ada"}},
+        {"id": "user", "function": "get_user", "parameters": {"user_id": {"$ref": "login.nope"}}},
+    ]}, "test")
+    assert response["data"]["user"] == {"id": "user", "error": "Cannot resolve reference login.nope", "status": 400}
+
+@pytest.mark.asyncio
+async def test_pipeline_isolates_errors_and_cancels_steps():
+    """Test that a crashing step fails alone and a timed-out pipeline stops its steps."""
+    log = []
+    registry = _make_registry(log)
+    dispatcher = registry.dispatcher
+
+    async def broken(context, parameters):
+        raise RuntimeError("broken invoker")
+
+    registry.invokers["broken"] = broken
+    response = await dispatcher.dispatch({"id": "p", "pipeline": [
+        {"id": "login", "function": "login", "parameters": {"user": "ada"}},
+        {"id": "oops", "function": "broken"},
+    ]}, "test")
+    assert response["data"]["login"]["status"] == 200
+    assert response["data"]["oops"] == {"id": "oops", "error": "broken invoker", "status": 500}
+
+    response = await dispatcher.dispatch({"id": "p", "metadata": {"timeout": 0.01}, "pipeline": [
+        {"id": "profile", "function": "get_user", "parameters": {"user_id": 1}},
+    ]}, "test")
+    assert response["status"] == 504
+    await asyncio.sleep(0.1)
+    assert ("end", "user") not in log
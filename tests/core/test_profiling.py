@@ -0,0 +1,76 @@
+"""Tests for the slow-call profiler."""
+
+import asyncio
+import time
+
+import pytest
+
+from pymcpfy.core import CallProfiler, ConcurrencyLimiter, MCPRegistry
+
+def _make_registry(profiler: CallProfiler, limiter=None) -> MCPRegistry:
+    registry = MCPRegistry(limiter=limiter, profiler=profiler)
+
+    def crunch(context, seconds: float) -> int:
+        deadline = time.perf_counter() + seconds
+        total = 0
+        while time.perf_counter() < deadline:
+            total += 1
+        return total
+
+    async def pause(context, seconds: float) -> float:
+        await asyncio.sleep(seconds)
+        return seconds
+
+    registry.register(crunch)
+    registry.register(pause)
+    return registry
+
+@pytest.mark.asyncio
+async def test_slow_calls_are_sampled():
+    """Test that only calls past the threshold are kept, with their stacks."""
+    registry = _make_registry(CallProfiler(threshold=0.05))
+    dispatcher = registry.dispatcher
+    await dispatcher.dispatch({"id": "1", "function": "crunch", "parameters": {"seconds": 0}}, "http")
+    await dispatcher.dispatch({"id": "2", "function": "crunch", "parameters": {"seconds": 0.15}}, "http")
+    await dispatcher.dispatch({"id": "3", "function": "pause", "parameters": {"seconds": 0.15}}, "websocket")
+
+    paused, crunched = registry.profiler.snapshot()
+    assert (crunched["function"], crunched["id"], crunched["reason"]) == ("crunch", "2", "slow")
+    assert crunched["duration"] >= 0.15
+    assert set(crunched["phases"]) == {"queue", "executor_wait", "run"}
+    assert crunched["phases"]["run"] >= 0.15
+    assert any("crunch (test_profiling.py" in sample["stack"].split(";")[-1] for sample in crunched["samples"])
+    assert "profile" not in crunched
+
+    assert (paused["function"], paused["transport"]) == ("pause", "websocket")
+    assert set(paused["phases"]) == {"queue", "run"}
+    assert any("pause (test_profiling.py" in sample["stack"] for sample in paused["samples"])
+
+@pytest.mark.asyncio
+async def test_sampled_calls_are_profiled():
+    """Test cProfile output for sampled calls and the bounded ring buffer."""
+    registry = _make_registry(CallProfiler(threshold=None, sample_rate=1.0, max_records=2))
+    for i in range(3):
+        await registry.dispatcher.dispatch({"id": str(i), "function": "crunch", "parameters": {"seconds": 0.01}}, "http")
+
+    records = registry.profiler.snapshot()
+    assert [record["id"] for record in records] == ["2", "1"]
+    assert records[0]["reason"] == "sampled"
+    assert any(row["function"].startswith("crunch (test_profiling.py") for row in records[0]["profile"])
+
+    registry.profiler = CallProfiler(threshold=None)
+    await registry.dispatcher.dispatch({"id": "4", "function": "crunch", "parameters": {"seconds": 0}}, "http")
+    assert registry.profiler.snapshot() == []
+
+@pytest.mark.asyncio
+async def test_queue_phase():
+    """Test that the wait for the registry limiter is reported as queue time."""
+    registry = _make_registry(CallProfiler(threshold=0.05), ConcurrencyLimiter(1))
+    dispatcher = registry.dispatcher
+    await asyncio.gather(*[
+        dispatcher.dispatch({"id": str(i), "function": "pause", "parameters": {"seconds": 0.06}}, "http")
+        for i in range(2)
+    ])
+    queued = max(registry.profiler.snapshot(), key=lambda record: record["phases"]["queue"])
+    assert queued["phases"]["queue"] >= 0.05
+    assert queued["duration"] >= 0.11
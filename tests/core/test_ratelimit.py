@@ -0,0 +1,130 @@
+"""Tests for per-client rate limits and concurrency quotas."""
+
+import asyncio
+
+import pytest
+
+from pymcpfy.core import MCPRegistry, RateLimiter
+from pymcpfy.core import ratelimit
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", clock)
+    return clock
+
+def _make_registry(rate_limiter):
+    registry = MCPRegistry(rate_limiter=rate_limiter)
+    gate = asyncio.Event()
+    gate.set()
+
+    async def echo(context) -> str:
+        await gate.wait()
+        return context.connection
+
+    registry.register(echo)
+    return registry, gate
+
+def _call(registry, tenant=None, connection="10.0.0.1:4000"):
+    metadata = {"tenant": tenant} if tenant else {}
+    return registry.dispatcher.dispatch({"id": "1", "function": "echo", "metadata": metadata}, "test", connection)
+
+@pytest.mark.asyncio
+async def test_token_bucket_per_key(clock):
+    """Test that each tenant gets its own bucket, refilled over time."""
+    registry, _ = _make_registry(RateLimiter(rate=2, burst=2, key="tenant"))
+
+    assert [(await _call(registry, "a"))["status"] for _ in range(3)] == [200, 200, 429]
+    response = await _call(registry, "a")
+    assert response["error"] == "Rate limit exceeded"
+    assert response["metadata"] == {"retry_after": 0.5}
+    assert response["id"] == "1"
+    assert (await _call(registry, "b"))["status"] == 200
+
+    # Calls without the field are keyed on their connection.
+    assert (await _call(registry, connection="c1"))["data"] == "c1"
+    assert (await _call(registry, connection="c1"))["status"] == 200
+    assert (await _call(registry, connection="c1"))["status"] == 429
+    assert (await _call(registry, connection="c2"))["status"] == 200
+
+    clock.now += 0.5
+    assert (await _call(registry, "a"))["status"] == 200
+    assert (await _call(registry, "a"))["status"] == 429
+    assert registry.rate_limiter.metrics()["limited"] == 4
+
+@pytest.mark.asyncio
+async def test_default_key_survives_reconnects(clock):
+    """Test that a client opening a new connection keeps its quota."""
+    registry, _ = _make_registry(RateLimiter(rate=1, burst=2))
+    assert (await _call(registry, connection="10.0.0.1:4000"))["status"] == 200
+    assert (await _call(registry, connection="10.0.0.1:4001"))["status"] == 200
+    assert (await _call(registry, connection="10.0.0.1:4002"))["status"] == 429
+    assert (await _call(registry, connection="10.0.0.2:4000"))["status"] == 200
+    assert (await _call(registry, connection="::1:4000"))["status"] == 200
+    assert (await _call(registry, connection="::1:4001"))["status"] == 200
+    assert (await _call(registry, connection="::1:4002"))["status"] == 429
+
+    registry, _ = _make_registry(RateLimiter(rate=1, burst=1, key="connection"))
+    assert (await _call(registry, connection="10.0.0.1:4000"))["status"] == 200
+    assert (await _call(registry, connection="10.0.0.1:4001"))["status"] == 200
+
+@pytest.mark.asyncio
+async def test_concurrency_quota(clock):
+    """Test that a client cannot run more than its quota of calls at once."""
+    registry, gate = _make_registry(RateLimiter(max_concurrent=1, key="tenant"))
+    gate.clear()
+
+    first = asyncio.ensure_future(_call(registry, "a"))
+    await asyncio.sleep(0)
+    response = await _call(registry, "a")
+    assert response["status"] == 429
+    assert response["error"] == "Too many concurrent calls"
+    other = asyncio.ensure_future(_call(registry, "b"))
+    await asyncio.sleep(0)
+
+    gate.set()
+    assert (await first)["status"] == 200
+    assert (await other)["status"] == 200
+    assert (await _call(registry, "a"))["status"] == 200
+
+@pytest.mark.asyncio
+async def test_function_quota_holds_streams(clock):
+    """Test that a per-function quota counts open streams."""
+    registry = MCPRegistry()
+
+    async def ticks(context, n: int):
+        for i in range(n):
+            yield i
+
+    registry.register(ticks, rate_limiter=RateLimiter(max_concurrent=1))
+    request = {"id": "1", "function": "ticks", "parameters": {"n": 2}}
+    response = await registry.dispatcher.dispatch(request, "test", "c1")
+    assert (await registry.dispatcher.dispatch(request, "test", "c1"))["status"] == 429
+    assert [chunk async for chunk in response["stream"]] == [0, 1]
+    assert (await registry.dispatcher.dispatch(request, "test", "c1"))["status"] == 200
+
+@pytest.mark.asyncio
+async def test_idle_and_excess_keys_are_evicted(clock):
+    """Test that the key store stays bounded."""
+    limiter = RateLimiter(rate=1, key="tenant", idle_timeout=60, max_keys=3)
+    registry, _ = _make_registry(limiter)
+    for tenant in "abc":
+        await _call(registry, tenant)
+    assert limiter.metrics()["keys"] == 3
+
+    await _call(registry, "d")
+    assert limiter.metrics()["keys"] == 3
+
+    # Each new key trims up to two expired ones.
+    clock.now += 120
+    await _call(registry, "e")
+    assert limiter.metrics()["keys"] == 2
+    await _call(registry, "f")
+    assert limiter.metrics()["keys"] == 2
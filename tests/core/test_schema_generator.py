@@ -1,6 +1,6 @@
 """Tests for schema generator functionality."""
 
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 from pydantic import BaseModel
 
 import pytest
@@ -103,3 +103,60 @@ def test_docstring_extraction():
     params = SchemaGenerator.generate_parameter_schema(func)
     assert "description" in params["param"]
     assert "This is a test parameter with a multi-line description" in params["param"]["description"]
+
+def test_shared_model_defs():
+    """Test that a model used by several functions is emitted once via $ref."""
+    class Address(BaseModel):
+        city: str
+
+    class Person(BaseModel):
+        name: str
+        address: Address
+
+    def first(person: Person) -> Person:
+        return person
+
+    def second(people: List[Person], owner: Optional[Person]) -> str:
+        return ""
+
+    defs = {}
+    first_params = SchemaGenerator.generate_parameter_schema(first, defs)
+    second_params = SchemaGenerator.generate_parameter_schema(second, defs)
+
+    assert first_params["person"] == {"$ref": "#/$defs/Person"}
+    assert second_params["people"]["items"] == {"$ref": "#/$defs/Person"}
+    assert second_params["owner"]["nullable"] is True
+    assert SchemaGenerator.generate_return_schema(first, defs) == {"$ref": "#/$defs/Person"}
+    assert set(defs) == {"Person", "Address"}
+    assert defs["Person"]["properties"]["address"] == {"$ref": "#/$defs/Address"}
+
+def test_cached_schemas_are_copies():
+    """Test that mutating a returned schema does not affect later results."""
+    def func(value: Optional[int], other: int) -> int:
+        """Test function.
+
+        :param value: First value
+        :param other: Second value
+        """
+        return other
+
+    params = SchemaGenerator.generate_parameter_schema(func)
+    params["other"]["type"] = "mutated"
+    params = SchemaGenerator.generate_parameter_schema(func)
+    assert params["other"] == {"type": "integer", "description": "Second value"}
+    assert params["value"] == {"type": "integer", "nullable": True, "description": "First value"}
+    assert SchemaGenerator._get_type_schema(int) == {"type": "integer"}
+
+def test_caches_are_bounded_and_deep_copied(monkeypatch):
+    """Test that nested schemas are copied and old type hints evicted."""
+    class Tag(BaseModel):
+        label: str
+
+    schema = SchemaGenerator._get_type_schema(List[Tag])
+    schema["items"]["properties"].clear()
+    assert SchemaGenerator._get_type_schema(List[Tag])["items"]["properties"]["label"]["type"] == "string"
+
+    monkeypatch.setattr(SchemaGenerator, "max_cached_types", 2)
+    for type_hint in (List[int], List[str], List[float]):
+        SchemaGenerator._get_type_schema(type_hint)
+    assert list(SchemaGenerator._type_cache) == [float, List[float]]
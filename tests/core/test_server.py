@@ -0,0 +1,89 @@
+"""Tests for configured and multi-worker serving."""
+
+import http.client
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import textwrap
+import time
+
+import pytest
+
+from pymcpfy import MCPConfig, MCPRegistry, TransportConfig, serve
+from pymcpfy.core import HTTPTransport, SSETransport, StdioTransport, WebSocketTransport, create_transport
+
+def test_create_transport():
+    """Test that each transport type is built from its config."""
+    registry = MCPRegistry()
+    transport = create_transport(registry, TransportConfig(type="http", port=9000, http_engine="threaded"))
+    assert isinstance(transport, HTTPTransport)
+    assert (transport.port, transport.engine) == (9000, "threaded")
+    assert isinstance(create_transport(registry, TransportConfig(type="websocket")), WebSocketTransport)
+    assert isinstance(create_transport(registry, TransportConfig(type="sse")), SSETransport)
+    assert create_transport(registry, TransportConfig(type="stdio", framing="length")).framing == "length"
+    with pytest.raises(ValueError):
+        create_transport(registry, TransportConfig(type="carrier-pigeon"))
+
+def test_unix_socket_rate_limit_needs_metadata_key(tmp_path):
+    """Test that serve refuses to rate limit Unix socket peers by address."""
+    config = MCPConfig(transport=TransportConfig(unix_socket=str(tmp_path / "mcp.sock")), rate_limit=10)
+    with pytest.raises(ValueError, match="rate_limit_key"):
+        serve(MCPRegistry(), config)
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _whoami(port: int) -> int:
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    connection.request("POST", "/", json.dumps({"function": "whoami"}), {"Connection": "close"})
+    pid = json.loads(connection.getresponse().read())["data"]
+    connection.close()
+    return pid
+
+def _wait_for(predicate, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if predicate():
+                return
+        except OSError:
+            pass
+        time.sleep(0.05)
+    raise AssertionError("condition not met in time")
+
+@pytest.mark.skipif(not hasattr(socket, "SO_REUSEPORT"), reason="requires SO_REUSEPORT")
+def test_workers_share_port_and_restart():
+    """Test that workers share one port, crashed workers restart and shutdown drains."""
+    port = _free_port()
+    script = textwrap.dedent(f"""
+        import os
+        from pymcpfy import MCPConfig, MCPRegistry, TransportConfig, serve
+
+        registry = MCPRegistry()
+
+        def whoami(context) -> int:
+            return os.getpid()
+
+        registry.register(whoami)
+        serve(registry, MCPConfig(transport=TransportConfig(type="http", host="127.0.0.1", port={port}), workers=2))
+    """)
+    supervisor = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.DEVNULL)
+    try:
+        pids = set()
+        _wait_for(lambda: pids.add(_whoami(port)) or len(pids) == 2)
+
+        victim = pids.pop()
+        os.kill(victim, signal.SIGKILL)
+        replacement = set()
+        _wait_for(lambda: replacement.add(_whoami(port)) or len(replacement - pids - {victim}) == 1)
+
+        supervisor.send_signal(signal.SIGTERM)
+        assert supervisor.wait(timeout=10) == 0
+    finally:
+        if supervisor.poll() is None:
+            supervisor.kill()
@@ -0,0 +1,67 @@
+"""Tests for streaming results from generator functions."""
+
+import pytest
+
+from pymcpfy.core import MCPError, MCPRegistry, ResultCache
+from pymcpfy.core.streaming import collect_stream, stream_frames
+
+def _make_registry() -> MCPRegistry:
+    registry = MCPRegistry()
+
+    async def count(context, n: int):
+        for i in range(n):
+            yield i
+
+    def rows(context, n: int):
+        for i in range(n):
+            yield {"row": i}
+
+    async def broken(context):
+        yield 1
+        raise MCPError(409, "Conflict")
+
+    for func in (count, rows, broken):
+        registry.register(func)
+    return registry
+
+@pytest.mark.asyncio
+async def test_stream_frames():
+    """Test frames from async and sync generators."""
+    dispatcher = _make_registry().dispatcher
+
+    response = await dispatcher.dispatch({"id": "1", "function": "count", "parameters": {"n": 2}}, "test")
+    frames = [frame async for frame in stream_frames(response)]
+    assert frames == [
+        {"id": "1", "seq": 0, "data": 0, "status": 200},
+        {"id": "1", "seq": 1, "data": 1, "status": 200},
+        {"id": "1", "seq": 2, "done": True, "status": 200},
+    ]
+
+    response = await dispatcher.dispatch({"id": "2", "function": "rows", "parameters": {"n": 3}}, "test")
+    assert (await collect_stream(response))["data"] == [{"row": 0}, {"row": 1}, {"row": 2}]
+
+    response = await dispatcher.dispatch({"id": "3", "function": "broken"}, "test")
+    frames = [frame async for frame in stream_frames(response)]
+    assert frames[-1] == {"id": "3", "seq": 1, "error": "Conflict", "status": 409, "done": True}
+
+    response = await dispatcher.dispatch({"id": "4", "function": "count", "parameters": {}}, "test")
+    assert response["status"] == 400
+
+@pytest.mark.asyncio
+async def test_streams_are_collected_in_batches():
+    """Test that batch responses contain collected streams."""
+    dispatcher = _make_registry().dispatcher
+    responses = await dispatcher.dispatch_message([
+        {"id": "a", "function": "count", "parameters": {"n": 3}},
+        {"id": "b", "function": "broken"},
+    ], "test")
+    assert responses[0] == {"id": "a", "data": [0, 1, 2], "status": 200, "metadata": {}}
+    assert responses[1] == {"id": "b", "error": "Conflict", "status": 409}
+
+def test_streams_cannot_be_cached():
+    """Test that caching a generator function is rejected."""
+    async def count(context):
+        yield 1
+
+    with pytest.raises(ValueError):
+        MCPRegistry().register(count, cache=ResultCache())
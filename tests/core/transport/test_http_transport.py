@@ -0,0 +1,471 @@
+"""Tests for the HTTP transport."""
+
+import asyncio
+import json
+
+import pytest
+
+from pymcpfy.core import CallMetrics, CallProfiler, HTTPTransport, MCPRegistry
+
+async def _post(port: int, payload) -> tuple:
+    """Send a single POST request and return (status, body)."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode()
+    writer.write(
+        b"POST / HTTP/1.1\r\nHost: test\r\nConnection: close\r\n"
+        + f"Content-Length: {len(body)}\r\n\r\n".encode()
+        + body
+    )
+    raw = await reader.read()
+    writer.close()
+    head, _, response_body = raw.partition(b"\r\n\r\n")
+    status = int(head.split(b" ")[1])
+    return status, json.loads(response_body)
+
+def _make_registry() -> MCPRegistry:
+    registry = MCPRegistry()
+
+    async def slow(context, delay: float) -> float:
+        await asyncio.sleep(delay)
+        return delay
+
+    def add(context, a: int, b: int) -> int:
+        return a + b
+
+    registry.register(slow, is_async=True)
+    registry.register(add)
+    return registry
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("engine", ["asyncio", "threaded"])
+async def test_http_call(engine):
+    """Test a function call over both HTTP engines."""
+    transport = HTTPTransport(_make_registry(), host="127.0.0.1", port=0, engine=engine)
+    await transport.start()
+    try:
+        status, body = await _post(transport.port, {"id": "1", "function": "add", "parameters": {"a": 1, "b": 2}})
+        assert status == 200
+        assert body == {"id": "1", "data": 3, "status": 200, "metadata": {}}
+
+        status, body = await _post(transport.port, {"id": "2", "function": "missing"})
+        assert status == 404
+        assert body["id"] == "2"
+    finally:
+        await transport.stop()
+
+@pytest.mark.asyncio
+async def test_asyncio_engine_serves_concurrently():
+    """Test that a slow call does not block other clients."""
+    transport = HTTPTransport(_make_registry(), host="127.0.0.1", port=0)
+    await transport.start()
+    try:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        results = await asyncio.gather(*[
+            _post(transport.port, {"id": str(i), "function": "slow", "parameters": {"delay": 0.2}})
+            for i in range(50)
+        ])
+        assert loop.time() - started < 2
+        assert all(status == 200 for status, _ in results)
+    finally:
+        await transport.stop()
+
+@pytest.mark.asyncio
+async def test_asyncio_engine_errors():
+    """Test error responses from the asyncio engine."""
+    transport = HTTPTransport(_make_registry(), host="127.0.0.1", port=0)
+    await transport.start()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", transport.port)
+        writer.write(b"POST / HTTP/1.1\r\nContent-Length: 3\r\nConnection: close\r\n\r\n{x]")
+        raw = await reader.read()
+        writer.close()
+        assert raw.startswith(b"HTTP/1.1 400")
+        assert b"Invalid JSON" in raw
+
+        reader, writer = await asyncio.open_connection("127.0.0.1", transport.port)
+        writer.write(b"GET /schema HTTP/1.1\r\nConnection: close\r\n\r\n")
+        raw = await reader.read()
+        writer.close()
+        assert raw.startswith(b"HTTP/1.1 200")
+        assert "add" in json.loads(raw.partition(b"\r\n\r\n")[2])
+    finally:
+        await transport.stop()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("engine", ["asyncio", "threaded"])
+@pytest.mark.parametrize("length", [b"abc", b"-1"])
+async def test_invalid_content_length(engine, length):
+    """Test that both engines answer an unparsable Content-Length with 400."""
+    transport = HTTPTransport(_make_registry(), host="127.0.0.1", port=0, engine=engine)
+    await transport.start()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", transport.port)
+        writer.write(b"POST / HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n{}")
+        raw = await asyncio.wait_for(reader.read(), timeout=2)
+        writer.close()
+        assert raw.startswith(b"HTTP/1.1 400")
+        assert b"Invalid Content-Length" in raw
+    finally:
+        await transport.stop()
+
+async def _read_response(reader: asyncio.StreamReader) -> tuple:
+    """Read one Content-Length framed response and return (headers, body)."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    headers = {}
+    for line in head.decode("latin-1").split("\r\n")[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return headers, body
+
+def _request(payload: dict) -> bytes:
+    body = json.dumps(payload).encode()
+    return b"POST / HTTP/1.1\r\nHost: test\r\n" + f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("engine", ["asyncio", "threaded"])
+async def test_keep_alive(engine):
+    """Test that several requests share one connection until the limit is hit."""
+    transport = HTTPTransport(
+        _make_registry(), host="127.0.0.1", port=0, engine=engine, max_requests_per_connection=3
+    )
+    await transport.start()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", transport.port)
+        for i in range(3):
+            writer.write(_request({"id": str(i), "function": "add", "parameters": {"a": i, "b": 1}}))
+            headers, body = await _read_response(reader)
+            assert json.loads(body)["data"] == i + 1
+        assert headers["connection"] == "close"
+        assert await reader.read() == b""
+        writer.close()
+
+        reader, writer = await asyncio.open_connection("127.0.0.1", transport.port)
+        writer.write(b"GET /missing HTTP/1.1\r\nHost: test\r\n\r\n")
+        headers, body = await _read_response(reader)
+        assert json.loads(body)["status"] == 404
+        writer.write(b"GET /schema HTTP/1.1\r\nHost: test\r\n\r\n")
+        headers, body = await _read_response(reader)
+        assert "add" in json.loads(body)
+        writer.close()
+    finally:
+        await transport.stop()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("engine", ["asyncio", "threaded"])
+async def test_calls_carry_connection_identity(engine):
+    """Test that functions see the client's address as their connection."""
+    registry = MCPRegistry()
+
+    async def whoami(context) -> str:
+        return context.connection
+
+    registry.register(whoami)
+    transport = HTTPTransport(registry, host="127.0.0.1", port=0, engine=engine)
+    await transport.start()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", transport.port)
+        writer.write(_request({"id": "1", "function": "whoami"}))
+        _, body = await _read_response(reader)
+        host, port = writer.get_extra_info("sockname")[:2]
+        assert json.loads(body)["data"] == f"{host}:{port}"
+        writer.close()
+    finally:
+        await transport.stop()
+
+@pytest.mark.asyncio
+async def test_pipelining_preserves_order():
+    """Test that pipelined requests run concurrently but respond in order."""
+    transport = HTTPTransport(_make_registry(), host="127.0.0.1", port=0)
+    await transport.start()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", transport.port)
+        delays = [0.3, 0.1, 0.2, 0.0]
+        writer.write(b"".join(
+            _request({"id": str(i), "function": "slow", "parameters": {"delay": delay}})
+            for i, delay in enumerate(delays)
+        ))
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        ids = []
+        for _ in delays:
+            _, body = await _read_response(reader)
+            ids.append(json.loads(body)["id"])
+        assert ids == ["0", "1", "2", "3"]
+        assert loop.time() - started < sum(delays)
+        writer.close()
+    finally:
+        await transport.stop()
+
+@pytest.mark.asyncio
+async def test_idle_connection_is_closed():
+    """Test that idle keep-alive connections are closed after the timeout."""
+    transport = HTTPTransport(_make_registry(), host="127.0.0.1", port=0, keepalive_timeout=0.1)
+    await transport.start()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", transport.port)
+        assert await asyncio.wait_for(reader.read(), 2) == b""
+        writer.close()
+    finally:
+        await transport.stop()
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_calls():
+    """Test that a call is cancelled when its client closes the connection."""
+    registry = MCPRegistry()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def hang(context) -> None:
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    registry.register(hang)
+    transport = HTTPTransport(registry, host="127.0.0.1", port=0)
+    await transport.start()
+    try:
+        _, writer = await asyncio.open_connection("127.0.0.1", transport.port)
+        writer.write(_request({"id": "1", "function": "hang"}))
+        await started.wait()
+        writer.close()
+        await asyncio.wait_for(cancelled.wait(), 2)
+    finally:
+        await transport.stop()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("connection", ["keep-alive", "close"])
+async def test_disconnect_cancels_calls_past_keepalive_timeout(connection):
+    """Test that calls outliving the idle timeout are still cancelled on disconnect."""
+    registry = MCPRegistry()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def hang(context) -> None:
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    registry.register(hang)
+    transport = HTTPTransport(registry, host="127.0.0.1", port=0, keepalive_timeout=0.1)
+    await transport.start()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", transport.port)
+        request = _request({"id": "1", "function": "hang"})
+        writer.write(request.replace(b"Host: test\r\n", f"Host: test\r\nConnection: {connection}\r\n".encode()))
+        await started.wait()
+        await asyncio.sleep(0.3)
+        assert not reader.at_eof()
+        writer.close()
+        await asyncio.wait_for(cancelled.wait(), 2)
+    finally:
+        await transport.stop()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("engine", ["asyncio", "threaded"])
+async def test_metrics_endpoint(engine):
+    """Test that GET /metrics serves call metrics in the Prometheus format."""
+    registry = _make_registry()
+    transport = HTTPTransport(registry, host="127.0.0.1", port=0, engine=engine)
+    await transport.start()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", transport.port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: test\r\n\r\n")
+        _, body = await _read_response(reader)
+        assert json.loads(body)["status"] == 404
+
+        registry.metrics = CallMetrics()
+        writer.write(_request({"id": "1", "function": "add", "parameters": {"a": 1, "b": 2}}))
+        await _read_response(reader)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: test\r\n\r\n")
+        headers, body = await _read_response(reader)
+        assert headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = body.decode()
+        assert 'pymcpfy_calls_total{function="add",transport="http"} 1' in text
+        assert 'pymcpfy_phase_seconds_count{transport="http",phase="decode"} 1' in text
+        assert 'pymcpfy_phase_seconds_count{transport="http",phase="encode"} 1' in text
+        writer.close()
+    finally:
+        await transport.stop()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("engine", ["asyncio", "threaded"])
+async def test_profiles_endpoint(engine):
+    """Test that GET /debug/profiles serves the profiles of slow calls."""
+    registry = _make_registry()
+    transport = HTTPTransport(registry, host="127.0.0.1", port=0, engine=engine)
+    await transport.start()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", transport.port)
+        writer.write(b"GET /debug/profiles HTTP/1.1\r\nHost: test\r\n\r\n")
+        _, body = await _read_response(reader)
+        assert json.loads(body)["status"] == 404
+
+        registry.profiler = CallProfiler(threshold=0.05)
+        writer.write(_request({"id": "1", "function": "slow", "parameters": {"delay": 0.1}}))
+        await _read_response(reader)
+        writer.write(b"GET /debug/profiles HTTP/1.1\r\nHost: test\r\n\r\n")
+        headers, body = await _read_response(reader)
+        assert headers["content-type"] == "application/json"
+        [profile] = json.loads(body)["profiles"]
+        assert (profile["function"], profile["transport"], profile["id"]) == ("slow", "http", "1")
+        assert profile["duration"] >= 0.1
+        writer.close()
+    finally:
+        await transport.stop()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("engine", ["asyncio", "threaded"])
+async def test_schema_etag(engine):
+    """Test conditional schema requests."""
+    registry = _make_registry()
+    transport = HTTPTransport(registry, host="127.0.0.1", port=0, engine=engine)
+    await transport.start()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", transport.port)
+        writer.write(b"GET /schema HTTP/1.1\r\nHost: test\r\n\r\n")
+        headers, body = await _read_response(reader)
+        etag = headers["etag"]
+        assert set(json.loads(body)) == {"slow", "add"}
+
+        conditional = f"GET /schema HTTP/1.1\r\nHost: test\r\nIf-None-Match: {etag}\r\n\r\n".encode()
+        writer.write(conditional)
+        headers, body = await _read_response(reader)
+        assert headers["etag"] == etag
+        assert body == b""
+
+        registry.register(lambda context: None, name="noop")
+        writer.write(conditional)
+        headers, body = await _read_response(reader)
+        assert headers["etag"] != etag
+        assert "noop" in json.loads(body)
+        writer.close()
+    finally:
+        await transport.stop()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("engine", ["asyncio", "threaded"])
+async def test_msgpack_content_type(engine):
+    """Test MessagePack request and response bodies."""
+    msgpack = pytest.importorskip("msgpack")
+    transport = HTTPTransport(_make_registry(), host="127.0.0.1", port=0, engine=engine)
+    await transport.start()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", transport.port)
+        body = msgpack.packb({"id": "1", "function": "add", "parameters": {"a": 1, "b": 2}})
+        writer.write(
+            b"POST / HTTP/1.1\r\nHost: test\r\nContent-Type: application/msgpack\r\n"
+            + f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        headers, response = await _read_response(reader)
+        assert headers["content-type"] == "application/msgpack"
+        assert msgpack.unpackb(response)["data"] == 3
+
+        body = json.dumps({"id": "2", "function": "add", "parameters": {"a": 2, "b": 2}}).encode()
+        writer.write(
+            b"POST / HTTP/1.1\r\nHost: test\r\nAccept: application/msgpack\r\n"
+            + f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        headers, response = await _read_response(reader)
+        assert msgpack.unpackb(response)["data"] == 4
+        writer.close()
+    finally:
+        await transport.stop()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("engine", ["asyncio", "threaded"])
+async def test_batch_request(engine):
+    """Test that an array body is answered with an array of responses."""
+    transport = HTTPTransport(_make_registry(), host="127.0.0.1", port=0, engine=engine, max_batch_size=2)
+    await transport.start()
+    try:
+        status, body = await _post(transport.port, [
+            {"id": "1", "function": "add", "parameters": {"a": 1, "b": 2}},
+            {"id": "2", "function": "missing"},
+        ])
+        assert status == 200
+        assert [(r["id"], r["status"]) for r in body] == [("1", 200), ("2", 404)]
+        assert body[0]["data"] == 3
+
+        status, body = await _post(transport.port, [{"function": "add"}] * 3)
+        assert status == 413
+    finally:
+        await transport.stop()
+
+def _make_stream_registry() -> MCPRegistry:
+    registry = MCPRegistry()
+
+    async def count(context, n: int):
+        for i in range(n):
+            yield i
+
+    registry.register(count)
+    return registry
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("engine", ["asyncio", "threaded"])
+async def test_streaming_response(engine):
+    """Test chunked NDJSON and SSE streaming of generator results."""
+    transport = HTTPTransport(_make_stream_registry(), host="127.0.0.1", port=0, engine=engine)
+    await transport.start()
+    try:
+        for accept, content_type in (("application/json", b"application/x-ndjson"), ("text/event-stream", b"text/event-stream")):
+            reader, writer = await asyncio.open_connection("127.0.0.1", transport.port)
+            body = json.dumps({"id": "s", "function": "count", "parameters": {"n": 3}}).encode()
+            writer.write(
+                b"POST / HTTP/1.1\r\nHost: test\r\n"
+                + f"Accept: {accept}\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+                + body
+            )
+            head = await reader.readuntil(b"\r\n\r\n")
+            assert b"Transfer-Encoding: chunked" in head
+            assert content_type in head
+            payload = b""
+            while True:
+                size = int((await reader.readline()).strip(), 16)
+                chunk = await reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                payload += chunk[:-2]
+
+            # The connection stays usable after the stream ends.
+            writer.write(_request({"id": "n", "function": "count", "parameters": {}}))
+            _, response = await _read_response(reader)
+            assert json.loads(response)["status"] == 400
+            writer.close()
+
+            if accept == "text/event-stream":
+                events = payload.decode().strip().split("\n\n")
+                assert events[0].startswith("id: 0\ndata: ")
+                frames = [json.loads(event.split("data: ", 1)[1]) for event in events]
+            else:
+                frames = [json.loads(line) for line in payload.decode().splitlines()]
+            assert [frame.get("data") for frame in frames] == [0, 1, 2, None]
+            assert frames[-1] == {"id": "s", "seq": 3, "done": True, "status": 200}
+    finally:
+        await transport.stop()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("engine", ["asyncio", "threaded"])
+async def test_unix_socket(engine, tmp_path):
+    """Test serving over a Unix domain socket, replacing a stale socket file."""
+    path = str(tmp_path / "mcp.sock")
+    for _ in range(2):
+        transport = HTTPTransport(_make_registry(), engine=engine, unix_socket=path)
+        await transport.start()
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(_request({"id": "1", "function": "add", "parameters": {"a": 1, "b": 2}}))
+            _, body = await _read_response(reader)
+            assert json.loads(body)["data"] == 3
+            writer.close()
+        finally:
+            await transport.stop()
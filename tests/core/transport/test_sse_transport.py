@@ -0,0 +1,108 @@
+"""Tests for the Server-Sent Events transport."""
+
+import asyncio
+import json
+
+import pytest
+
+from pymcpfy.core import MCPRegistry, SSETransport
+
+def _make_registry() -> MCPRegistry:
+    registry = MCPRegistry()
+
+    async def slow(context, delay: float) -> float:
+        await asyncio.sleep(delay)
+        return delay
+
+    async def count(context, n: int):
+        for i in range(n):
+            yield i
+
+    registry.register(slow)
+    registry.register(count)
+    return registry
+
+class _EventReader:
+    """Parse events from a chunked ``text/event-stream`` response."""
+
+    def __init__(self, reader: asyncio.StreamReader):
+        self.reader = reader
+        self.buffer = b""
+
+    async def next(self) -> dict:
+        while b"\n\n" not in self.buffer:
+            size = int((await self.reader.readline()).strip(), 16)
+            self.buffer += (await self.reader.readexactly(size + 2))[:-2]
+        raw, self.buffer = self.buffer.split(b"\n\n", 1)
+        event = {}
+        for line in raw.decode().split("\n"):
+            name, _, value = line.partition(": ")
+            event[name] = value
+        return event
+
+async def _open_stream(port: int) -> tuple:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"GET /sse HTTP/1.1\r\nHost: test\r\nAccept: text/event-stream\r\n\r\n")
+    head = await reader.readuntil(b"\r\n\r\n")
+    assert b"text/event-stream" in head
+    events = _EventReader(reader)
+    endpoint = await events.next()
+    assert endpoint["event"] == "endpoint"
+    return events, writer, endpoint["data"]
+
+async def _post(port: int, path: str, payload) -> int:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode()
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: test\r\nConnection: close\r\n".encode()
+        + f"Content-Length: {len(body)}\r\n\r\n".encode()
+        + body
+    )
+    raw = await reader.read()
+    writer.close()
+    return int(raw.split(b" ")[1])
+
+@pytest.mark.asyncio
+async def test_session_messages():
+    """Test that responses arrive on the session stream, out of order."""
+    transport = SSETransport(_make_registry(), host="127.0.0.1", port=0)
+    await transport.start()
+    try:
+        events, writer, endpoint = await _open_stream(transport.port)
+        assert endpoint.startswith("/messages?session_id=")
+
+        assert await _post(transport.port, endpoint, {"id": "slow", "function": "slow", "parameters": {"delay": 0.2}}) == 202
+        assert await _post(transport.port, endpoint, {"id": "fast", "function": "slow", "parameters": {"delay": 0}}) == 202
+        first = json.loads((await events.next())["data"])
+        second = json.loads((await events.next())["data"])
+        assert (first["id"], second["id"]) == ("fast", "slow")
+
+        assert await _post(transport.port, endpoint, {"id": "s", "function": "count", "parameters": {"n": 2}}) == 202
+        frames = [json.loads((await events.next())["data"]) for _ in range(3)]
+        assert [f.get("data") for f in frames] == [0, 1, None]
+        assert frames[-1]["done"] is True
+
+        session_id = endpoint.split("=", 1)[1]
+        assert await transport.notify(session_id, {"event": "changed"})
+        assert json.loads((await events.next())["data"]) == {"event": "changed"}
+
+        assert await _post(transport.port, "/messages?session_id=nope", {"function": "slow"}) == 404
+        writer.close()
+    finally:
+        await transport.stop()
+
+@pytest.mark.asyncio
+async def test_pings_and_many_idle_streams():
+    """Test keep-alive comments and that idle streams are cheap to hold."""
+    transport = SSETransport(_make_registry(), host="127.0.0.1", port=0, ping_interval=0.05)
+    await transport.start()
+    try:
+        streams = await asyncio.gather(*[_open_stream(transport.port) for _ in range(200)])
+        assert len(transport.sessions) == 200
+        events, _, _ = streams[0]
+        assert await events.next() == {"": "ping"}
+        for _, writer, _ in streams:
+            writer.close()
+    finally:
+        await transport.stop()
+    assert transport.sessions == {}
@@ -0,0 +1,97 @@
+"""Tests for the stdio transport."""
+
+import asyncio
+import json
+import os
+import struct
+
+import pytest
+
+from pymcpfy.core import MCPRegistry, StdioTransport
+
+def _make_registry() -> MCPRegistry:
+    registry = MCPRegistry()
+
+    async def slow(context, delay: float) -> float:
+        await asyncio.sleep(delay)
+        return delay
+
+    registry.register(slow)
+    return registry
+
+async def _start(**kwargs) -> tuple:
+    """Start a transport on pipes and return (transport, request fd, response reader)."""
+    request_read, request_write = os.pipe()
+    response_read, response_write = os.pipe()
+    transport = StdioTransport(
+        _make_registry(),
+        stdin=os.fdopen(request_read, "rb", buffering=0),
+        stdout=os.fdopen(response_write, "wb", buffering=0),
+        **kwargs
+    )
+    await transport.start()
+    reader = asyncio.StreamReader()
+    await asyncio.get_running_loop().connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(response_read, "rb", buffering=0)
+    )
+    return transport, request_write, reader
+
+@pytest.mark.asyncio
+async def test_newline_framing():
+    """Test interleaved requests answered out of order, one per line."""
+    transport, requests, responses = await _start()
+    try:
+        os.write(requests, b"".join(json.dumps(request).encode() + b"\n" for request in [
+            {"id": "slow", "function": "slow", "parameters": {"delay": 0.2}},
+            {"id": "fast", "function": "slow", "parameters": {"delay": 0}},
+        ]) + b"not json\n")
+        lines = [json.loads(await responses.readline()) for _ in range(3)]
+        assert lines[-1]["id"] == "slow"
+        assert {line.get("id") for line in lines[:2]} == {"fast", None}
+
+        os.close(requests)
+        await asyncio.wait_for(transport.wait_closed(), 1)
+    finally:
+        await transport.stop()
+
+@pytest.mark.asyncio
+async def test_regular_files(tmp_path):
+    """Test serving requests from a file into a file, as with shell redirection."""
+    requests = tmp_path / "requests.jsonl"
+    requests.write_bytes(b"".join(
+        json.dumps({"id": str(i), "function": "slow", "parameters": {"delay": 0}}).encode() + b"\n"
+        for i in range(200)
+    ))
+    output = tmp_path / "out.log"
+    with open(requests, "rb") as stdin, open(output, "wb") as stdout:
+        transport = StdioTransport(_make_registry(), stdin=stdin, stdout=stdout, max_message_size=1024)
+        await transport.start()
+        try:
+            await asyncio.wait_for(transport.wait_closed(), 5)
+        finally:
+            await transport.stop()
+    responses = [json.loads(line) for line in output.read_bytes().splitlines()]
+    assert sorted(int(response["id"]) for response in responses) == list(range(200))
+    assert all(response["status"] == 200 for response in responses)
+
+@pytest.mark.asyncio
+async def test_length_prefixed_msgpack():
+    """Test length-prefixed framing with a binary codec."""
+    msgpack = pytest.importorskip("msgpack")
+    transport, requests, responses = await _start(framing="length", codec="msgpack")
+    try:
+        body = msgpack.packb({"id": "1", "function": "slow", "parameters": {"delay": 0}})
+        os.write(requests, struct.pack(">I", len(body)) + body)
+        (size,) = struct.unpack(">I", await responses.readexactly(4))
+        assert msgpack.unpackb(await responses.readexactly(size)) == {
+            "data": 0, "status": 200, "metadata": {}, "id": "1"
+        }
+        os.close(requests)
+    finally:
+        await transport.stop()
+
+def test_newline_framing_requires_text_codec():
+    """Test that binary codecs need length-prefixed framing."""
+    pytest.importorskip("msgpack")
+    with pytest.raises(ValueError):
+        StdioTransport(MCPRegistry(), codec="msgpack")
@@ -0,0 +1,212 @@
+"""Tests for the WebSocket transport."""
+
+import asyncio
+import json
+
+import pytest
+import websockets
+
+from pymcpfy.core import CallMetrics, MCPRegistry, WebSocketTransport
+
+def _make_registry() -> MCPRegistry:
+    registry = MCPRegistry()
+
+    async def slow(context, delay: float) -> float:
+        await asyncio.sleep(delay)
+        return delay
+
+    registry.register(slow, is_async=True)
+    return registry
+
+@pytest.mark.asyncio
+async def test_out_of_order_responses():
+    """Test that a slow call does not block later calls on the same connection."""
+    transport = WebSocketTransport(_make_registry(), host="127.0.0.1", port=0)
+    await transport.start()
+    try:
+        async with websockets.connect(f"ws://127.0.0.1:{transport.port}") as ws:
+            await ws.send(json.dumps({"id": "slow", "function": "slow", "parameters": {"delay": 0.3}}))
+            await ws.send(json.dumps({"id": "fast", "function": "slow", "parameters": {"delay": 0}}))
+            await ws.send("not json")
+            responses = [json.loads(await ws.recv()) for _ in range(3)]
+        assert responses[-1]["id"] == "slow"
+        assert {r.get("id") for r in responses[:2]} == {"fast", None}
+        assert any(r["status"] == 400 for r in responses[:2])
+    finally:
+        await transport.stop()
+
+@pytest.mark.asyncio
+async def test_concurrency_cap():
+    """Test that at most max_concurrency calls run at once per connection."""
+    registry = MCPRegistry()
+    active = 0
+    peak = 0
+
+    async def tracked(context) -> int:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+        return peak
+
+    registry.register(tracked, is_async=True)
+    transport = WebSocketTransport(registry, host="127.0.0.1", port=0, max_concurrency=3, max_queued=2)
+    await transport.start()
+    try:
+        async with websockets.connect(f"ws://127.0.0.1:{transport.port}") as ws:
+            for i in range(10):
+                await ws.send(json.dumps({"id": str(i), "function": "tracked"}))
+            responses = [json.loads(await ws.recv()) for _ in range(10)]
+        assert {r["id"] for r in responses} == {str(i) for i in range(10)}
+        assert peak == 3
+    finally:
+        await transport.stop()
+
+@pytest.mark.asyncio
+async def test_msgpack_subprotocol():
+    """Test that clients can negotiate MessagePack binary frames."""
+    msgpack = pytest.importorskip("msgpack")
+    transport = WebSocketTransport(_make_registry(), host="127.0.0.1", port=0)
+    await transport.start()
+    try:
+        async with websockets.connect(f"ws://127.0.0.1:{transport.port}", subprotocols=["mcp.msgpack"]) as ws:
+            assert ws.subprotocol == "mcp.msgpack"
+            await ws.send(msgpack.packb({"id": "1", "function": "slow", "parameters": {"delay": 0}}))
+            response = await ws.recv()
+        assert isinstance(response, bytes)
+        assert msgpack.unpackb(response) == {"data": 0, "status": 200, "metadata": {}, "id": "1"}
+
+        async with websockets.connect(f"ws://127.0.0.1:{transport.port}", subprotocols=["chat"]) as ws:
+            assert ws.subprotocol is None
+            await ws.send(json.dumps({"id": "2", "function": "slow", "parameters": {"delay": 0}}))
+            assert json.loads(await ws.recv())["id"] == "2"
+    finally:
+        await transport.stop()
+
+@pytest.mark.asyncio
+async def test_batch_message():
+    """Test that an array message runs its calls concurrently."""
+    transport = WebSocketTransport(_make_registry(), host="127.0.0.1", port=0)
+    await transport.start()
+    try:
+        async with websockets.connect(f"ws://127.0.0.1:{transport.port}") as ws:
+            start = asyncio.get_running_loop().time()
+            await ws.send(json.dumps([
+                {"id": str(i), "function": "slow", "parameters": {"delay": 0.1}} for i in range(5)
+            ]))
+            responses = json.loads(await ws.recv())
+            elapsed = asyncio.get_running_loop().time() - start
+        assert [r["id"] for r in responses] == ["0", "1", "2", "3", "4"]
+        assert elapsed < 0.4
+    finally:
+        await transport.stop()
+
+@pytest.mark.asyncio
+async def test_streaming_frames():
+    """Test that generator results arrive as one frame per chunk."""
+    registry = MCPRegistry()
+
+    async def count(context, n: int):
+        for i in range(n):
+            yield i
+
+    registry.register(count)
+    transport = WebSocketTransport(registry, host="127.0.0.1", port=0)
+    await transport.start()
+    try:
+        async with websockets.connect(f"ws://127.0.0.1:{transport.port}") as ws:
+            await ws.send(json.dumps({"id": "s", "function": "count", "parameters": {"n": 3}}))
+            frames = [json.loads(await ws.recv()) for _ in range(4)]
+        assert [(f["seq"], f.get("data")) for f in frames] == [(0, 0), (1, 1), (2, 2), (3, None)]
+        assert all(f["id"] == "s" for f in frames)
+        assert frames[-1]["done"] is True
+    finally:
+        await transport.stop()
+
+@pytest.mark.asyncio
+async def test_unix_socket(tmp_path):
+    """Test serving over a Unix domain socket."""
+    path = str(tmp_path / "mcp.sock")
+    transport = WebSocketTransport(_make_registry(), unix_socket=path)
+    await transport.start()
+    try:
+        async with websockets.unix_connect(path) as ws:
+            await ws.send(json.dumps({"id": "1", "function": "slow", "parameters": {"delay": 0}}))
+            assert json.loads(await ws.recv())["data"] == 0
+    finally:
+        await transport.stop()
+
+def _make_cancellable_registry():
+    registry = MCPRegistry()
+    state = {"started": asyncio.Event(), "cancelled": []}
+
+    async def hang(context) -> None:
+        state["started"].set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            state["cancelled"].append(context.request_id)
+            raise
+
+    registry.register(hang)
+    registry.register(_make_registry().get_function("slow"))
+    return registry, state
+
+@pytest.mark.asyncio
+async def test_cancel_message():
+    """Test that a cancel message stops the call with that id and answers it with 499."""
+    registry, state = _make_cancellable_registry()
+    transport = WebSocketTransport(registry, host="127.0.0.1", port=0)
+    await transport.start()
+    try:
+        async with websockets.connect(f"ws://127.0.0.1:{transport.port}") as ws:
+            await ws.send(json.dumps({"id": "h", "function": "hang"}))
+            await state["started"].wait()
+            await ws.send(json.dumps({"cancel": "unknown"}))
+            await ws.send(json.dumps({"cancel": "h"}))
+            assert json.loads(await ws.recv()) == {"id": "h", "error": "Cancelled", "status": 499}
+            assert state["cancelled"] == ["h"]
+
+            await ws.send(json.dumps({"id": "s", "function": "slow", "parameters": {"delay": 0}}))
+            assert json.loads(await ws.recv())["id"] == "s"
+    finally:
+        await transport.stop()
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_calls():
+    """Test that calls still running when the client disconnects are cancelled."""
+    registry, state = _make_cancellable_registry()
+    transport = WebSocketTransport(registry, host="127.0.0.1", port=0)
+    await transport.start()
+    try:
+        async with websockets.connect(f"ws://127.0.0.1:{transport.port}") as ws:
+            await ws.send(json.dumps({"id": "h", "function": "hang"}))
+            await state["started"].wait()
+        for _ in range(100):
+            if state["cancelled"]:
+                break
+            await asyncio.sleep(0.01)
+        assert state["cancelled"] == ["h"]
+    finally:
+        await transport.stop()
+
+@pytest.mark.asyncio
+async def test_metrics_message():
+    """Test that a metrics message is answered with the registry's call metrics."""
+    registry = _make_registry()
+    registry.metrics = CallMetrics()
+    transport = WebSocketTransport(registry, host="127.0.0.1", port=0)
+    await transport.start()
+    try:
+        async with websockets.connect(f"ws://127.0.0.1:{transport.port}") as ws:
+            await ws.send(json.dumps({"id": "1", "function": "slow", "parameters": {"delay": 0}}))
+            await ws.recv()
+            await ws.send(json.dumps({"id": "m", "metrics": True}))
+            response = json.loads(await ws.recv())
+        assert response["id"] == "m"
+        series = response["data"]["functions"]["slow"]["websocket"]
+        assert (series["calls"], series["errors"], series["in_flight"]) == (1, 0, 0)
+        assert response["data"]["transports"]["websocket"]["decode"]["count"] == 2
+    finally:
+        await transport.stop()
@@ -46,6 +46,7 @@ def test_config_from_dict():
     assert config.backend_url == "http://api.example.com"
     assert config.debug is True
     assert config.cors_origins == ["http://localhost:3000"]
+    assert config.profile_records == MCPConfig().profile_records
 
 def test_config_from_yaml():
     """Test configuration loading from YAML file."""
@@ -81,7 +82,16 @@ def test_config_from_env_vars(monkeypatch):
         "PYMCPFY_PING_INTERVAL": "30",
         "PYMCPFY_PING_TIMEOUT": "30",
         "PYMCPFY_BACKEND_URL": "http://api.example.com",
+        "PYMCPFY_BACKEND_POOL_SIZE": "4",
+        "PYMCPFY_BACKEND_READ_TIMEOUT": "2.5",
+        "PYMCPFY_MAX_INFLIGHT": "64",
+        "PYMCPFY_ADAPTIVE_LIMIT": "true",
         "PYMCPFY_DEBUG": "true",
+        "PYMCPFY_METRICS": "false",
+        "PYMCPFY_PROFILE_THRESHOLD": "0.25",
+        "PYMCPFY_PROFILE_RECORDS": "7",
+        "PYMCPFY_FRAMING": "length",
+        "PYMCPFY_QUEUE_TIMEOUT": "",
         "PYMCPFY_CORS_ORIGINS": "http://localhost:3000,http://localhost:8000"
     }
 
@@ -95,7 +105,18 @@ def test_config_from_env_vars(monkeypatch):
     assert config.transport.ping_interval == 30
     assert config.transport.ping_timeout == 30
     assert config.backend_url == "http://api.example.com"
+    assert config.backend_pool_size == 4
+    assert config.backend_read_timeout == 2.5
+    assert config.backend_idle_timeout == 30.0
+    assert config.max_inflight == 64
+    assert config.adaptive_limit is True
+    assert config.queue_timeout is None
     assert config.debug is True
+    assert config.metrics is False
+    assert config.profile_threshold == 0.25
+    assert config.profile_sample_rate == 0.0
+    assert config.profile_records == 7
+    assert config.transport.framing == "length"
     assert config.cors_origins == ["http://localhost:3000", "http://localhost:8000"]
 
 def test_load_config_precedence(monkeypatch):
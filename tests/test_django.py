@@ -0,0 +1,113 @@
+"""Tests for the Django adapter."""
+
+import json
+
+import pytest
+
+django = pytest.importorskip("django")
+
+from django.conf import settings
+
+if not settings.configured:
+    settings.configure(
+        SECRET_KEY="test",
+        INSTALLED_APPS=["django.contrib.contenttypes", "django.contrib.auth"],
+        DATABASES={},
+        MIDDLEWARE=[
+            "django.contrib.sessions.middleware.SessionMiddleware",
+            "django.middleware.csrf.CsrfViewMiddleware",
+            "django.contrib.auth.middleware.AuthenticationMiddleware",
+            f"{__name__}.TenantMiddleware",
+        ],
+        SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies",
+    )
+    django.setup()
+
+from django.http import Http404, JsonResponse
+from django.views import View
+
+from pymcpfy import MCPRegistry
+from pymcpfy.django import mcpfy
+
+class TenantMiddleware:
+    """Tag requests from their header, and refuse them without one."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.tenant = request.headers.get("X-Tenant")
+        if request.tenant is None:
+            return JsonResponse({"error": "No tenant"}, status=401)
+        return self.get_response(request)
+
+registry = MCPRegistry()
+
+@mcpfy(registry=registry)
+def greet(request, name: str):
+    """Greet someone."""
+    return JsonResponse({
+        "message": f"Hello, {name}!",
+        "body": json.loads(request.body),
+        "authorization": request.headers.get("Authorization"),
+        "anonymous": request.user.is_anonymous,
+        "tenant": request.tenant,
+    })
+
+@mcpfy(registry=registry, middleware=False)
+def bare(request):
+    return JsonResponse({"tenant": getattr(request, "tenant", None), "anonymous": request.user.is_anonymous})
+
+@mcpfy(registry=registry)
+async def lookup(request, pk: int):
+    if pk == 0:
+        raise Http404("No such item")
+    return JsonResponse({"pk": pk, "q": request.GET.get("q")})
+
+class ItemView(View):
+    @mcpfy(registry=registry)
+    def get(self, request, pk: int):
+        return JsonResponse({"pk": pk, "method": request.method})
+
+@pytest.mark.asyncio
+async def test_function_views():
+    """Test sync and async function views called with a synthetic request."""
+    dispatcher = registry.dispatcher
+    response = await dispatcher.dispatch({
+        "id": "1",
+        "function": "greet",
+        "parameters": {"name": "Ada", "extra": [1, 2]},
+        "metadata": {"headers": {"Authorization": "Bearer token", "X-Tenant": "acme"}},
+    }, "test")
+    assert response["data"] == {
+        "message": "Hello, Ada!",
+        "body": {"extra": [1, 2]},
+        "authorization": "Bearer token",
+        "anonymous": True,
+        "tenant": "acme",
+    }
+
+    response = await dispatcher.dispatch({
+        "id": "2", "function": "lookup", "parameters": {"pk": 0}, "metadata": {"headers": {"X-Tenant": "acme"}}
+    }, "test")
+    assert (response["status"], response["error"]) == (404, "No such item")
+
+@pytest.mark.asyncio
+async def test_middleware():
+    """Test that the middleware stack runs unless it is opted out of."""
+    dispatcher = registry.dispatcher
+    for function in ("greet", "lookup", "ItemView_get"):
+        response = await dispatcher.dispatch({"id": "1", "function": function, "parameters": {"name": "x", "pk": 1}}, "test")
+        assert (response["status"], response["error"]) == (401, "No tenant")
+
+    response = await dispatcher.dispatch({"id": "1", "function": "bare"}, "test")
+    assert response["data"] == {"tenant": None, "anonymous": True}
+
+@pytest.mark.asyncio
+async def test_class_based_view():
+    """Test a class-based view method dispatched through as_view."""
+    response = await registry.dispatcher.dispatch(
+        {"id": "1", "function": "ItemView_get", "parameters": {"pk": 5}, "metadata": {"headers": {"X-Tenant": "acme"}}},
+        "test"
+    )
+    assert response["data"] == {"pk": 5, "method": "GET"}
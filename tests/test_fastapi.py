@@ -0,0 +1,134 @@
+"""Tests for the FastAPI adapter."""
+
+import asyncio
+from typing import Optional
+
+import pytest
+
+fastapi = pytest.importorskip("fastapi")
+
+from fastapi import BackgroundTasks, Cookie, Depends, FastAPI, File, Header, HTTPException, Request, Security
+from fastapi.security import SecurityScopes
+from pydantic import BaseModel
+
+from pymcpfy import MCPRegistry
+from pymcpfy.fastapi import mcpfy
+
+class Item(BaseModel):
+    name: str
+    quantity: int = 1
+
+def _make_app():
+    app = FastAPI()
+    registry = MCPRegistry()
+    events = []
+
+    def connection():
+        events.append("open")
+        yield "db"
+        events.append("close")
+
+    async def current_user(request: Request, db: str = Depends(connection)) -> dict:
+        if request.headers.get("authorization") != "Bearer secret":
+            raise HTTPException(status_code=401, detail="Invalid token")
+        return {"name": "demo", "db": db}
+
+    @app.get("/items/{item_id}")
+    @mcpfy(registry=registry, app=app)
+    def get_item(item_id: int, limit: Optional[int] = 5, user: dict = Depends(current_user)) -> Item:
+        """Get an item."""
+        return Item(name=f"{item_id}:{user['name']}:{user['db']}", quantity=limit)
+
+    @app.post("/items")
+    @mcpfy(registry=registry)
+    async def create_item(item: Item, tasks: BackgroundTasks) -> Item:
+        tasks.add_task(events.append, "created")
+        return item
+
+    return app, registry, events, current_user
+
+@pytest.mark.asyncio
+async def test_endpoint_with_dependencies():
+    """Test parameter validation, dependencies and HTTPException."""
+    app, registry, events, current_user = _make_app()
+    dispatcher = registry.dispatcher
+    request = {
+        "id": "1",
+        "function": "get_item",
+        "parameters": {"item_id": "7"},
+        "metadata": {"headers": {"Authorization": "Bearer secret"}},
+    }
+    response = await dispatcher.dispatch(request, "test")
+    assert response["data"] == {"name": "7:demo:db", "quantity": 5}
+    assert events == ["open", "close"]
+
+    request["metadata"] = {}
+    response = await dispatcher.dispatch(request, "test")
+    assert (response["status"], response["error"]) == (401, "Invalid token")
+
+    app.dependency_overrides[current_user] = lambda: {"name": "override", "db": "-"}
+    response = await dispatcher.dispatch(request, "test")
+    assert response["data"]["name"] == "7:override:-"
+
+    response = await dispatcher.dispatch({"id": "2", "function": "get_item", "parameters": {}}, "test")
+    assert response["status"] == 400
+
+    schema = registry.get_schema()["get_item"]
+    assert set(schema.parameters) == {"item_id", "limit"}
+
+@pytest.mark.asyncio
+async def test_body_models_and_background_tasks():
+    """Test Pydantic body validation and background tasks."""
+    _, registry, events, _ = _make_app()
+    dispatcher = registry.dispatcher
+    response = await dispatcher.dispatch(
+        {"id": "1", "function": "create_item", "parameters": {"item": {"name": "pen"}}}, "test"
+    )
+    assert response["data"] == {"name": "pen", "quantity": 1}
+    for _ in range(10):
+        if events:
+            break
+        await asyncio.sleep(0.01)
+    assert events == ["created"]
+
+    response = await dispatcher.dispatch(
+        {"id": "2", "function": "create_item", "parameters": {"item": {"quantity": "many"}}}, "test"
+    )
+    assert response["status"] == 422
+
+@pytest.mark.asyncio
+async def test_headers_cookies_and_security_scopes():
+    """Test Header and Cookie parameters and the scopes of Security dependencies."""
+    registry = MCPRegistry()
+
+    def tenant(x_tenant: str = Header(), session: Optional[str] = Cookie(None)) -> str:
+        return f"{x_tenant}:{session}"
+
+    def authorize(security_scopes: SecurityScopes, authorization: str = Header()) -> list:
+        if authorization != "Bearer secret":
+            raise HTTPException(status_code=401, detail="Invalid token")
+        return security_scopes.scopes
+
+    @mcpfy(registry=registry)
+    def whoami(
+        x_tenant: str = Depends(tenant),
+        scopes: list = Security(authorize, scopes=["items:read"]),
+        admin: list = Security(authorize, scopes=["admin"])
+    ) -> dict:
+        return {"tenant": x_tenant, "scopes": scopes, "admin": admin}
+
+    headers = {"Authorization": "Bearer secret", "X-Tenant": "acme", "Cookie": "session=abc"}
+    request = {"id": "1", "function": "whoami", "parameters": {"x_tenant": "spoofed"}, "metadata": {"headers": headers}}
+    response = await registry.dispatcher.dispatch(request, "test")
+    assert response["data"] == {"tenant": "acme:abc", "scopes": ["items:read"], "admin": ["admin"]}
+    assert set(registry.get_schema()["whoami"].parameters) == set()
+
+    del headers["X-Tenant"]
+    response = await registry.dispatcher.dispatch(request, "test")
+    assert (response["status"], response["error"]) == (400, "Missing header: x-tenant")
+
+    def upload(data: bytes = File()):
+        return len(data)
+
+    with pytest.raises(TypeError):
+        mcpfy(registry=registry)(upload)
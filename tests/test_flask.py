@@ -0,0 +1,74 @@
+"""Tests for the Flask adapter."""
+
+import functools
+
+import pytest
+
+flask = pytest.importorskip("flask")
+
+from pymcpfy import MCPRegistry
+from pymcpfy.flask import init_app, mcpfy
+
+def _make_app():
+    app = flask.Flask(__name__)
+    registry = MCPRegistry()
+    init_app(app, registry)
+
+    def require_token(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if flask.request.headers.get("Authorization") != "Bearer secret":
+                return flask.jsonify({"error": "Unauthorized"}), 401
+            return view(*args, **kwargs)
+        return wrapper
+
+    @app.route("/todos/<int:todo_id>", methods=["PUT"])
+    @require_token
+    @mcpfy(registry=registry)
+    def update_todo(todo_id: int):
+        """Update a todo."""
+        return flask.jsonify({"id": todo_id, "title": flask.request.json["title"]})
+
+    @app.route("/todos")
+    @mcpfy(registry=registry, method="GET")
+    def search(search_id: int = 0):
+        if flask.request.args.get("q") == "missing":
+            flask.abort(404)
+        return flask.jsonify(items=[flask.request.args.get("q")])
+
+    @app.route("/hello")
+    @mcpfy(registry=registry)
+    def hello():
+        return "hello", 201
+
+    return app, registry
+
+@pytest.mark.asyncio
+async def test_view_called_in_process():
+    """Test arguments, body, headers and decorators applied above mcpfy."""
+    _, registry = _make_app()
+    dispatcher = registry.dispatcher
+    request = {"id": "1", "function": "update_todo", "parameters": {"todo_id": 3, "title": "Write tests"}}
+    response = await dispatcher.dispatch(request, "test")
+    assert response["status"] == 401
+    for headers in ("x", ["Authorization", "Bearer secret"]):
+        request["metadata"] = {"headers": headers}
+        assert (await dispatcher.dispatch(request, "test"))["status"] == 401
+
+    request["metadata"] = {"headers": {"Authorization": "Bearer secret"}}
+    response = await dispatcher.dispatch(request, "test")
+    assert response["data"] == {"id": 3, "title": "Write tests"}
+    assert registry.get_schema()["update_todo"].description == "Update a todo."
+
+@pytest.mark.asyncio
+async def test_query_string_and_errors():
+    """Test GET parameters, aborts and non-JSON responses."""
+    _, registry = _make_app()
+    dispatcher = registry.dispatcher
+    response = await dispatcher.dispatch({"id": "1", "function": "search", "parameters": {"q": "a"}}, "test")
+    assert response["data"] == {"items": ["a"]}
+    response = await dispatcher.dispatch({"id": "2", "function": "search", "parameters": {"q": "missing"}}, "test")
+    assert response["status"] == 404
+    assert "not found" in response["error"]
+    response = await dispatcher.dispatch({"id": "3", "function": "hello", "parameters": {}}, "test")
+    assert (response["data"], response["status"]) == ("hello", 201)